@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+
+from yt_download import async_downloader, downloader as downloader_module
+from yt_download.async_downloader import AsyncYTDownloader
+from yt_download.progress import STAGE_RETRY_WAIT
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+OTHER = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+PLAYLIST = "https://www.youtube.com/playlist?list=PL1234567890"
+
+
+class FakeYDL:
+    """YoutubeDL falso: ``failures[id]`` lista os erros das próximas tentativas de download."""
+
+    failures = {}
+    downloads = []
+
+    def __init__(self, opts, on_extract=None):
+        self.opts = opts
+
+    def close(self):
+        pass
+
+    def extract_info(self, url, download=True, process=True, ie_key=None):
+        if 'list=' in url:
+            return {'_type': 'playlist', 'id': 'PL1234567890', 'title': 'Lista', 'entries': [
+                {'_type': 'url', 'id': video_id, 'url': f"https://www.youtube.com/watch?v={video_id}"}
+                for video_id in ('dQw4w9WgXcQ', 'aaaaaaaaaaa')]}
+        info = {'id': url.rsplit('=', 1)[-1], 'title': 'Vídeo', 'webpage_url': url}
+        return self._download(info) if download else info
+
+    def process_ie_result(self, info, download=True):
+        info = dict(info, title=info.get('title') or f"Vídeo {info['id']}")
+        return self._download(info) if download else info
+
+    def sanitize_info(self, info, remove_private_keys=False):
+        return dict(info)
+
+    def _download(self, info):
+        self.downloads.append(info['id'])
+        errors = self.failures.get(info['id'])
+        if errors:
+            raise errors.pop(0)
+        return info
+
+
+@pytest.fixture(autouse=True)
+def fake_ydl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(downloader_module, '_counting_ydl_class', lambda: FakeYDL)
+    monkeypatch.setattr(FakeYDL, 'failures', {})
+    monkeypatch.setattr(FakeYDL, 'downloads', [])
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Esperas de retry registradas (sem esperar de verdade) e feitas via ``await``."""
+    recorded = []
+    real_sleep = asyncio.sleep
+
+    async def recording_sleep(delay, *args, **kwargs):
+        recorded.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(async_downloader.asyncio, 'sleep', recording_sleep)
+    monkeypatch.setattr(async_downloader, 'backoff_delay', lambda attempt: attempt * 1.5)
+    return recorded
+
+
+def run(coro_factory, **engine_kwargs):
+    async def main():
+        async with AsyncYTDownloader(**engine_kwargs) as engine:
+            return await coro_factory(engine)
+    return asyncio.run(main())
+
+
+async def collect(aiterator):
+    return [item async for item in aiterator]
+
+
+def test_bounded_never_exceeds_limit():
+    in_flight, peak = [0], [0]
+
+    async def job(n):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.001 * (n % 3))
+        in_flight[0] -= 1
+        return n
+
+    async def jobs():
+        for n in range(12):
+            yield job(n)
+
+    results = run(lambda engine: collect(engine._bounded(jobs(), 3)))
+    assert sorted(results) == list(range(12))
+    assert peak[0] == 3
+
+
+def test_bounded_cancels_pending_tasks_on_early_exit():
+    cancelled = []
+
+    async def job(n):
+        if n == 0:
+            return n
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+
+    async def jobs():
+        for n in range(3):
+            yield job(n)
+
+    async def first_only(engine):
+        results = engine._bounded(jobs(), 3)
+        first = await results.__anext__()
+        await results.aclose()
+        await asyncio.sleep(0)  # Deixa as tarefas canceladas tratarem o cancelamento
+        return first
+
+    assert run(first_only) == 0
+    assert sorted(cancelled) == [1, 2]
+
+
+def test_download_many_reports_invalid_and_duplicates_without_downloading():
+    urls = [VIDEO, "https://example.com/x", "https://youtu.be/dQw4w9WgXcQ", OTHER]
+    results = run(lambda engine: collect(engine.download_many(urls)))
+
+    by_status = {}
+    for result in results:
+        by_status.setdefault(result['status'], []).append(result)
+    assert [r['url'] for r in by_status['invalid']] == ["https://example.com/x"]
+    assert by_status['duplicate'][0]['duplicate_of'] == VIDEO
+    assert len(by_status['success']) == 2
+    assert sorted(FakeYDL.downloads) == ['aaaaaaaaaaa', 'dQw4w9WgXcQ']
+
+
+@pytest.mark.parametrize("make_urls", [
+    lambda: [VIDEO, OTHER],
+    lambda: iter([VIDEO, OTHER]),
+    lambda: async_downloader._aiter([VIDEO, OTHER]),
+], ids=['list', 'iterator', 'async'])
+def test_download_many_accepts_sync_and_async_iterables(make_urls):
+    results = run(lambda engine: collect(engine.download_many(make_urls())))
+    assert sorted(result['url'] for result in results) == sorted([VIDEO, OTHER])
+    assert all(result['status'] == 'success' for result in results)
+
+
+def test_download_many_turns_exceptions_into_failed_results(monkeypatch):
+    async def download(engine):
+        original = engine.download
+
+        async def flaky(url, format_type="mp3", quality="320"):
+            if url == OTHER:
+                raise RuntimeError("boom")
+            return await original(url, format_type, quality)
+
+        monkeypatch.setattr(engine, 'download', flaky)
+        return await collect(engine.download_many([VIDEO, OTHER]))
+
+    results = {result['url']: result for result in run(download)}
+    assert results[VIDEO]['status'] == 'success'
+    assert (results[OTHER]['status'], results[OTHER]['error']) == ('failed', 'boom')
+
+
+def test_transient_failures_are_retried_after_awaited_backoff(sleeps):
+    FakeYDL.failures['dQw4w9WgXcQ'] = [Exception("HTTP Error 503: Service Unavailable")] * 2
+    events = []
+    result = run(lambda engine: engine.download(VIDEO), config={'max_retries': 3},
+                 progress_listener=events.append)
+
+    assert result['status'] == 'success'
+    assert FakeYDL.downloads == ['dQw4w9WgXcQ'] * 3
+    assert sleeps == [1.5, 3.0]
+    retry_waits = [event for event in events if event['stage'] == STAGE_RETRY_WAIT]
+    assert [event['retry_in'] for event in retry_waits] == [1.5, 3.0]
+
+
+def test_retries_stop_at_max_retries(sleeps):
+    FakeYDL.failures['dQw4w9WgXcQ'] = [Exception("HTTP Error 503: Service Unavailable")] * 5
+    result = run(lambda engine: engine.download(VIDEO), config={'max_retries': 2})
+
+    assert result['status'] == 'failed'
+    assert len(FakeYDL.downloads) == 3
+    assert result['error_kind'] == 'transient'
+
+
+def test_permanent_errors_are_not_retried(sleeps):
+    FakeYDL.failures['dQw4w9WgXcQ'] = [Exception("ERROR: Video unavailable")]
+    result = run(lambda engine: engine.download(VIDEO), config={'max_retries': 3})
+
+    assert result['status'] == 'failed'
+    assert result['error_kind'] == 'permanent'
+    assert FakeYDL.downloads == ['dQw4w9WgXcQ']
+    assert sleeps == []
+
+
+def test_playlist_status_reflects_entry_results(sleeps):
+    FakeYDL.failures['aaaaaaaaaaa'] = [Exception("ERROR: Video unavailable")]
+    result = run(lambda engine: engine.download(PLAYLIST), config={'max_retries': 1})
+
+    assert (result['type'], result['status']) == ('playlist', 'partial')
+    assert (result['successful'], result['total']) == (1, 2)
@@ -0,0 +1,138 @@
+import io
+import sys
+
+import pytest
+
+from yt_download import downloader as downloader_module
+from yt_download.downloader import YTDownloader
+from yt_download.main import _read_batch_urls
+
+
+def video_url(n):
+    return f"https://www.youtube.com/watch?v=video{n:06d}"
+
+
+def playlist_url(n):
+    return f"https://www.youtube.com/playlist?list=PLbatch{n:06d}"
+
+
+class FakeYDL:
+    """YoutubeDL falso: resolve e "baixa" sem rede; ids em ``unavailable`` falham de vez."""
+
+    unavailable = set()
+
+    def __init__(self, opts, on_extract=None):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def sanitize_info(self, info, remove_private_keys=False):
+        return dict(info)
+
+    def process_ie_result(self, info, download=True):
+        if download and info['id'] in self.unavailable:
+            raise Exception("ERROR: Video unavailable")
+        return dict(info, title=f"Vídeo {info['id']}", duration=1)
+
+
+@pytest.fixture
+def make_downloader(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(downloader_module, '_counting_ydl_class', lambda: FakeYDL)
+    monkeypatch.setattr(FakeYDL, 'unavailable', set())
+
+    def make(**config):
+        return YTDownloader(config=dict({'max_retries': 0}, **config))
+    return make
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_download_batch_keeps_counters_and_capped_samples(make_downloader, monkeypatch, parallel):
+    monkeypatch.setattr(YTDownloader, 'BATCH_SAMPLE_SIZE', 2)
+    FakeYDL.unavailable.update(f"video{n:06d}" for n in (3, 7, 11, 15))
+    delivered = []
+    downloader = make_downloader(parallel_downloads=parallel, max_parallel_downloads=3)
+    downloader._result_listeners.append(delivered.append)  # Como um result_listener
+
+    urls = [video_url(n) for n in range(20)] + [video_url(0), video_url(5)] + ["nope", "x", "y"]
+    summary = downloader.download_batch(iter(urls))
+
+    assert (summary['urls'], summary['duplicates'], summary['invalid']) == (25, 2, 3)
+    assert (summary['total'], summary['successful'], summary['failed']) == (20, 16, 4)
+    assert len(summary['failures']) == 2 and len(summary['invalid_sample']) == 2
+    assert all(failure['status'] == 'failed' for failure in summary['failures'])
+    assert 'results' not in summary
+    # O resultado de cada vídeo sai pelo listener, não pelo resumo
+    assert len(delivered) == 20
+
+
+def test_iter_download_batch_yields_each_result_and_returns_summary(make_downloader):
+    downloader = make_downloader()
+    batch = downloader.iter_download_batch(iter([video_url(1), video_url(2)]))
+    results = []
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            results.append(next(batch))
+
+    assert sorted(result['video_id'] for result in results) == ['video000001', 'video000002']
+    assert stop.value.value['successful'] == 2
+
+
+def test_download_batch_runs_playlists_through_bounded_queue(make_downloader, monkeypatch):
+    monkeypatch.setattr(YTDownloader, 'BATCH_PLAYLIST_QUEUE', 2)
+    downloader = make_downloader()
+    consumed = []
+    calls = []
+
+    def fake_download(url, format_type, quality, is_playlist=False):
+        # Registra quantas URLs do lote já tinham sido lidas quando a playlist rodou
+        calls.append((url, len(consumed)))
+        if url == playlist_url(3):
+            raise Exception("Playlist privada")
+        return {'type': 'playlist', 'title': url, 'total': 1, 'successful': 1}
+
+    monkeypatch.setattr(downloader, 'download', fake_download)
+
+    def urls():
+        for n in range(5):
+            for url in (video_url(n), playlist_url(n)):
+                consumed.append(url)
+                yield url
+
+    summary = downloader.download_batch(urls())
+
+    assert [url for url, _ in calls] == [playlist_url(n) for n in range(5)]
+    # Playlists 0-1 rodam depois de lidas só 4 URLs, não o lote inteiro
+    assert [seen for _, seen in calls[:2]] == [4, 4]
+    assert summary['total'] == 5
+    assert summary['playlists']['total'] == 5
+    assert summary['playlists']['failed'] == 1
+    assert summary['playlists']['failures'][0]['error'] == "Playlist privada"
+
+
+def test_read_batch_urls_skips_blank_lines_and_comments(tmp_path):
+    batch_file = tmp_path / "urls.txt"
+    batch_file.write_text(f"# lote\n\n  {video_url(1)}  \n{video_url(2)}\n   \n# fim\n", encoding='utf-8')
+    assert list(_read_batch_urls(str(batch_file))) == [video_url(1), video_url(2)]
+
+
+def test_read_batch_urls_reads_stdin_lazily(monkeypatch):
+    stdin = io.StringIO(f"{video_url(1)}\n#x\n{video_url(2)}\n")
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    urls = _read_batch_urls('-')
+    assert next(urls) == video_url(1)
+    assert stdin.tell() < len(stdin.getvalue())  # O resto ainda não foi lido
+    assert list(urls) == [video_url(2)]
+    assert not stdin.closed
+
+
+def test_read_batch_urls_missing_file_raises_oserror(tmp_path):
+    with pytest.raises(OSError):
+        list(_read_batch_urls(str(tmp_path / "missing.txt")))
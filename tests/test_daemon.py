@@ -0,0 +1,249 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from yt_download import async_downloader, daemon as daemon_module
+from yt_download.daemon import DownloadDaemon, DaemonClient, TOKEN_HEADER
+from yt_download.utils import SystemValidator
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+PLAYLIST = "https://www.youtube.com/playlist?list=PL1234567890"
+
+
+class FakeEngine:
+    """Motor assíncrono falso: cada download espera ``gate`` e devolve ``results[url]``."""
+
+    def __init__(self, config=None):
+        self.max_concurrent_downloads = 2
+        self.downloader = type('Downloader', (), {'download_path': '/tmp/downloads'})()
+        self._ydl_cache = type('Cache', (), {'metrics': lambda self: {'created': 0, 'reused': 0}})()
+        self.progress = type('Progress', (), {'snapshot': lambda self: {'tasks': []}})()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.results = {}
+        self.started = []
+        self.closed = False
+
+    async def download(self, url, format_type, quality):
+        self.started.append(url)
+        await asyncio.get_running_loop().run_in_executor(None, self.gate.wait)
+        result = self.results.get(url, {'success': True, 'status': 'success'})
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def running_daemon(monkeypatch):
+    monkeypatch.setattr(SystemValidator, 'check_ffmpeg',
+                        staticmethod(lambda: {'installed': True, 'version': 'test', 'error': None}))
+    monkeypatch.setattr(async_downloader, 'AsyncYTDownloader', FakeEngine)
+    server = DownloadDaemon({}, port=0)
+    server.start()
+    thread = threading.Thread(target=server._server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.engine.gate.set()
+    server._server.shutdown()
+    server.stop()
+    thread.join(2)
+
+
+@pytest.fixture
+def client(running_daemon):
+    return DaemonClient(running_daemon.host, running_daemon.port, running_daemon.token)
+
+
+def raw_request(server, method, path, body=None, token=None):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        headers = {TOKEN_HEADER: server.token if token is None else token}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b'{}')
+    finally:
+        conn.close()
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_daemon_writes_state_file_for_discovery(running_daemon):
+    client = DaemonClient.discover()
+    assert client is not None
+    assert (client.port, client.token) == (running_daemon.port, running_daemon.token)
+
+
+@pytest.mark.parametrize("method,path", [('GET', '/status'), ('GET', '/jobs'), ('POST', '/jobs')])
+def test_requests_without_token_are_rejected(running_daemon, method, path):
+    status, body = raw_request(running_daemon, method, path, body=json.dumps({'url': VIDEO}), token='')
+    assert status == 401
+    assert running_daemon.jobs() == []
+
+    status, _ = raw_request(running_daemon, method, path, body=json.dumps({'url': VIDEO}), token='wrong')
+    assert status == 401
+
+
+def test_status_reports_engine_and_job_counts(client):
+    client.submit(VIDEO, 'mp3', '320')
+    status = client.status()
+    assert status['download_path'] == '/tmp/downloads'
+    assert status['max_concurrent_downloads'] == 2
+    assert sum(status['jobs'].values()) == 1
+
+
+def test_job_routes(running_daemon, client):
+    job = client.submit(VIDEO, 'mp3', '320')
+    assert wait_for(lambda: client.job(job['id'])['status'] == 'success')
+
+    status, body = raw_request(running_daemon, 'GET', '/jobs')
+    assert status == 200 and [j['id'] for j in body['jobs']] == [job['id']]
+
+    assert [j['id'] for j in client.jobs([job['id'], 'missing'])] == [job['id']]
+
+    status, body = raw_request(running_daemon, 'GET', '/jobs/missing')
+    assert (status, body['error']) == (404, 'Job não encontrado')
+
+
+@pytest.mark.parametrize("method,path", [('GET', '/nope'), ('POST', '/status')])
+def test_unknown_routes_return_404(running_daemon, method, path):
+    status, body = raw_request(running_daemon, method, path, body=b'{}')
+    assert (status, body['error']) == (404, 'Rota não encontrada')
+
+
+@pytest.mark.parametrize("body", [
+    b'{not json',
+    b'[1, 2]',
+    b'"https://youtu.be/dQw4w9WgXcQ"',
+    b'{}',
+    json.dumps({'url': 123}).encode(),
+    json.dumps({'url': VIDEO, 'format': 'xyz'}).encode(),
+    json.dumps({'url': VIDEO, 'format': ['mp3']}).encode(),
+    json.dumps({'url': 'https://example.com/video'}).encode(),
+])
+def test_invalid_submissions_return_400_and_queue_nothing(running_daemon, body):
+    status, payload = raw_request(running_daemon, 'POST', '/jobs', body=body)
+    assert status == 400
+    assert payload['error']
+    assert running_daemon.jobs() == []
+
+
+def test_job_goes_from_queued_through_running_to_success(running_daemon, client):
+    running_daemon.engine.gate.clear()
+    job = client.submit(VIDEO, 'mp3', '320')
+    assert job['status'] == 'queued'
+
+    assert wait_for(lambda: client.job(job['id'])['status'] == 'running')
+    assert client.job(job['id'])['started'] is not None
+
+    running_daemon.engine.gate.set()
+    finished = next(client.iter_finished([job['id']], poll_interval=0.01))
+    assert finished['status'] == 'success'
+    assert finished['finished'] >= finished['started']
+
+
+def test_job_status_follows_engine_result(running_daemon, client):
+    engine = running_daemon.engine
+    engine.results[PLAYLIST] = {'success': True, 'status': 'partial', 'successful': 1, 'total': 2}
+    engine.results[VIDEO] = {'success': False, 'status': 'failed', 'error': 'Vídeo indisponível'}
+    partial = client.submit(PLAYLIST, 'mp3', '320')
+    failed = client.submit(VIDEO, 'ogg', '192')
+
+    jobs = {job['id']: job for job in client.iter_finished([partial['id'], failed['id']], poll_interval=0.01)}
+    assert jobs[partial['id']]['status'] == 'partial'
+    assert (jobs[failed['id']]['status'], jobs[failed['id']]['error']) == ('failed', 'Vídeo indisponível')
+
+
+def test_engine_exception_marks_job_failed(running_daemon, client):
+    running_daemon.engine.results[VIDEO] = RuntimeError("boom")
+    job = client.submit(VIDEO, 'mp3', '320')
+    finished = next(client.iter_finished([job['id']], poll_interval=0.01))
+    assert (finished['status'], finished['error']) == ('failed', 'boom')
+
+
+def test_iter_batch_keeps_submissions_within_window(running_daemon, client, monkeypatch):
+    urls = [f"https://www.youtube.com/watch?v=video{n:06d}" for n in range(7)]
+    in_flight, peak = set(), [0]
+    submit = client.submit
+
+    def tracking_submit(url, format_type, quality):
+        job = submit(url, format_type, quality)
+        in_flight.add(job['id'])
+        peak[0] = max(peak[0], len(in_flight))
+        return job
+
+    monkeypatch.setattr(client, 'submit', tracking_submit)
+    finished = []
+    for job in client.iter_batch(iter(urls), 'mp3', '320', window=3, poll_interval=0.01):
+        in_flight.discard(job['id'])
+        finished.append(job)
+
+    assert sorted(job['url'] for job in finished) == urls
+    assert peak[0] <= 3
+
+
+def test_iter_batch_polls_with_one_request_per_tick(running_daemon, client, monkeypatch):
+    requests = []
+    original = client._request
+    monkeypatch.setattr(client, '_request', lambda method, path, payload=None: (
+        requests.append((method, path.split('?')[0])), original(method, path, payload))[1])
+
+    running_daemon.engine.gate.clear()
+    urls = [f"https://www.youtube.com/watch?v=video{n:06d}" for n in range(4)]
+    batch = client.iter_batch(iter(urls), 'mp3', '320', window=4, poll_interval=0.01)
+    threading.Timer(0.1, running_daemon.engine.gate.set).start()
+    assert len(list(batch)) == 4
+
+    polls = [r for r in requests if r[0] == 'GET']
+    assert all(path == '/jobs' for _, path in polls)
+    assert len([r for r in requests if r[0] == 'POST']) == 4
+
+
+def test_iter_batch_turns_rejected_urls_into_failed_jobs(client):
+    jobs = list(client.iter_batch(iter([VIDEO, 'https://example.com/x']), 'mp3', '320', window=2, poll_interval=0.01))
+    assert sorted(job['status'] for job in jobs) == ['failed', 'success']
+
+
+def test_prune_keeps_finished_jobs_no_client_has_collected(running_daemon, client, monkeypatch):
+    monkeypatch.setattr(daemon_module, 'MAX_FINISHED_JOBS', 1)
+    first = client.submit(VIDEO, 'mp3', '320')
+    assert wait_for(lambda: running_daemon.jobs()[0]['status'] == 'success')
+    second = client.submit(PLAYLIST, 'mp3', '320')
+    assert wait_for(lambda: all(job['status'] == 'success' for job in running_daemon.jobs()))
+
+    # Nenhum dos dois foi entregue ainda: o lote que espera por eles não pode perdê-los
+    client.submit("https://youtu.be/aaaaaaaaaaa", 'mp3', '320')
+    assert {first['id'], second['id']} <= {job['id'] for job in running_daemon.jobs()}
+
+    # Depois de entregues, o excedente é descartado
+    client.jobs([first['id'], second['id']])
+    client.submit("https://youtu.be/bbbbbbbbbbb", 'mp3', '320')
+    remaining = {job['id'] for job in running_daemon.jobs()}
+    assert first['id'] not in remaining
+
+
+def test_prune_drops_uncollected_jobs_after_ttl(running_daemon, client, monkeypatch):
+    monkeypatch.setattr(daemon_module, 'MAX_FINISHED_JOBS', 0)
+    job = client.submit(VIDEO, 'mp3', '320')
+    assert wait_for(lambda: running_daemon.jobs()[0]['status'] == 'success')
+    monkeypatch.setattr(daemon_module, 'UNCOLLECTED_JOB_TTL', -1)
+    client.submit(PLAYLIST, 'mp3', '320')
+    assert job['id'] not in {j['id'] for j in running_daemon.jobs()}
+
+
+def test_iter_finished_reports_jobs_the_daemon_no_longer_has(client):
+    job = next(client.iter_finished(['gone'], poll_interval=0.01))
+    assert (job['id'], job['status']) == ('gone', 'failed')
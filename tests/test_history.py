@@ -0,0 +1,360 @@
+import json
+import multiprocessing
+import threading
+from datetime import datetime
+
+import pytest
+
+from yt_download import history as history_module
+from yt_download.config import get_config_dir, LEGACY_HISTORY_FILE
+from yt_download.history import DownloadHistory
+from yt_download.history_index import parse_search_query
+
+
+THIS_MONTH = datetime.now().strftime('%Y-%m')
+
+
+def entry(n, date=f"{THIS_MONTH}-01T12:00:00", size=1.5, duration=3.0, fmt="mp3"):
+    return {'title': f'Faixa {n}', 'date': date, 'duration_minutes': duration, 'file_size_mb': size,
+            'format': fmt, 'quality': '320', 'url': f'https://www.youtube.com/watch?v=vid{n:08d}'}
+
+
+def write_lines(history, entries, tail=""):
+    with open(history.history_file, 'a', encoding='utf-8') as f:
+        for item in entries:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        f.write(tail)
+
+
+def test_get_recent_reads_only_the_tail(monkeypatch):
+    monkeypatch.setattr(history_module, 'TAIL_BLOCK_SIZE', 256)  # Força várias leituras de bloco
+    history = DownloadHistory()
+    write_lines(history, [entry(n) for n in range(200)])
+
+    recent = history.get_recent(5)
+    assert [item['title'] for item in recent] == [f'Faixa {n}' for n in range(195, 200)]
+    assert history._history is None
+
+
+def test_get_recent_skips_a_line_still_being_written():
+    history = DownloadHistory()
+    write_lines(history, [entry(n) for n in range(3)], tail='{"title": "Faixa inc')
+
+    assert [item['title'] for item in history.get_recent(2)] == ['Faixa 1', 'Faixa 2']
+
+
+def test_get_recent_uses_loaded_history_and_new_downloads():
+    history = DownloadHistory()
+    write_lines(history, [entry(n) for n in range(3)])
+    assert len(history.history) == 3
+
+    history.add_download("Nova", 180, 2 * 1024 * 1024, "mp3", "320", "https://youtu.be/abcdefghijk")
+    assert [item['title'] for item in history.get_recent(2)] == ['Faixa 2', 'Nova']
+    assert history.get_recent(0) == []
+
+
+def mixed_months():
+    return ([entry(n, date="2024-01-15T10:00:00", size=1.0, fmt="mp3") for n in range(3)]
+            + [entry(n, date="2024-02-20T10:00:00", size=2.0, fmt="flac") for n in range(3, 5)]
+            + [entry(n, size=4.0) for n in range(5, 7)])
+
+
+def test_stats_count_lines_appended_by_other_writers_once():
+    history = DownloadHistory()
+    write_lines(history, [entry(n) for n in range(3)])
+    assert history.get_stats()['total_downloads'] == 3
+
+    write_lines(history, [entry(3)], tail='{"title": "Faixa inc')
+    stats = history.get_stats()
+    assert stats['total_downloads'] == 4
+    assert history._read_stats()['offset'] < history.history_file.stat().st_size
+
+    with open(history.history_file, 'a', encoding='utf-8') as f:
+        f.write('ompleta", "file_size_mb": 1.0}\n')
+    assert history.get_stats()['total_downloads'] == 5
+    assert history.get_stats()['total_downloads'] == 5
+
+
+def test_stats_survive_rotation_and_compaction():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    before = history.get_stats()
+    assert before['total_downloads'] == 7
+    assert before['by_format']['flac']['count'] == 2
+
+    result = history.compact()
+    assert result['archived_entries'] == 5
+    assert result['active_entries'] == 2
+    assert history._read_stats()['offset'] == history.history_file.stat().st_size
+    assert history.get_stats() == before
+
+    # Downloads depois da rotação somam sobre os agregados já arquivados
+    history.add_download("Nova", 120, 1024 * 1024, "mp3", "320", "https://youtu.be/abcdefghijk")
+    after = history.get_stats()
+    assert after['total_downloads'] == 8
+    assert after['first_download'] == before['first_download']
+
+
+def test_stats_recount_from_archive_when_active_file_is_truncated():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.compact()
+
+    open(history.history_file, 'w').close()  # Arquivo ativo apagado por fora
+    stats = history.get_stats()
+    assert stats['total_downloads'] == 5
+    assert stats['total_size_mb'] == 7.0
+
+
+def test_reset_history_clears_stats_and_archive():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.compact()
+    history.reset_history()
+
+    assert history.get_stats() == {'total_downloads': 0}
+    assert history.archive.segments() == []
+
+
+def test_parse_search_query_splits_text_and_filters():
+    assert parse_search_query("lofi mix from:2024-01-01 até:2024-01-31 size>5 size<=20 format:FLAC") == {
+        'query': 'lofi mix', 'date_from': '2024-01-01', 'date_to': '2024-01-31',
+        'min_size': 5.0, 'max_size': 20.0, 'format': 'flac',
+    }
+    assert parse_search_query("")['query'] is None
+
+
+def searchable_history():
+    history = DownloadHistory()
+    write_lines(history, [
+        dict(entry(1, date="2024-01-10T08:00:00", size=3.0), title="Canção do Mar"),
+        dict(entry(2, date="2024-01-31T23:00:00", size=12.0, fmt="flac"), title="Lofi Mix 2024"),
+        dict(entry(3, date="2024-02-01T09:00:00", size=25.0), title="Lofi Beats"),
+    ])
+    return history
+
+
+def titles(results):
+    return [item['title'] for item in results]
+
+
+def test_search_matches_word_prefixes_without_accents():
+    history = searchable_history()
+    history.index._connect()
+    if not history.index.fts:
+        pytest.skip("SQLite sem FTS5")
+    assert titles(history.search("cancao")) == ["Canção do Mar"]
+    assert titles(history.search("lof")) == ["Lofi Beats", "Lofi Mix 2024"]
+    assert history.search('"AND OR NEAR(') == []
+
+
+def test_search_by_video_id_and_filters():
+    history = searchable_history()
+    assert titles(history.search("vid00000002")) == ["Lofi Mix 2024"]
+    assert titles(history.search(date_from="2024-01-01", date_to="2024-01-31")) == ["Lofi Mix 2024", "Canção do Mar"]
+    assert titles(history.search("lofi", min_size=10, max_size=20)) == ["Lofi Mix 2024"]
+    assert titles(history.search(format="flac")) == ["Lofi Mix 2024"]
+    assert titles(history.search(limit=1)) == ["Lofi Beats"]
+
+
+def test_index_only_reads_new_lines():
+    history = searchable_history()
+    assert len(history.search("lofi")) == 2
+    assert history.index.sync() == 0
+
+    write_lines(history, [dict(entry(4), title="Lofi Rain")])
+    assert history.index.sync() == 1
+    assert "Lofi Rain" in titles(history.search("lofi"))
+
+
+def test_index_search_leaves_syncing_to_the_locked_history_search(monkeypatch):
+    history = searchable_history()
+    assert len(history.search("lofi")) == 2
+    write_lines(history, [dict(entry(4), title="Lofi Rain")])
+    assert "Lofi Rain" not in titles(history.index.search("lofi"))
+
+    locked = []
+    real_lock = history_module._process_lock
+
+    def tracking_lock(path):
+        locked.append(path)
+        return real_lock(path)
+    monkeypatch.setattr(history_module, '_process_lock', tracking_lock)
+    assert "Lofi Rain" in titles(history.search("lofi"))
+    assert locked == [history.lock_file]
+
+
+def test_rotation_writes_monthly_segments_described_by_the_manifest():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.compact()
+
+    segments = history.archive.segments()
+    assert [s['month'] for s in segments] == ['2024-01', '2024-02']
+    assert [s['file'] for s in segments] == ['2024-01.jsonl.gz', '2024-02.jsonl.gz']
+    january = segments[0]['summary']
+    assert (january['count'], january['total_size_mb']) == (3, 3.0)
+    assert january['by_format'] == {'mp3': {'count': 3, 'size_mb': 3.0, 'duration_minutes': 9.0}}
+    assert history.archive.metrics()['entries'] == 5
+    assert [item['title'] for item in history.archive.read_segment(segments[1])] == ['Faixa 3', 'Faixa 4']
+
+
+def test_late_lines_for_an_archived_month_append_a_member_until_compaction():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.compact()
+    write_lines(history, [entry(9, date="2024-01-31T22:00:00", size=1.0)])
+
+    first = history.compact()
+    january = history.archive.segments()[0]
+    assert first['archived_entries'] == 1
+    assert first['recompressed_segments'] == 1
+    assert (january['members'], january['summary']['count']) == (1, 4)
+    assert len(history.archive.read_segment(january)) == 4
+    assert history.get_stats()['total_downloads'] == 8
+
+
+def test_archived_entries_stay_visible_to_recent_history_and_search():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.compact()
+    assert not history.index.index_file.exists()
+
+    assert [item['title'] for item in history.get_recent(4)] == ['Faixa 3', 'Faixa 4', 'Faixa 5', 'Faixa 6']
+    assert len(DownloadHistory().history) == 7
+    # Índice criado depois da rotação: reconstruído a partir dos segmentos
+    assert sorted(titles(history.search("faixa", limit=-1))) == [f"Faixa {n}" for n in range(7)]
+
+
+def test_truncated_segment_keeps_what_was_readable():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.compact()
+    segment = history.archive.segments()[0]
+    path = history.archive.directory / segment['file']
+    path.write_bytes(path.read_bytes()[:-8])
+
+    assert len(history.archive.read_segment(segment)) <= 3
+
+
+def test_stats_come_from_the_archive_when_the_active_file_is_missing():
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.compact()
+    history.history_file.unlink()
+
+    stats = DownloadHistory().get_stats()
+    assert stats['total_downloads'] == 5
+    assert stats['by_format']['flac']['count'] == 2
+
+
+class Crash(Exception):
+    pass
+
+
+def test_rotation_interrupted_before_rewriting_the_active_file_is_finished_on_restart(monkeypatch):
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+    history.get_stats()
+
+    def crash(self, stats):
+        if self.archive.pending_rotation() is not None:
+            raise Crash  # Cai logo depois de confirmar os segmentos
+    with monkeypatch.context() as patch, pytest.raises(Crash):
+        patch.setattr(DownloadHistory, '_finish_rotation', crash)
+        history.compact()
+    assert len(history.history_file.read_text(encoding='utf-8').splitlines()) == 7
+
+    restarted = DownloadHistory()
+    write_lines(restarted, [entry(7)])
+    result = restarted.compact()
+
+    assert result['archived_entries'] == 0
+    assert restarted.archive.pending_rotation() is None
+    assert restarted.archive.metrics()['entries'] == 5
+    assert [len(restarted.archive.read_segment(s)) for s in restarted.archive.segments()] == [3, 2]
+    assert sorted(item['title'] for item in restarted.get_recent(10)) == [f'Faixa {n}' for n in range(8)]
+    assert restarted.get_stats()['total_downloads'] == 8
+    assert len(DownloadHistory().history) == 8
+
+
+def test_segment_bytes_not_confirmed_by_the_manifest_are_discarded(monkeypatch):
+    history = DownloadHistory()
+    write_lines(history, mixed_months())
+
+    def crash(self, segments, rotation=None):
+        raise Crash  # Cai depois de gravar os .jsonl.gz, antes do manifesto
+    with monkeypatch.context() as patch, pytest.raises(Crash):
+        patch.setattr(history_module.HistoryArchive, '_write_manifest', crash)
+        history.compact()
+    assert history.archive.segments() == []
+
+    restarted = DownloadHistory()
+    assert restarted.compact()['archived_entries'] == 5
+    assert [len(restarted.archive.read_segment(s)) for s in restarted.archive.segments()] == [3, 2]
+    assert restarted.get_stats()['total_downloads'] == 7
+
+
+def test_legacy_json_history_is_migrated_once_and_kept_as_migrated():
+    get_config_dir().mkdir()
+    legacy = get_config_dir() / LEGACY_HISTORY_FILE
+    legacy.write_text(json.dumps([entry(0), entry(1)]), encoding='utf-8')
+
+    history = DownloadHistory()
+    assert [item['title'] for item in history.history] == ['Faixa 0', 'Faixa 1']
+    assert not legacy.exists()
+    migrated = legacy.with_name(legacy.name + ".migrated")
+    assert json.loads(migrated.read_text(encoding='utf-8'))[1]['title'] == 'Faixa 1'
+
+    # Um JSON antigo que reaparece não é migrado de novo por cima do JSONL
+    history.add_download("Nova", 60, 0, "mp3", "320", "https://youtu.be/abcdefghijk")
+    legacy.write_text(json.dumps([entry(9)]), encoding='utf-8')
+    assert [item['title'] for item in DownloadHistory().history] == ['Faixa 0', 'Faixa 1', 'Nova']
+    assert legacy.exists()
+
+
+def test_corrupt_legacy_history_migrates_to_an_empty_history():
+    get_config_dir().mkdir()
+    legacy = get_config_dir() / LEGACY_HISTORY_FILE
+    legacy.write_text('[{"title": "cortado', encoding='utf-8')
+
+    assert DownloadHistory().history == []
+    assert legacy.with_name(legacy.name + ".migrated").exists()
+
+
+def _append_many(worker, count):
+    history = DownloadHistory()
+    for n in range(count):
+        # Linhas maiores que PIPE_BUF: sem o lock, escritas concorrentes se intercalariam
+        history.add_download(f"w{worker}-{n}-" + "x" * 5000, 60, 1024 * 1024, "mp3", "320",
+                             f"https://youtu.be/w{worker:02d}n{n:05d}")
+
+
+def assert_complete_history(history, workers, count):
+    lines = history.history_file.read_text(encoding='utf-8').splitlines()
+    names = [json.loads(line)['title'].split('-x')[0] for line in lines]  # Falha se alguma linha estiver rasgada
+    assert sorted(names) == sorted(f"w{w}-{n}" for w in range(workers) for n in range(count))
+    assert history.get_stats()['total_downloads'] == workers * count
+
+
+def test_concurrent_appends_from_threads_are_not_torn_or_lost():
+    threads = [threading.Thread(target=_append_many, args=(worker, 25)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_complete_history(DownloadHistory(), 8, 25)
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="precisa de fork")
+def test_concurrent_appends_from_processes_are_not_torn_or_lost():
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_append_many, args=(worker, 25)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    assert [process.exitcode for process in processes] == [0] * 4
+
+    assert_complete_history(DownloadHistory(), 4, 25)
@@ -0,0 +1,102 @@
+from yt_download.journal import PlaylistJournal, STATE_DONE, STATE_FAILED
+
+URL = "https://www.youtube.com/playlist?list=PLtest"
+INFO = {'id': 'PLtest', 'title': 'Teste'}
+
+
+def flat(n):
+    return {'_type': 'url', 'ie_key': 'Youtube', 'id': f'vid{n}', 'url': f'https://www.youtube.com/watch?v=vid{n}',
+            'title': f'Faixa {n}'}
+
+
+def partial_run(entries, done=(), stop_after=None):
+    """Percorre a listagem marcando ``done`` como concluídas; ``stop_after`` simula um Ctrl-C."""
+    journal = PlaylistJournal.open(URL, INFO, 'mp3', '320')
+    for count, entry in enumerate(journal.track(entries), 1):
+        if entry['id'] in done:
+            journal.mark(entry, STATE_DONE)
+        if count == stop_after:
+            break
+    journal.close()
+    return journal
+
+
+def test_resumed_job_skips_entries_already_done():
+    entries = [flat(n) for n in range(1, 5)]
+    partial_run(entries, done={'vid1', 'vid2'}, stop_after=3)
+
+    journal = PlaylistJournal.open(URL, INFO, 'mp3', '320')
+    assert journal.resumed
+    assert not journal.listing_complete
+    assert [e['id'] for e in journal.track(entries)] == ['vid3', 'vid4']
+    assert journal.skipped == 2
+    assert journal.counts() == {'total': 4, 'done': 2, 'failed': 0, 'pending': 2}
+
+
+def test_interrupted_job_replays_pending_entries_without_extraction():
+    partial_run([flat(n) for n in range(1, 4)], done={'vid1'})
+
+    journal = PlaylistJournal.find(URL, 'mp3', '320')
+    assert journal.listing_complete and journal.interrupted
+    info = journal.listing_info()
+    assert (info['id'], info['playlist_count']) == ('PLtest', 3)
+    assert [e['id'] for e in info['entries']] == ['vid2', 'vid3']
+
+
+def test_truncated_last_line_is_ignored():
+    journal = partial_run([flat(1), flat(2)], done={'vid1'})
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "entry", "key": "vid2", "sta')
+
+    reopened = PlaylistJournal(journal.path)
+    assert reopened.counts() == {'total': 2, 'done': 1, 'failed': 0, 'pending': 1}
+
+
+def test_resolved_entry_marks_its_flat_listing_entry():
+    journal = PlaylistJournal.open(URL, INFO, 'mp3', '320')
+    list(journal.track([flat(1)]))
+    journal.mark({'id': 'other-id', 'webpage_url': 'https://www.youtube.com/watch?v=vid1'}, STATE_DONE)
+    assert journal.counts()['done'] == 1
+    journal.close()
+
+
+def test_job_with_only_permanent_failures_is_finished_and_removed():
+    journal = PlaylistJournal.open(URL, INFO, 'mp3', '320')
+    for entry in journal.track([flat(1), flat(2)]):
+        if entry['id'] == 'vid1':
+            journal.mark(entry, STATE_DONE)
+        else:
+            journal.mark(entry, STATE_FAILED, "HTTP Error 404: Not Found", permanent=True)
+    assert journal.finished and not journal.interrupted
+    journal.close()
+
+    assert not journal.path.exists()
+    assert PlaylistJournal.find(URL, 'mp3', '320') is None
+
+
+def test_job_with_transient_failures_is_kept_but_not_replayed():
+    journal = PlaylistJournal.open(URL, INFO, 'mp3', '320')
+    for entry in journal.track([flat(1), flat(2)]):
+        if entry['id'] == 'vid1':
+            journal.mark(entry, STATE_DONE)
+        else:
+            journal.mark(entry, STATE_FAILED, "HTTP Error 503", permanent=False)
+    journal.close()
+
+    found = PlaylistJournal.find(URL, 'mp3', '320')
+    assert found is not None and not found.finished and not found.interrupted
+
+    # Um rerun extrai de novo: entradas novas entram e só a concluída é pulada
+    resumed = PlaylistJournal.open(URL, INFO, 'mp3', '320')
+    assert [e['id'] for e in resumed.track([flat(1), flat(2), flat(3)])] == ['vid2', 'vid3']
+    resumed.close()
+
+
+def test_different_format_starts_a_new_job():
+    partial_run([flat(1), flat(2)], done={'vid1'})
+    assert PlaylistJournal.find(URL, 'flac', 'best') is None
+
+    journal = PlaylistJournal.open(URL, INFO, 'flac', 'best')
+    assert not journal.resumed
+    assert journal.counts()['total'] == 0
+    journal.close()
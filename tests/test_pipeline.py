@@ -0,0 +1,248 @@
+import threading
+import time
+
+import pytest
+
+from yt_download import pipeline
+from yt_download.pipeline import BoundedExecutor, YoutubeDLCache, TokenBucket, ConcurrencyController, parse_rate
+
+
+def test_bounded_executor_blocks_submit_when_queue_is_full():
+    release = threading.Event()
+    executor = BoundedExecutor(max_workers=1, queue_size=1)
+    try:
+        executor.submit(release.wait)
+        executor.submit(release.wait)
+
+        submitted = threading.Event()
+        threading.Thread(target=lambda: (executor.submit(lambda: None), submitted.set()), daemon=True).start()
+        assert not submitted.wait(0.2)
+
+        release.set()
+        assert submitted.wait(2)
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_bounded_executor_releases_slot_when_task_fails():
+    with BoundedExecutor(max_workers=1, queue_size=0) as executor:
+        failed = executor.submit(lambda: 1 / 0)
+        assert isinstance(failed.exception(timeout=2), ZeroDivisionError)
+
+        start = time.monotonic()
+        assert executor.submit(lambda: 42).result(timeout=2) == 42
+        assert time.monotonic() - start < 1
+
+
+class FakeYDL:
+    def __init__(self, opts):
+        self.opts = opts
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_ydl_cache_reuses_instance_per_thread_and_options():
+    with YoutubeDLCache(FakeYDL) as cache:
+        first = cache.get({'format': 'bestaudio', 'quiet': True})
+        assert cache.get({'quiet': True, 'format': 'bestaudio'}) is first
+        assert cache.get({'format': 'best'}) is not first
+
+        other_thread = []
+        thread = threading.Thread(target=lambda: other_thread.append(cache.get({'format': 'bestaudio', 'quiet': True})))
+        thread.start()
+        thread.join()
+        assert other_thread[0] is not first
+
+        metrics = cache.metrics()
+    assert (metrics['created'], metrics['reused']) == (3, 1)
+    assert 'saved_seconds' not in metrics
+    assert first.closed and other_thread[0].closed
+
+
+def test_ydl_cache_key_survives_factory_mutating_options():
+    def mutating_factory(opts):
+        opts['postprocessors'] = []
+        return FakeYDL(opts)
+
+    options = {'format': 'bestaudio'}
+    with YoutubeDLCache(mutating_factory) as cache:
+        ydl = cache.get(options)
+        assert options == {'format': 'bestaudio'}
+        assert cache.get(options) is ydl
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1.5M", 1572864),
+    ("500K", 512000),
+    ("500k", 512000),
+    ("2MiB/s", 2 * 1024 ** 2),
+    (" 1G ", 1024 ** 3),
+    ("1048576", 1048576),
+    (1048576, 1048576),
+    (None, None),
+    ("", None),
+    ("0", None),
+])
+def test_parse_rate(value, expected):
+    assert parse_rate(value) == expected
+
+
+@pytest.mark.parametrize("value", ["abc", "-1M", "1.5X", "M", -5])
+def test_parse_rate_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_rate(value)
+
+
+def test_token_bucket_serves_burst_then_sleeps_off_the_debt(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(pipeline.time, 'sleep', sleeps.append)
+    bucket = TokenBucket(rate=1000)
+
+    assert bucket.consume(1000) == 0
+    wait = bucket.consume(500)
+    assert wait == pytest.approx(0.5, abs=0.05)
+    assert sleeps == [wait]
+
+    metrics = bucket.metrics()
+    assert (metrics['consumed_bytes'], metrics['throttled']) == (1500, 1)
+
+
+def test_token_bucket_is_shared_between_threads(monkeypatch):
+    monkeypatch.setattr(pipeline.time, 'sleep', lambda seconds: None)
+    bucket = TokenBucket(rate=1000, burst=1000)
+    waits = []
+    threads = [threading.Thread(target=lambda: waits.append(bucket.consume(500))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Os dois primeiros gastam o saldo; os seguintes esperam a dívida acumulada (0,5 s e 1 s)
+    assert sorted(waits)[:2] == [0, 0]
+    assert sum(waits) == pytest.approx(0.5 + 1.0, abs=0.1)
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+@pytest.mark.parametrize("value", ["0", "0K", "abc"])
+def test_cli_limit_rate_rejects_zero_and_invalid_values(value, capsys):
+    from yt_download.main import create_parser
+
+    with pytest.raises(SystemExit):
+        create_parser().parse_args(['--limit-rate', value])
+    assert '--limit-rate' in capsys.readouterr().err
+
+
+def test_cli_limit_rate_parses_units():
+    from yt_download.main import create_parser
+
+    assert create_parser().parse_args(['--limit-rate', '2M']).limit_rate == 2 * 1024 ** 2
+    assert create_parser().parse_args([]).limit_rate is None
+
+
+def test_throttle_offsets_are_consistent_across_worker_threads(tmp_path, monkeypatch):
+    from yt_download.downloader import YTDownloader
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pipeline.time, 'sleep', lambda seconds: None)
+    downloader = YTDownloader(config={'rate_limit': '1M'})
+    consumed = []
+    monkeypatch.setattr(downloader.rate_limiter, 'consume', consumed.append)
+
+    def worker(n):
+        for downloaded in range(1000, 50_001, 1000):
+            downloader._throttle({'status': 'downloading', 'filename': f'f{n}', 'downloaded_bytes': downloaded})
+        downloader._throttle({'status': 'finished', 'filename': f'f{n}', 'downloaded_bytes': 50_000})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Cada byte debitado exatamente uma vez, e nenhum offset sobra ao fim
+    assert sum(consumed) == 8 * 50_000
+    assert downloader._throttle_offsets == {}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(pipeline.time, 'monotonic', clock)
+    return clock
+
+
+def make_controller(initial=4):
+    downloaded = [0]
+    controller = ConcurrencyController(lambda: downloaded[0], initial=initial, max_limit=8, window=2.0)
+    return controller, downloaded
+
+
+def test_concurrency_keeps_limit_until_window_expires(clock):
+    controller, downloaded = make_controller()
+    downloaded[0] = 10_000_000
+    clock.now += 1.0
+    assert controller.update() == 4
+
+
+def test_concurrency_halves_on_throttling(clock):
+    controller, _ = make_controller()
+    controller.record_error(Exception("ERROR: HTTP Error 429: Too Many Requests"))
+    for _ in range(9):
+        controller.record_success()
+    clock.now += 2.0
+    assert controller.update() == 2
+    assert controller.metrics()['adjustments'][0]['from'] == 4
+
+
+def test_concurrency_ignores_429_inside_ids_and_titles(clock):
+    controller, _ = make_controller()
+    controller.record_error(Exception("Falha ao baixar 'Track 429' (id abc429xyz): HTTP Error 503"))
+    for _ in range(9):
+        controller.record_success()
+    clock.now += 2.0
+    assert controller.update() == 4
+
+
+def test_concurrency_halves_on_high_error_rate(clock):
+    controller, _ = make_controller()
+    controller.record_error(Exception("connection reset"))
+    controller.record_success()
+    clock.now += 2.0
+    assert controller.update() == 2
+
+
+def test_concurrency_adds_worker_while_throughput_rises_and_reverts_on_drop(clock):
+    controller, downloaded = make_controller(initial=2)
+    downloaded[0] += 2_000_000
+    clock.now += 2.0
+    assert controller.update() == 3
+
+    downloaded[0] += 4_000_000
+    clock.now += 2.0
+    assert controller.update() == 4
+
+    downloaded[0] += 1_000_000
+    clock.now += 2.0
+    assert controller.update() == 3
+
+
+def test_concurrency_respects_bounds(clock):
+    controller, _ = make_controller(initial=1)
+    controller.record_error(Exception("HTTP Error 429"))
+    clock.now += 2.0
+    assert controller.update() == 1
@@ -0,0 +1,67 @@
+import io
+
+from rich.console import Console
+
+from yt_download.cli import ProgressDashboard
+from yt_download.progress import (ProgressAggregator, ProgressMessageAdapter, make_event, STAGE_DOWNLOADING,
+                                  STAGE_DOWNLOADED, STAGE_FINISHED, STAGE_FAILED)
+
+
+def test_aggregator_counts_finished_tasks_and_estimates_remaining_bytes():
+    progress = ProgressAggregator(total_tasks=3)
+    progress.update(make_event('a', STAGE_DOWNLOADING, 'A', 100, 100))
+    progress.update(make_event('a', STAGE_FINISHED, 'A'))
+    progress.update(make_event('b', STAGE_DOWNLOADING, 'B', 50, 100))
+
+    snapshot = progress.snapshot()
+    assert (snapshot['completed'], snapshot['failed'], snapshot['active']) == (1, 0, 1)
+    assert snapshot['downloaded_bytes'] == 150
+    # 50 bytes restantes de "b" + uma tarefa ainda não iniciada do tamanho médio (100)
+    assert snapshot['total_bytes'] == 300
+    assert snapshot['percent'] == 50
+
+
+def test_aggregator_keeps_total_bytes_when_hook_omits_it():
+    progress = ProgressAggregator()
+    progress.update(make_event('a', STAGE_DOWNLOADING, 'A', 10, 100))
+    progress.update(make_event('a', STAGE_DOWNLOADING, 'A', 20))
+    assert progress.snapshot()['tasks'][0]['total_bytes'] == 100
+
+
+def test_aggregator_add_total_sums_concurrent_jobs():
+    progress = ProgressAggregator()
+    progress.add_total(3)
+    progress.add_total(2)
+    progress.update(make_event('a', STAGE_FAILED, 'A'))
+    snapshot = progress.snapshot()
+    assert (snapshot['total_tasks'], snapshot['failed']) == (5, 1)
+
+
+def test_message_adapter_rate_limits_downloading_messages():
+    messages = []
+    adapter = ProgressMessageAdapter(messages.append, ProgressAggregator(), min_interval=60)
+    adapter._last_emit = float('-inf')  # Primeira mensagem sai mesmo com o relógio monotônico perto de zero
+    for downloaded in range(10, 100, 10):
+        adapter(make_event('a', STAGE_DOWNLOADING, 'A', downloaded, 100))
+    adapter(make_event('a', STAGE_DOWNLOADED, 'A', 100, 100))
+
+    assert len(messages) == 2
+    assert messages[-1] == "Download concluído, processando áudio..."
+
+
+def test_dashboard_renders_one_row_per_active_task():
+    progress = ProgressAggregator(total_tasks=2)
+    dashboard = ProgressDashboard(Console(file=io.StringIO(), width=120), progress)
+    progress.update(make_event('a', STAGE_DOWNLOADING, 'Faixa A', 10, 100))
+    progress.update(make_event('b', STAGE_DOWNLOADING, 'Faixa B', 20, 100))
+
+    dashboard._render()
+    assert set(dashboard._rows) == {'a', 'b'}
+
+    progress.update(make_event('a', STAGE_FINISHED, 'Faixa A'))
+    dashboard.set_status("Playlist: 1/2 concluídos")
+    output = Console(file=io.StringIO(), width=120)
+    output.print(dashboard._render())
+    assert set(dashboard._rows) == {'b'}
+    assert "Faixa B" in output.file.getvalue()
+    assert "Playlist: 1/2 concluídos" in output.file.getvalue()
@@ -0,0 +1,97 @@
+import io
+
+import pytest
+from yt_dlp.networking.common import Response
+from yt_dlp.networking.exceptions import HTTPError
+from yt_dlp.utils import DownloadError, ExtractorError
+
+from yt_download import retry
+from yt_download.retry import (RetryScheduler, classify_error, error_class, is_throttle_error, backoff_delay,
+                               ERROR_PERMANENT, ERROR_TRANSIENT)
+
+
+def http_error(status):
+    return HTTPError(Response(io.BytesIO(b''), 'https://example.com/v', {}, status=status))
+
+
+def wrapped(error):
+    """Como o yt-dlp entrega a falha: um DownloadError com a exceção original em exc_info."""
+    return DownloadError(f"ERROR: {error}", (type(error), error, None))
+
+
+@pytest.mark.parametrize("error, expected", [
+    (DownloadError("ERROR: [youtube] abc: HTTP Error 404: Not Found"), ERROR_PERMANENT),
+    (DownloadError("ERROR: [youtube] abc: Private video. Sign in if you've been granted access"), ERROR_PERMANENT),
+    (wrapped(ExtractorError("Video unavailable", expected=True)), ERROR_PERMANENT),
+    (wrapped(http_error(404)), ERROR_PERMANENT),
+    (DownloadError("ERROR: HTTP Error 429: Too Many Requests"), ERROR_TRANSIENT),
+    (wrapped(http_error(429)), ERROR_TRANSIENT),
+    (DownloadError("ERROR: unable to download video data: HTTP Error 503: Service Unavailable"), ERROR_TRANSIENT),
+    (wrapped(http_error(500)), ERROR_TRANSIENT),
+    (DownloadError("ERROR: unable to download video data: HTTP Error 403: Forbidden"), ERROR_TRANSIENT),
+    (ConnectionResetError("Connection reset by peer"), ERROR_TRANSIENT),
+    (wrapped(ExtractorError("Unexpected response", expected=False)), ERROR_TRANSIENT),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_error_class_unwraps_download_error():
+    assert error_class(wrapped(http_error(429))) == 'HTTPError'
+    assert error_class(ValueError("x")) == 'ValueError'
+
+
+@pytest.mark.parametrize("error, expected", [
+    (wrapped(http_error(429)), True),
+    (DownloadError("ERROR: HTTP Error 429: Too Many Requests"), True),
+    (Exception("The current session has been rate-limited by YouTube for up to an hour"), True),
+    (wrapped(http_error(503)), False),
+    (Exception("Track 429 (id abc429xyz): 1429 bytes"), False),
+])
+def test_is_throttle_error(error, expected):
+    assert is_throttle_error(error) is expected
+
+
+def test_backoff_delay_grows_with_jitter_and_cap():
+    for attempt in range(1, 8):
+        ceiling = min(30.0, 2 ** (attempt - 1))
+        assert ceiling / 2 <= backoff_delay(attempt) <= ceiling
+
+
+def test_scheduler_stops_once_retries_are_exhausted():
+    scheduler = RetryScheduler(max_retries=2)
+    error = ConnectionResetError("reset")
+
+    assert scheduler.schedule('entry', 1, error) is not None
+    assert scheduler.schedule('entry', 2, error) is not None
+    assert scheduler.schedule('entry', 3, error) is None
+
+    metrics = scheduler.metrics()
+    assert (metrics['scheduled'], metrics['exhausted'], metrics['pending']) == (2, 1, 2)
+
+
+def test_scheduler_never_retries_permanent_errors():
+    scheduler = RetryScheduler(max_retries=3)
+    assert scheduler.schedule('entry', 1, DownloadError("ERROR: HTTP Error 404: Not Found")) is None
+    assert not scheduler
+    assert scheduler.metrics()['permanent'] == 1
+
+
+def test_scheduler_releases_entries_when_their_delay_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(retry, 'backoff_delay', lambda attempt, base, cap: attempt * 10.0)
+    scheduler = RetryScheduler(max_retries=3)
+    scheduler.schedule('slow', 2, ConnectionResetError())
+    scheduler.schedule('fast', 1, ConnectionResetError())
+
+    assert scheduler.pop_due() is None
+    assert scheduler.next_delay() == 10.0
+
+    now[0] += 10.0
+    assert scheduler.pop_due() == ('fast', 1)
+    assert scheduler.pop_due() is None
+
+    now[0] += 10.0
+    assert scheduler.pop_due() == ('slow', 2)
+    assert scheduler.next_delay() is None
@@ -0,0 +1,111 @@
+import pytest
+
+from yt_download import url_validator
+from yt_download.url_validator import URLValidator
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+PLAYLIST = "https://www.youtube.com/playlist?list=PL1234567890"
+CANONICAL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("url,clean", [
+    ("https://youtube.com/shorts/dQw4w9WgXcQ?feature=share", "https://youtube.com/shorts/dQw4w9WgXcQ"),
+    ("https://www.youtube.com/live/dQw4w9WgXcQ?si=x", "https://www.youtube.com/live/dQw4w9WgXcQ"),
+    ("https://www.youtube.com/embed/dQw4w9WgXcQ", "https://www.youtube.com/embed/dQw4w9WgXcQ"),
+    ("https://www.youtube.com/v/dQw4w9WgXcQ", "https://www.youtube.com/v/dQw4w9WgXcQ"),
+    ("youtu.be/dQw4w9WgXcQ?si=abc", "https://youtu.be/dQw4w9WgXcQ"),
+    ("https://www.youtube.com/watch?feature=x&v=dQw4w9WgXcQ&t=42s", CANONICAL),
+])
+def test_video_url_shapes_share_the_canonical_watch_url(url, clean):
+    info = URLValidator.validate_and_classify(url)
+    assert info['valid'] and not info['is_playlist']
+    assert (info['video_id'], info['url'], info['canonical_url']) == ('dQw4w9WgXcQ', clean, CANONICAL)
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/shorts/",
+    "https://www.youtube.com/channel/UCxyz",
+    "https://example.com/watch?v=dQw4w9WgXcQ",
+    "",
+    None,
+])
+def test_urls_without_a_youtube_id_are_invalid(url):
+    info = URLValidator.validate_and_classify(url)
+    assert not info['valid'] and info['error']
+
+
+def test_playlist_urls_canonicalize_to_the_playlist():
+    info = URLValidator.validate_and_classify(
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1234567890&index=3&pp=x")
+    assert info['is_playlist']
+    assert info['url'] == "https://m.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1234567890&index=3"
+    assert info['canonical_url'] == PLAYLIST
+    assert URLValidator.validate_and_classify("music.youtube.com/playlist?list=PL1234567890")['canonical_url'] == PLAYLIST
+
+
+def test_dedupe_key_prefers_the_playlist():
+    in_playlist = URLValidator.validate_and_classify(f"{VIDEO}&list=PL1234567890")
+    assert URLValidator.dedupe_key(in_playlist) == ('playlist', 'PL1234567890')
+    assert URLValidator.dedupe_key(URLValidator.validate_and_classify("https://youtu.be/dQw4w9WgXcQ")) == (
+        'video', 'dQw4w9WgXcQ')
+
+
+def test_validate_many_reports_errors_and_duplicates_by_index():
+    batch = URLValidator.validate_many([
+        VIDEO, "https://example.com/x", "https://youtu.be/dQw4w9WgXcQ", PLAYLIST, "",
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa&list=PL1234567890",
+    ])
+    assert [info['index'] for info in batch['valid']] == [0, 3]
+    assert [(e['index'], e['url']) for e in batch['invalid']] == [(1, "https://example.com/x"), (4, "")]
+    assert [(d['index'], d['duplicate_of']) for d in batch['duplicates']] == [(2, 0), (5, 3)]
+    assert batch['stats'] == {'total': 6, 'valid': 2, 'invalid': 2, 'duplicates': 2, 'playlists': 1}
+
+
+def test_benchmark_compares_against_the_legacy_path():
+    result = url_validator.benchmark(200)
+    assert result['stats']['total'] == 200
+    assert result['legacy_seconds'] > 0 and result['speedup'] > 0
+
+
+def test_legacy_path_agrees_on_the_shapes_it_supported():
+    for url in (VIDEO, "https://youtu.be/dQw4w9WgXcQ", "https://www.youtube.com/embed/dQw4w9WgXcQ", PLAYLIST):
+        legacy = url_validator._legacy_classify(url)
+        info = URLValidator.validate_and_classify(url)
+        assert (legacy['video_id'], legacy['playlist_id']) == (info['video_id'], info['playlist_id'])
+
+
+def test_iter_classify_indexes_invalid_and_duplicates_by_input_position():
+    urls = [
+        "https://youtu.be/dQw4w9WgXcQ",
+        "not a url",
+        f"{VIDEO}&t=10",
+        PLAYLIST,
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa&list=PL1234567890",
+        "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+        "",
+    ]
+    records = list(URLValidator.iter_classify(urls))
+
+    assert [record['index'] for record in records] == list(range(len(urls)))
+    assert [record['status'] for record in records] == [
+        'valid', 'invalid', 'duplicate', 'valid', 'duplicate', 'duplicate', 'invalid']
+    assert [record.get('duplicate_of') for record in records if record['status'] == 'duplicate'] == [0, 3, 0]
+    assert records[1]['url'] == "not a url" and records[1]['error']
+
+
+def test_iter_classify_without_dedupe_keeps_repeats():
+    records = list(URLValidator.iter_classify([VIDEO, VIDEO], dedupe=False))
+    assert [record['status'] for record in records] == ['valid', 'valid']
+
+
+def test_iter_classify_is_lazy():
+    consumed = []
+
+    def urls():
+        for url in (VIDEO, PLAYLIST):
+            consumed.append(url)
+            yield url
+
+    records = URLValidator.iter_classify(urls())
+    assert next(records)['video_id'] == 'dQw4w9WgXcQ'
+    assert consumed == [VIDEO]
@@ -0,0 +1,247 @@
+import asyncio
+import concurrent.futures
+import functools
+import os
+from typing import Dict, Any, Optional, Callable, Iterable, AsyncIterable, AsyncIterator, Awaitable, Union
+
+from .downloader import YTDownloader
+from .pipeline import YoutubeDLCache
+from .progress import make_event, STAGE_RETRY_WAIT
+from .retry import classify_error, backoff_delay, ERROR_PERMANENT
+from .url_validator import URLValidator
+
+
+class AsyncYTDownloader:
+    """Motor de download assíncrono, para embutir em serviços asyncio.
+
+    Cada job é uma coroutine; o trabalho bloqueante do yt-dlp roda em dois
+    pools fixos: extração e download (rede) em ``max_concurrent_downloads``
+    threads e pós-processamento (FFmpeg) em ``os.cpu_count()`` threads.
+    Muitos jobs simultâneos não criam uma thread cada, e a espera de um
+    retry é um ``asyncio.sleep`` que não ocupa thread nem vaga de download.
+
+    Opções, histórico, eventos de progresso, resultados por entrada
+    (``result_listener``) e limite de banda são os do ``YTDownloader``
+    interno (``self.downloader``)::
+
+        async with AsyncYTDownloader(config) as engine:
+            result = await engine.download(url)
+            async for result in engine.download_many(urls):
+                ...
+    """
+
+    def __init__(self, config: Dict[str, Any] = None,
+                 progress_listener: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 max_concurrent_downloads: Optional[int] = None,
+                 result_listener: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.downloader = YTDownloader(config=config, progress_listener=progress_listener,
+                                       result_listener=result_listener)
+        self.config = self.downloader.config
+        limit = max_concurrent_downloads or self.config.get('max_parallel_downloads', 3)
+        if limit == 'auto':
+            limit = YTDownloader.AUTO_MAX_PARALLEL_DOWNLOADS
+        self.max_concurrent_downloads = max(1, int(limit))
+
+        self._network = concurrent.futures.ThreadPoolExecutor(self.max_concurrent_downloads,
+                                                              thread_name_prefix="yt-async-net")
+        self._cpu = concurrent.futures.ThreadPoolExecutor(os.cpu_count() or 1, thread_name_prefix="yt-async-cpu")
+        # Um YoutubeDL por thread dos pools, reaproveitado entre os jobs
+        self._ydl_cache = YoutubeDLCache(self.downloader._create_ydl)
+        self._slots = asyncio.Semaphore(self.max_concurrent_downloads)
+        self._active_jobs = 0
+
+    @property
+    def progress(self):
+        """Agregador de progresso compartilhado por todos os jobs."""
+        return self.downloader.progress
+
+    async def _run(self, pool: concurrent.futures.Executor, fn: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(fn, *args))
+
+    # Etapas bloqueantes (rodam nas threads dos pools)
+
+    def _extract(self, url: str, format_type: str, quality: str) -> Dict[str, Any]:
+        ydl = self._ydl_cache.get(self.downloader._get_extract_opts(format_type, quality))
+        info = self.downloader._extract_listing(ydl, url)
+        if 'entries' in info:
+            # A listagem flat é pequena; materializada aqui para não paginar no event loop
+            info['entries'] = [entry for entry in info['entries'] if entry]
+        return info
+
+    def _resolve(self, entry: Dict[str, Any], format_type: str, quality: str) -> Dict[str, Any]:
+        if entry.get('_type') not in ('url', 'url_transparent'):
+            return entry
+        ydl = self._ydl_cache.get(self.downloader._get_extract_opts(format_type, quality))
+        with self.downloader._timed(entry, 'resolve'):
+            return ydl.process_ie_result(dict(entry), download=False)
+
+    def _fetch(self, info: Dict[str, Any], attempt: int, download_opts: Dict[str, Any]) -> Dict[str, Any]:
+        return self.downloader._download_attempt(self._ydl_cache.get(download_opts), info, attempt) or info
+
+    def _finish(self, info: Dict[str, Any], entry: Dict[str, Any], format_type: str, quality: str,
+                postprocess_opts: Dict[str, Any]) -> Dict[str, Any]:
+        if postprocess_opts.get('postprocessors'):
+            info = self.downloader._run_postprocessors(self._ydl_cache.get(postprocess_opts), info)
+        return self.downloader._record_download(info, entry, format_type, quality)
+
+    # Coroutines
+
+    async def _download_entry(self, entry: Dict[str, Any], format_type: str, quality: str,
+                              playlist_title: str = None) -> Dict[str, Any]:
+        """Resolve, baixa e pós-processa uma entrada, com retry não bloqueante."""
+        downloader = self.downloader
+        ydl_opts = downloader._get_ydl_opts(format_type, quality, playlist_title is not None, playlist_title)
+        download_opts, postprocess_opts = downloader._split_ydl_opts(ydl_opts)
+        downloader.logger.log_download_start(downloader._entry_url(entry), format_type, quality)
+
+        attempt = 0
+        info = entry
+        while True:
+            try:
+                async with self._slots:
+                    if attempt == 0:
+                        info = await self._run(self._network, self._resolve, entry, format_type, quality)
+                    downloaded = await self._run(self._network, self._fetch, info, attempt, download_opts)
+                break
+            except Exception as e:
+                downloader._record_attempt_error(e, attempt)
+                if classify_error(e) == ERROR_PERMANENT or attempt >= downloader.max_retries:
+                    return downloader._entry_failure(entry, e, info)
+                attempt += 1
+                delay = backoff_delay(attempt)
+                downloader._emit_progress(make_event(downloader._task_id(info), STAGE_RETRY_WAIT, entry.get('title'),
+                                                     attempt=attempt, max_attempts=downloader.max_retries + 1,
+                                                     retry_in=delay))
+                await asyncio.sleep(delay)
+
+        try:
+            return await self._run(self._cpu, self._finish, downloaded, entry, format_type, quality, postprocess_opts)
+        except Exception as e:
+            return downloader._entry_failure(entry, e, info)
+
+    async def _bounded(self, jobs: AsyncIterator[Awaitable], limit: int) -> AsyncIterator[Any]:
+        """Executa ``jobs`` com no máximo ``limit`` em voo, gerando os resultados ao terminar."""
+        pending = set()
+        try:
+            async for job in jobs:
+                pending.add(asyncio.ensure_future(job))
+                if len(pending) < limit:
+                    continue
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _download_playlist(self, info: Dict[str, Any], format_type: str, quality: str) -> Dict[str, Any]:
+        downloader = self.downloader
+        playlist_title = downloader._get_playlist_title(info)
+        downloader._create_playlist_folder(playlist_title)
+        downloader.progress.add_total(len(info['entries']))
+
+        async def jobs():
+            for entry in info['entries']:
+                yield self._download_entry(entry, format_type, quality, playlist_title)
+
+        results = [result async for result in self._bounded(jobs(), self.max_concurrent_downloads * 2)]
+        successful = len([r for r in results if r['status'] == 'success'])
+        if results and not successful:
+            status = 'failed'
+        else:
+            status = 'partial' if successful < len(results) else 'success'
+        return {
+            'type': 'playlist',
+            'title': info.get('title', 'Playlist'),
+            'status': status,
+            'results': results,
+            'total': len(results),
+            'successful': successful,
+        }
+
+    async def download(self, url: str, format_type: str = "mp3", quality: str = "320") -> Dict[str, Any]:
+        """Baixa um vídeo ou uma playlist; vídeos de uma playlist correm em paralelo.
+
+        Jobs simultâneos somam seus totais no mesmo agregador de progresso;
+        contadores e métricas recomeçam quando um job chega com o motor ocioso.
+        """
+        url_info = URLValidator.validate_and_classify(url)
+        if not url_info['valid']:
+            raise Exception(f"Erro durante o download: {url_info['error']}")
+
+        if not self._active_jobs:
+            self.downloader._reset_run_state()
+        self._active_jobs += 1
+        try:
+            try:
+                info = await self._run(self._network, self._extract, url_info['url'], format_type, quality)
+            except Exception as e:
+                raise Exception(f"Erro durante o download: {str(e)}")
+
+            if 'entries' in info:
+                return await self._download_playlist(info, format_type, quality)
+            self.downloader.progress.add_total(1)
+            result = await self._download_entry(info, format_type, quality)
+            return dict(result, type='video', url=url_info['url'])
+        finally:
+            self._active_jobs -= 1
+
+    async def download_many(self, urls: Union[Iterable[str], AsyncIterable[str]], format_type: str = "mp3",
+                            quality: str = "320") -> AsyncIterator[Dict[str, Any]]:
+        """Baixa várias URLs (iterável comum ou assíncrono), gerando um resultado por URL ao terminar.
+
+        URLs repetidas (mesmo vídeo ou playlist) e inválidas geram resultados
+        ``duplicate``/``invalid`` sem download; no máximo o dobro de
+        ``max_concurrent_downloads`` jobs ficam em voo, então a entrada é
+        consumida conforme os downloads avançam.
+        """
+        seen: Dict[Any, str] = {}
+
+        async def failed_safe(url: str) -> Dict[str, Any]:
+            try:
+                return await self.download(url, format_type, quality)
+            except Exception as e:
+                return {'url': url, 'status': 'failed', 'error': str(e)}
+
+        async def resolved(result: Dict[str, Any]) -> Dict[str, Any]:
+            return result
+
+        async def jobs():
+            async for url in _aiter(urls):
+                info = URLValidator.validate_and_classify(url)
+                if not info['valid']:
+                    yield resolved({'url': url, 'status': 'invalid', 'error': info['error']})
+                    continue
+                key = URLValidator.dedupe_key(info)
+                if key in seen:
+                    yield resolved({'url': url, 'status': 'duplicate', 'duplicate_of': seen[key]})
+                    continue
+                seen[key] = url
+                yield failed_safe(url)
+
+        async for result in self._bounded(jobs(), self.max_concurrent_downloads * 2):
+            yield result
+
+    def close(self):
+        self._network.shutdown(wait=True)
+        self._cpu.shutdown(wait=True)
+        self._ydl_cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -1,15 +1,21 @@
 import os
 import sys
+import time
+from contextlib import contextmanager
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
 from rich.panel import Panel
 from rich import print as rprint
 from rich.text import Text
+from rich.live import Live
+from rich.console import Group
+from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn
 from pathlib import Path
 from typing import Dict, Any, List
 from . import __version__
 from .config import resolve_download_directory, get_download_mode_label
+from .progress import ProgressAggregator, STAGE_POSTPROCESSING, STAGE_DOWNLOADED, STAGE_RETRY_WAIT, format_eta
 
 console = Console()
 
@@ -73,6 +79,94 @@ class _InputReader:
             return "backspace"
         return first
 
+class ProgressDashboard:
+    """Painel ao vivo com uma barra por download ativo e uma barra geral.
+
+    Os hooks do yt-dlp só atualizam o ``ProgressAggregator``; o painel lê o
+    snapshot uma vez por quadro, então atualizações entre quadros são
+    naturalmente agrupadas e a tela é redesenhada no máximo
+    ``refresh_per_second`` vezes por segundo.
+    """
+
+    def __init__(self, console: Console, aggregator: ProgressAggregator, refresh_per_second: float = 4):
+        self.console = console
+        self.aggregator = aggregator
+        self.status_message = ""
+        self._progress = Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TextColumn("{task.fields[info]}", style="dim"),
+            console=console,
+            auto_refresh=False,
+        )
+        self._overall = self._progress.add_task("[bold]Total[/bold]", total=100, info="")
+        self._rows: Dict[str, int] = {}
+        self._live = Live(
+            get_renderable=self._render,
+            console=console,
+            refresh_per_second=refresh_per_second,
+            transient=True,
+        )
+
+    def set_status(self, message: str):
+        self.status_message = message
+
+    @staticmethod
+    def _speed_label(speed) -> str:
+        return f"{(speed or 0) / (1024 * 1024):.1f} MB/s"
+
+    def _render(self):
+        snapshot = self.aggregator.snapshot()
+
+        description = "[bold]Total[/bold]"
+        if snapshot['total_tasks'] and snapshot['total_tasks'] > 1:
+            description += f" [dim]{snapshot['completed']}/{snapshot['total_tasks']}[/dim]"
+        self._progress.update(
+            self._overall,
+            description=description,
+            completed=snapshot['percent'] or 0,
+            info=f"{self._speed_label(snapshot['speed'])} | ETA: {format_eta(snapshot['eta'])}",
+        )
+
+        active = set()
+        for task in snapshot['tasks']:
+            task_id = task['task_id']
+            active.add(task_id)
+            if task_id not in self._rows:
+                title = (task.get('title') or task_id)[:40]
+                self._rows[task_id] = self._progress.add_task(f"  {title}", total=None, info="")
+
+            if task['stage'] in (STAGE_DOWNLOADED, STAGE_POSTPROCESSING):
+                info = "processando áudio..."
+            elif task['stage'] == STAGE_RETRY_WAIT:
+                remaining = max(0, task['time'] + task['retry_in'] - time.monotonic())
+                info = f"nova tentativa em {remaining:.0f}s"
+            else:
+                info = self._speed_label(task.get('speed'))
+            self._progress.update(
+                self._rows[task_id],
+                completed=task['downloaded_bytes'],
+                total=task.get('total_bytes'),
+                info=info,
+            )
+
+        for task_id in list(self._rows):
+            if task_id not in active:
+                self._progress.remove_task(self._rows.pop(task_id))
+
+        if self.status_message:
+            return Group(self._progress, Text(f"⏳ {self.status_message}", style="blue"))
+        return self._progress
+
+    def __enter__(self):
+        self._live.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._live.stop()
+
+
 class CLI:
     def __init__(self):
         self.console = console
@@ -81,6 +175,7 @@ class CLI:
         self.status_style = "blue"
         self.notice_message = ""
         self.notice_style = "yellow"
+        self.dashboard = None
 
     def _build_welcome_text(self, config=None) -> str:
         welcome_text = "[bold blue]🎵 YouTube to MP3 Downloader[/bold blue]\n"
@@ -245,10 +340,24 @@ class CLI:
         self.render_screen()
 
     def show_progress(self, message: str):
+        if self.dashboard is not None:
+            # Durante o painel ao vivo a mensagem só entra no próximo quadro
+            self.dashboard.set_status(message)
+            return
         self.status_message = message
         self.status_style = "blue"
         self.render_screen()
 
+    @contextmanager
+    def live_progress(self, aggregator: ProgressAggregator, refresh_per_second: float = 4):
+        """Abre o painel ao vivo de progresso enquanto durar o bloco ``with``."""
+        self.dashboard = ProgressDashboard(self.console, aggregator, refresh_per_second)
+        try:
+            with self.dashboard:
+                yield self.dashboard
+        finally:
+            self.dashboard = None
+
     def show_warning(self, message: str):
         self.notice_message = f"⚠️  {message}"
         self.notice_style = "yellow"
@@ -335,6 +444,32 @@ class CLI:
         
         self.console.print(table)
     
+    def show_search_results(self, query: str, results: List[Dict[str, Any]], elapsed_ms: float = None):
+        if not results:
+            rprint(f"\n[yellow]🔍 Nada encontrado para: {query}[/yellow]")
+            return
+        
+        title = f"🔍 Resultados para: {query}"
+        if elapsed_ms is not None:
+            title += f" ({len(results)} em {elapsed_ms:.1f} ms)"
+        table = Table(title=title)
+        table.add_column("Data", style="cyan")
+        table.add_column("Título", style="white")
+        table.add_column("Tamanho", justify="right", style="blue")
+        table.add_column("Formato", justify="center", style="magenta")
+        table.add_column("URL", style="dim")
+        
+        for entry in results:
+            table.add_row(
+                entry['date'][:10],
+                entry['title'][:40] + "..." if len(entry['title']) > 40 else entry['title'],
+                f"{entry['file_size_mb']}MB",
+                (entry['format'] or '').upper(),
+                entry['url'] or ''
+            )
+        
+        self.console.print(table)
+    
     def show_stats(self, stats: Dict[str, Any]):
         if stats['total_downloads'] == 0:
             rprint("\n[yellow]📊 Nenhuma estatística disponível[/yellow]")
@@ -349,6 +484,14 @@ class CLI:
 [cyan]Tamanho médio:[/cyan] {stats['average_file_size_mb']} MB
 [cyan]Último download:[/cyan] {stats['most_recent'][:10] if stats['most_recent'] else 'N/A'}
         """
+        if stats.get('by_format'):
+            stats_text += "\n[bold]Por formato:[/bold]\n"
+            for fmt, data in stats['by_format'].items():
+                stats_text += f"  [magenta]{fmt.upper():<5}[/magenta] {data['count']} downloads | {data['size_mb']} MB\n"
+        if stats.get('by_day'):
+            stats_text += "\n[bold]Últimos dias:[/bold]\n"
+            for day, data in list(stats['by_day'].items())[-7:]:
+                stats_text += f"  [cyan]{day}[/cyan] {data['count']} downloads | {data['size_mb']} MB\n"
         self.console.print(Panel(stats_text, border_style="blue"))
     
     def show_reset_confirmation(self) -> bool:
@@ -356,6 +499,18 @@ class CLI:
     
     def show_reset_success(self):
         rprint("\n[green]✅ Histórico apagado com sucesso![/green]")
+    
+    def show_compact_result(self, result: Dict[str, Any]):
+        archive = result['archive']
+        months = ", ".join(result['archived_months']) or "nenhum"
+        rprint("\n[green]✅ Histórico compactado![/green]")
+        rprint(f"[cyan]Entradas arquivadas agora:[/cyan] {result['archived_entries']} (meses: {months})")
+        rprint(f"[cyan]Arquivo ativo:[/cyan] {result['active_entries']} entradas")
+        rprint(f"[cyan]Segmentos:[/cyan] {archive['segments']} com {archive['entries']} entradas "
+               f"({archive['bytes'] / (1024 * 1024):.1f} MB)")
+        rprint(f"[cyan]Espaço em disco:[/cyan] {result['bytes_before'] / (1024 * 1024):.1f} MB → "
+               f"{result['bytes_after'] / (1024 * 1024):.1f} MB em {result['elapsed_seconds']:.1f}s")
 
     def confirm_continue(self) -> bool:
         return Confirm.ask("\n[yellow]Fazer outro download?[/yellow]")
+
@@ -17,11 +17,20 @@ DEFAULT_CONFIG = {
     "duplicate_action": "skip",  # skip, overwrite, rename
     "parallel_downloads": False,
     "max_parallel_downloads": 3,
+    "rate_limit": None,  # ex.: "2M" (bytes/s, global); None = sem limite
+    "stream_playlists": True,
+    "resume_playlists": True,
+    "prefetch_depth": 4,
+    "prefetch_workers": 2,
+    "progress_refresh_rate": 4,
+    "use_daemon": True,  # Enviar --url/--batch-file ao `yt-download serve`, se estiver rodando
+    "daemon_port": 8765,
     "log_level": "INFO"
 }
 
 CONFIG_FILE = "yt_download_config.json"
-HISTORY_FILE = "yt_download_history.json"
+HISTORY_FILE = "yt_download_history.jsonl"
+LEGACY_HISTORY_FILE = "yt_download_history.json"  # Migrado para JSONL na primeira abertura
 LOG_FILE = "yt_download.log"
 
 def get_config_dir():
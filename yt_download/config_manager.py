@@ -100,6 +100,13 @@ class ConfigManager:
         "duplicate_action",
         "parallel_downloads",
         "max_parallel_downloads",
+        "rate_limit",
+        "stream_playlists",
+        "resume_playlists",
+        "prefetch_depth",
+        "prefetch_workers",
+        "progress_refresh_rate",
+        "use_daemon",
         "log_level",
     ]
 
@@ -115,6 +122,13 @@ class ConfigManager:
         "duplicate_action": "Ao encontrar duplicados",
         "parallel_downloads": "Downloads paralelos",
         "max_parallel_downloads": "Máximo simultâneo",
+        "rate_limit": "Limite de banda total",
+        "stream_playlists": "Playlists em streaming",
+        "resume_playlists": "Retomar playlists interrompidas",
+        "prefetch_depth": "Entradas resolvidas à frente",
+        "prefetch_workers": "Threads de prefetch",
+        "progress_refresh_rate": "Atualizações de progresso/s",
+        "use_daemon": "Usar daemon em execução",
         "log_level": "Nível de log",
     }
 
@@ -129,7 +143,14 @@ class ConfigManager:
         "max_retries": list(range(1, 11)),
         "duplicate_action": ["skip", "overwrite", "rename"],
         "parallel_downloads": [False, True],
-        "max_parallel_downloads": [1, 2, 3, 4, 5],
+        "max_parallel_downloads": [1, 2, 3, 4, 5, "auto"],
+        "rate_limit": [None, "512K", "1M", "2M", "5M", "10M"],
+        "stream_playlists": [False, True],
+        "resume_playlists": [False, True],
+        "prefetch_depth": [1, 2, 4, 8, 16],
+        "prefetch_workers": [1, 2, 3, 4],
+        "progress_refresh_rate": [1, 2, 4, 8, 10],
+        "use_daemon": [False, True],
         "log_level": ["DEBUG", "INFO", "WARNING", "ERROR"],
     }
 
@@ -173,7 +194,7 @@ class ConfigManager:
 
     def _field_value(self, key: str) -> str:
         value = self.config.get(key)
-        if key in {"download_thumbnails", "create_playlist_folder", "history_enabled", "parallel_downloads"}:
+        if key in {"download_thumbnails", "create_playlist_folder", "history_enabled", "parallel_downloads", "stream_playlists", "resume_playlists", "use_daemon"}:
             return self._bool_label(bool(value))
         if key == "download_location_mode":
             return self._download_mode_display()
@@ -181,12 +202,21 @@ class ConfigManager:
             return "N/A para este formato"
         if key == "max_parallel_downloads" and not self.config.get("parallel_downloads"):
             return "Desativado"
+        if key == "max_parallel_downloads" and value == "auto":
+            return "Automático (ajusta pela vazão)"
+        if key == "rate_limit":
+            return f"{value}/s" if value else "Sem limite"
         return str(value)
 
     def _field_help(self, key: str) -> str:
         help_map = {
             "audio_quality": "(disponivel apenas para MP3)",
             "max_parallel_downloads": "(so vale quando downloads paralelos estiverem ativos)",
+            "rate_limit": "(somado entre todos os downloads simultaneos)",
+            "resume_playlists": "(so vale com playlists em streaming)",
+            "prefetch_depth": "(so vale com playlists em streaming)",
+            "prefetch_workers": "(so vale com playlists em streaming)",
+            "use_daemon": "(yt-download serve; so vale com --url/--batch-file)",
         }
         return help_map.get(key, "")
 
@@ -290,8 +320,10 @@ class ConfigManager:
         if key == "max_parallel_downloads":
             current = str(self.config.get(key))
             _hard_clear()
-            new_value = console.input(f"Máximo de downloads simultâneos [{current}]: ").strip()
-            if new_value.isdigit():
+            new_value = console.input(f"Máximo de downloads simultâneos (1-5 ou auto) [{current}]: ").strip()
+            if new_value.lower() == "auto":
+                self.config.set(key, "auto")
+            elif new_value.isdigit():
                 self.config.set(key, max(1, min(5, int(new_value))))
 
     def interactive_config(self, cli=None):
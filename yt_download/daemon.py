@@ -0,0 +1,454 @@
+import asyncio
+import http.client
+import json
+import os
+import secrets
+import signal
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List, Iterator, Iterable
+from urllib.parse import urlsplit, parse_qs
+
+from . import __version__
+from .config import get_config_dir, ensure_config_dir, resolve_download_directory
+from .logger import get_logger
+
+# Estado do daemon em execução (porta, pid e token), lido pelo modo cliente
+DAEMON_STATE_FILE = "daemon.json"
+DEFAULT_DAEMON_PORT = 8765
+DAEMON_HOST = "127.0.0.1"
+TOKEN_HEADER = "X-YT-Download-Token"
+
+# Jobs concluídos mantidos em memória para consulta. Um job concluído que
+# nenhum cliente buscou ainda só é descartado após UNCOLLECTED_JOB_TTL segundos
+MAX_FINISHED_JOBS = 500
+UNCOLLECTED_JOB_TTL = 3600
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCESS = "success"
+JOB_FAILED = "failed"
+JOB_PARTIAL = "partial"
+
+FINISHED_JOB_STATES = (JOB_SUCCESS, JOB_PARTIAL, JOB_FAILED)
+
+
+def _state_path():
+    return get_config_dir() / DAEMON_STATE_FILE
+
+
+class DownloadDaemon:
+    """Processo de longa duração que executa jobs de download enviados pelo CLI.
+
+    yt-dlp, configuração, histórico e o probe do FFmpeg são carregados uma
+    vez; os jobs rodam num ``AsyncYTDownloader`` com event loop em thread
+    própria, compartilhando pools, instâncias YoutubeDL e limite de banda.
+    A API HTTP escuta só em localhost e exige o token gravado em
+    ``~/.yt-download/daemon.json`` (legível apenas pelo usuário).
+    """
+
+    def __init__(self, config: Dict[str, Any], port: int = None, host: str = DAEMON_HOST):
+        self.config = config
+        self.host = host
+        self.port = port if port is not None else config.get('daemon_port', DEFAULT_DAEMON_PORT)
+        self.token = secrets.token_hex(16)
+        self.logger = get_logger()
+        self.started_at = time.time()
+
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._collected = set()  # Jobs concluídos já entregues a um cliente
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="yt-daemon-loop", daemon=True)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.engine = None
+        self.ffmpeg: Dict[str, Any] = {}
+
+    # Ciclo de vida
+
+    def start(self):
+        """Carrega o motor, verifica o FFmpeg e abre a porta (sem bloquear)."""
+        from .async_downloader import AsyncYTDownloader
+        from .utils import SystemValidator
+
+        self.ffmpeg = SystemValidator.check_ffmpeg()
+        if not self.ffmpeg['installed']:
+            raise Exception(f"FFmpeg: {self.ffmpeg['error']}")
+
+        self._loop_thread.start()
+
+        async def create_engine():
+            # Criado dentro do loop: o semáforo do motor pertence a ele
+            return AsyncYTDownloader(config=self.config)
+
+        self.engine = asyncio.run_coroutine_threadsafe(create_engine(), self._loop).result()
+        self._job_slots = asyncio.Semaphore(self.engine.max_concurrent_downloads)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _DaemonRequestHandler)
+        self._server.daemon_threads = True
+        self._server.download_daemon = self
+        self.port = self._server.server_address[1]
+        self._write_state()
+        self.logger.info(f"Daemon ouvindo em {self.host}:{self.port}")
+
+    def serve_forever(self):
+        """Atende requisições até Ctrl-C/SIGTERM e então encerra tudo."""
+        def terminate(signum, frame):
+            raise KeyboardInterrupt
+
+        previous = signal.signal(signal.SIGTERM, terminate)
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            self.stop()
+
+    def stop(self):
+        self._remove_state()
+        if self._server is not None:
+            self._server.server_close()
+        if self.engine is not None:
+            async def cancel_jobs():
+                tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            asyncio.run_coroutine_threadsafe(cancel_jobs(), self._loop).result()
+            self.engine.close()
+        if self._loop_thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+        self._loop.close()
+
+    def _write_state(self):
+        ensure_config_dir()
+        state = {
+            'host': self.host,
+            'port': self.port,
+            'pid': os.getpid(),
+            'token': self.token,
+            'version': __version__,
+        }
+        path = _state_path()
+        temp_file = path.with_name(path.name + ".tmp")
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_file, path)
+
+    def _remove_state(self):
+        path = _state_path()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if json.load(f).get('pid') != os.getpid():
+                    return  # Outro daemon assumiu o arquivo
+            path.unlink()
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    # Jobs
+
+    def submit(self, url: str, format_type: str, quality: str) -> Dict[str, Any]:
+        """Enfileira um download; URL inválida, formato desconhecido ou sem encoder falham na hora."""
+        from .url_validator import URLValidator
+        from .utils import SystemValidator, FORMAT_ENCODERS
+
+        if format_type not in FORMAT_ENCODERS:
+            raise ValueError(f"Formato não suportado: {format_type} (use {', '.join(FORMAT_ENCODERS)})")
+        url_info = URLValidator.validate_and_classify(url)
+        if not url_info['valid']:
+            raise ValueError(url_info['error'])
+        missing_encoder = SystemValidator.missing_encoder(format_type, self.ffmpeg)
+        if missing_encoder:
+            raise ValueError(f"FFmpeg sem o encoder '{missing_encoder}', necessário para {format_type.upper()}")
+
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'url': url_info['url'],
+            'is_playlist': url_info['is_playlist'],
+            'format': format_type,
+            'quality': quality,
+            'status': JOB_QUEUED,
+            'submitted': time.time(),
+            'started': None,
+            'finished': None,
+            'result': None,
+            'error': None,
+        }
+        with self._lock:
+            self._jobs[job['id']] = job
+            self._prune_jobs()
+            submitted = dict(job)
+        asyncio.run_coroutine_threadsafe(self._run_job(job), self._loop)
+        return submitted
+
+    async def _run_job(self, job: Dict[str, Any]):
+        async with self._job_slots:
+            self._update_job(job, status=JOB_RUNNING, started=time.time())
+            try:
+                result = await self.engine.download(job['url'], job['format'], job['quality'])
+            except Exception as e:
+                self._update_job(job, status=JOB_FAILED, error=str(e), finished=time.time())
+                return
+            # Playlists: 'partial' quando só parte das entradas foi baixada
+            status = {'failed': JOB_FAILED, 'partial': JOB_PARTIAL}.get(result.get('status'), JOB_SUCCESS)
+            self._update_job(job, status=status, result=result, error=result.get('error'), finished=time.time())
+
+    def _update_job(self, job: Dict[str, Any], **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _prune_jobs(self):
+        # Só descarta jobs que o cliente já recebeu concluídos (ou abandonados
+        # há mais de UNCOLLECTED_JOB_TTL): um lote em andamento nunca perde os seus
+        expired = time.time() - UNCOLLECTED_JOB_TTL
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job['status'] in FINISHED_JOB_STATES
+                    and (job_id in self._collected or job['finished'] < expired)]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+            self._collected.discard(job_id)
+
+    def _collect(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if job['status'] in FINISHED_JOB_STATES:
+            self._collected.add(job['id'])
+        return dict(job)
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._collect(job) if job else None
+
+    def jobs_by_id(self, job_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Jobs pedidos que ainda existem, numa só consulta (usado pelo lote remoto)."""
+        with self._lock:
+            return [self._collect(self._jobs[job_id]) for job_id in job_ids if job_id in self._jobs]
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {state: 0 for state in (JOB_QUEUED, JOB_RUNNING, JOB_SUCCESS, JOB_PARTIAL, JOB_FAILED)}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+        return {
+            'version': __version__,
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'download_path': str(self.engine.downloader.download_path),
+            'max_concurrent_downloads': self.engine.max_concurrent_downloads,
+            'ffmpeg': self.ffmpeg.get('version'),
+            'jobs': counts,
+            'ydl_cache': self.engine._ydl_cache.metrics(),
+            'progress': self.engine.progress.snapshot(),
+        }
+
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    """Rotas: GET /status, GET /jobs[?ids=a,b], GET /jobs/<id>, POST /jobs."""
+
+    def log_message(self, format, *args):
+        self.server.download_daemon.logger.debug("Daemon: " + format % args)
+
+    def _send(self, code: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if secrets.compare_digest(self.headers.get(TOKEN_HEADER, ''), self.server.download_daemon.token):
+            return True
+        self._send(401, {'error': 'Token inválido'})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        daemon = self.server.download_daemon
+        url = urlsplit(self.path)
+        if url.path == '/status':
+            self._send(200, daemon.status())
+        elif url.path == '/jobs':
+            ids = parse_qs(url.query).get('ids')
+            if ids is None:
+                self._send(200, {'jobs': daemon.jobs()})
+            else:
+                self._send(200, {'jobs': daemon.jobs_by_id(i for value in ids for i in value.split(',') if i)})
+        elif url.path.startswith('/jobs/'):
+            job = daemon.job(url.path[len('/jobs/'):])
+            if job:
+                self._send(200, job)
+            else:
+                self._send(404, {'error': 'Job não encontrado'})
+        else:
+            self._send(404, {'error': 'Rota não encontrada'})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != '/jobs':
+            self._send(404, {'error': 'Rota não encontrada'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send(400, {'error': 'Corpo JSON inválido'})
+            return
+        if not isinstance(payload, dict):
+            self._send(400, {'error': 'O corpo deve ser um objeto JSON'})
+            return
+        if not isinstance(payload.get('url'), str):
+            self._send(400, {'error': "Campo obrigatório: url (texto)"})
+            return
+        format_type = payload.get('format', 'mp3')
+        if not isinstance(format_type, str):
+            self._send(400, {'error': "Campo format deve ser texto"})
+            return
+        try:
+            job = self.server.download_daemon.submit(payload['url'], format_type,
+                                            str(payload.get('quality', '320')))
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+        self._send(201, job)
+
+
+class DaemonClient:
+    """Cliente da API local do daemon, usado pelo CLI quando há um daemon rodando."""
+
+    def __init__(self, host: str, port: int, token: str, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.timeout = timeout
+
+    @classmethod
+    def discover(cls, timeout: float = 0.5) -> Optional['DaemonClient']:
+        """Cliente do daemon em execução, ou ``None`` se não houver um respondendo."""
+        try:
+            with open(_state_path(), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            client = cls(state['host'], state['port'], state['token'], timeout=timeout)
+            client.status()
+        except Exception:
+            return None  # Sem daemon, arquivo de estado velho ou porta sem resposta
+        client.timeout = 10.0
+        return client
+
+    def _request(self, method: str, path: str, payload: Dict[str, Any] = None) -> Dict[str, Any]:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else None
+            headers = {TOKEN_HEADER: self.token, 'Content-Type': 'application/json'}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read() or b'{}')
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise Exception(f"Erro no daemon: {data.get('error', response.reason)}")
+        return data
+
+    def status(self) -> Dict[str, Any]:
+        return self._request('GET', '/status')
+
+    def submit(self, url: str, format_type: str, quality: str) -> Dict[str, Any]:
+        return self._request('POST', '/jobs', {'url': url, 'format': format_type, 'quality': quality})
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        return self._request('GET', f'/jobs/{job_id}')
+
+    def jobs(self, job_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Consulta vários jobs numa única requisição; ids desconhecidos são omitidos."""
+        return self._request('GET', '/jobs?ids=' + ','.join(job_ids))['jobs']
+
+    def _poll_finished(self, pending: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Remove de ``pending`` e devolve os jobs concluídos (uma requisição por chamada)."""
+        found = {job['id']: job for job in self.jobs(pending)}
+        finished = []
+        for job_id in list(pending):
+            job = found.get(job_id)
+            if job is None:
+                # Descartado pelo daemon (reiniciado, p.ex.): conta como falha do job, não do lote
+                job = dict(pending[job_id], status=JOB_FAILED, error="Job não encontrado no daemon")
+            elif job['status'] not in FINISHED_JOB_STATES:
+                continue
+            finished.append(job)
+            del pending[job_id]
+        return finished
+
+    def iter_finished(self, job_ids: Iterable[str], poll_interval: float = 0.25) -> Iterator[Dict[str, Any]]:
+        """Gera cada job conforme ele termina (uma consulta por ciclo para todos os pendentes)."""
+        pending = {job_id: {'id': job_id, 'url': None, 'result': None} for job_id in job_ids}
+        while pending:
+            yield from self._poll_finished(pending)
+            if pending:
+                time.sleep(poll_interval)
+
+    def iter_batch(self, urls: Iterable[str], format_type: str, quality: str, window: int,
+                   poll_interval: float = 0.25) -> Iterator[Dict[str, Any]]:
+        """Envia as URLs mantendo no máximo ``window`` jobs em aberto e gera cada job ao terminar.
+
+        A lista de URLs é consumida sob demanda, então a memória do cliente e do
+        daemon não cresce com o tamanho do lote. URLs recusadas pelo daemon viram
+        jobs ``failed`` em vez de interromper o lote.
+        """
+        urls = iter(urls)
+        pending: Dict[str, Dict[str, Any]] = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                url = next(urls, None)
+                if url is None:
+                    exhausted = True
+                    break
+                try:
+                    job = self.submit(url, format_type, quality)
+                except Exception as e:
+                    yield {'id': None, 'url': url, 'status': JOB_FAILED, 'result': None, 'error': str(e)}
+                    continue
+                pending[job['id']] = job
+            if not pending:
+                return
+            finished = self._poll_finished(pending)
+            yield from finished
+            if not finished:
+                time.sleep(poll_interval)
+
+    def serves_directory(self, settings: Dict[str, Any]) -> bool:
+        """Se o daemon grava na mesma pasta que este CLI gravaria (o modo "pasta atual" depende do cwd)."""
+        try:
+            daemon_path = os.path.realpath(self.status()['download_path'])
+        except Exception:
+            return False
+        return daemon_path == os.path.realpath(resolve_download_directory(settings))
+
+
+class RemoteProgress:
+    """Fonte de snapshots para o painel de progresso, lida do daemon."""
+
+    def __init__(self, client: DaemonClient):
+        self.client = client
+        self._last: Dict[str, Any] = {
+            'tasks': [], 'active': 0, 'downloading': 0, 'completed': 0, 'failed': 0, 'total_tasks': None,
+            'downloaded_bytes': 0, 'total_bytes': None, 'percent': None, 'speed': 0.0, 'eta': None,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        try:
+            self._last = self.client.status()['progress']
+        except Exception:
+            pass  # Mantém o último quadro se o daemon demorar a responder
+        return self._last
@@ -1,16 +1,90 @@
 import os
-import yt_dlp
 import time
+import queue
+import threading
+import functools
+import contextlib
 import concurrent.futures
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable, List
+from typing import Dict, Any, Optional, Callable, List, Iterable, Iterator, Tuple
 from .history import DownloadHistory
 from .config import resolve_download_directory
-from .utils import SystemValidator, FileUtils, NetworkUtils
+from .utils import SystemValidator, NetworkUtils
 from .logger import get_logger
+from .pipeline import (MetadataPrefetcher, BoundedExecutor, YoutubeDLCache, TokenBucket, ConcurrencyController,
+                       parse_rate)
+from .progress import (ProgressAggregator, ProgressMessageAdapter, event_from_hook, make_event,
+                       STAGE_POSTPROCESSING, STAGE_RETRY_WAIT, STAGE_FINISHED, STAGE_FAILED)
+from .retry import RetryScheduler, classify_error, error_class, backoff_delay, ERROR_PERMANENT
+from .journal import PlaylistJournal, STATE_DONE, STATE_FAILED
+from .url_validator import URLValidator
+
+@functools.lru_cache(maxsize=None)
+def _counting_ydl_class():
+    """Subclasse do YoutubeDL criada no primeiro uso: o yt-dlp só é importado
+    quando algo vai de fato ser extraído ou baixado."""
+    import yt_dlp
+
+    class _CountingYoutubeDL(yt_dlp.YoutubeDL):
+        """YoutubeDL que contabiliza cada invocação de extrator (inclusive as internas)."""
+
+        def __init__(self, params=None, on_extract: Optional[Callable] = None, **kwargs):
+            super().__init__(params, **kwargs)
+            self._on_extract = on_extract
+
+        def extract_info(self, *args, **kwargs):
+            if self._on_extract:
+                self._on_extract()
+            return super().extract_info(*args, **kwargs)
+
+    return _CountingYoutubeDL
+
+# Marca de fim da execução na fila de resultados de ``_iter_results``
+_RUN_FINISHED = object()
+
+
+class _ResultTally:
+    """Contadores de resultados com uma amostra limitada das falhas.
+
+    Oferece o ``append``/``len`` de lista que os laços de playlist usam,
+    então um lote de qualquer tamanho não acumula os resultados em memória.
+    """
+    
+    def __init__(self, sample_size: int):
+        self.sample_size = sample_size
+        self.total = 0
+        self.successful = 0
+        self.failures: List[Dict[str, Any]] = []
+    
+    def append(self, result: Dict[str, Any]):
+        self.total += 1
+        if result['status'] == 'success':
+            self.successful += 1
+        elif len(self.failures) < self.sample_size:
+            self.failures.append(result)
+    
+    def __len__(self) -> int:
+        return self.total
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'successful': self.successful,
+            'failed': self.total - self.successful,
+            'failures': list(self.failures),
+        }
+
 
 class YTDownloader:
-    def __init__(self, progress_callback: Optional[Callable] = None, config: Dict[str, Any] = None):
+    # Teto de downloads simultâneos no modo "auto"
+    AUTO_MAX_PARALLEL_DOWNLOADS = 8
+    # Lote: falhas e URLs inválidas guardadas no resumo, e playlists à espera
+    BATCH_SAMPLE_SIZE = 20
+    BATCH_PLAYLIST_QUEUE = 16
+    
+    def __init__(self, progress_callback: Optional[Callable] = None, config: Dict[str, Any] = None,
+                 progress_listener: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 result_listener: Optional[Callable[[Dict[str, Any]], None]] = None):
         self.progress_callback = progress_callback
         self.history = DownloadHistory()
         self.config = config or {}
@@ -20,54 +94,120 @@ class YTDownloader:
         self.max_retries = self.config.get('max_retries', 3)
         self.duplicate_action = self.config.get('duplicate_action', 'skip')  # skip, overwrite, rename
         
-        # Stats de progresso
-        self.download_stats = {
-            'total_bytes': 0,
-            'downloaded_bytes': 0,
-            'start_time': 0,
-            'speed': 0
-        }
+        # Contador de invocações de extrator do último download
+        self.extractor_calls = 0
+        self._extractor_lock = threading.Lock()
+        
+        # Eventos de progresso estruturados, agregados por tarefa
+        self.progress = ProgressAggregator()
+        self._progress_listeners = []
+        if progress_listener:
+            self._progress_listeners.append(progress_listener)
+        if progress_callback:
+            self._progress_listeners.append(ProgressMessageAdapter(progress_callback, self.progress))
+        
+        # Resultado estruturado de cada entrada, entregue assim que ela termina
+        self._result_listeners = []
+        if result_listener:
+            self._result_listeners.append(result_listener)
+        # Segundos por etapa (resolve, download, postprocess) de cada tarefa em andamento
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._postprocess_started: Dict[Tuple[str, str], float] = {}
+        
+        # Limite global de banda, compartilhado por todos os workers
+        rate_limit = parse_rate(self.config.get('rate_limit'))
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        # Bytes já debitados por arquivo; os hooks de todos os workers escrevem aqui
+        self._throttle_offsets: Dict[str, int] = {}
+        self._throttle_lock = threading.Lock()
+        
+        # Controle adaptativo de concorrência (max_parallel_downloads = "auto")
+        self.concurrency: Optional[ConcurrencyController] = None
+        
+        # Fila de atraso das entradas de playlist aguardando nova tentativa
+        self.retries = RetryScheduler(self.max_retries)
+        
+        # Diário do job de playlist em andamento (retomada após interrupção)
+        self._journal: Optional[PlaylistJournal] = None
+    
+    def _emit_progress(self, event: Dict[str, Any]):
+        self.progress.update(event)
+        for listener in self._progress_listeners:
+            listener(event)
+    
+    def _emit_result(self, result: Dict[str, Any]):
+        for listener in self._result_listeners:
+            try:
+                listener(result)
+            except Exception as e:
+                self.logger.warning(f"Erro no listener de resultados: {str(e)}")
+    
+    def _add_timing(self, task_id: str, stage: str, seconds: float):
+        timings = self._timings.setdefault(task_id, {})
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    
+    @contextlib.contextmanager
+    def _timed(self, entry: Dict[str, Any], stage: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._add_timing(self._task_id(entry), stage, time.monotonic() - start)
+    
+    def _pop_timings(self, *entries: Dict[str, Any]) -> Dict[str, float]:
+        """Tempos acumulados (todas as tentativas) da tarefa, removidos do registro."""
+        timings: Dict[str, float] = {}
+        for task_id in {self._task_id(entry) for entry in entries if entry}:
+            for stage, seconds in self._timings.pop(task_id, {}).items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+        return {stage: round(seconds, 3) for stage, seconds in timings.items()}
     
     def _progress_hook(self, d):
-        if not self.progress_callback:
-            return
-            
-        if d['status'] == 'downloading':
-            # Atualizar stats
-            if 'total_bytes' in d and d['total_bytes']:
-                self.download_stats['total_bytes'] = d['total_bytes']
-                self.download_stats['downloaded_bytes'] = d['downloaded_bytes']
-                
-                if self.download_stats['start_time'] == 0:
-                    self.download_stats['start_time'] = time.time()
-                
-                # Calcular velocidade e ETA
-                elapsed_time = time.time() - self.download_stats['start_time']
-                if elapsed_time > 0:
-                    self.download_stats['speed'] = d['downloaded_bytes'] / elapsed_time
-                    
-                    if self.download_stats['speed'] > 0:
-                        remaining_bytes = d['total_bytes'] - d['downloaded_bytes']
-                        eta_seconds = remaining_bytes / self.download_stats['speed']
-                        eta_str = f"{int(eta_seconds//60)}:{int(eta_seconds%60):02d}"
-                    else:
-                        eta_str = "∞"
-                else:
-                    eta_str = "∞"
-                
-                percent = (d['downloaded_bytes'] / d['total_bytes']) * 100
-                speed_mb = self.download_stats['speed'] / (1024 * 1024)
-                
-                self.progress_callback(
-                    f"Baixando... {percent:.1f}% | "
-                    f"{speed_mb:.1f} MB/s | "
-                    f"ETA: {eta_str}"
-                )
+        if self.rate_limiter is not None:
+            self._throttle(d)
+        event = event_from_hook(d)
+        if event:
+            self._emit_progress(event)
+    
+    def _throttle(self, d):
+        """Debita do limitador global os bytes recebidos desde o último hook.
+
+        O hook roda na thread do próprio download, então dormir aqui segura
+        a leitura do socket daquele worker até haver orçamento.
+        """
+        key = d.get('filename')
+        downloaded = d.get('downloaded_bytes') or 0
+        with self._throttle_lock:
+            previous = self._throttle_offsets.get(key, 0)
+            if d['status'] == 'downloading':
+                self._throttle_offsets[key] = downloaded
             else:
-                self.progress_callback("Baixando...")
-        elif d['status'] == 'finished':
-            self.download_stats = {'total_bytes': 0, 'downloaded_bytes': 0, 'start_time': 0, 'speed': 0}
-            self.progress_callback("Download concluído, processando áudio...")
+                self._throttle_offsets.pop(key, None)
+        # Fora do lock: consume pode dormir até haver orçamento
+        self.rate_limiter.consume(downloaded - previous)
+    
+    def _rate_limit_metrics(self) -> Optional[Dict[str, Any]]:
+        return self.rate_limiter.metrics() if self.rate_limiter is not None else None
+    
+    def _postprocessor_hook(self, d):
+        info = d.get('info_dict') or {}
+        if not info.get('id'):
+            return
+        key = (info['id'], d.get('postprocessor'))
+        if d['status'] == 'started':
+            self._postprocess_started[key] = time.monotonic()
+            self._emit_progress(make_event(info['id'], STAGE_POSTPROCESSING, info.get('title'),
+                                           postprocessor=d.get('postprocessor')))
+        elif d['status'] == 'finished' and key in self._postprocess_started:
+            self._add_timing(info['id'], 'postprocess', time.monotonic() - self._postprocess_started.pop(key))
+    
+    def _count_extraction(self):
+        with self._extractor_lock:
+            self.extractor_calls += 1
+    
+    def _create_ydl(self, ydl_opts: Dict[str, Any]) -> 'yt_dlp.YoutubeDL':
+        """Cria um YoutubeDL que registra as invocações de extrator neste downloader."""
+        return _counting_ydl_class()(ydl_opts, on_extract=self._count_extraction)
     
     def check_system_requirements(self, check_network: bool = True) -> Dict[str, Any]:
         """Verifica se todos os requisitos do sistema estão atendidos."""
@@ -122,6 +262,7 @@ class YTDownloader:
         ydl_opts = {
             'outtmpl': output_template,
             'progress_hooks': [self._progress_hook],
+            'postprocessor_hooks': [self._postprocessor_hook],
             'quiet': True,
             'no_warnings': True,
             'noprogress': True,
@@ -178,12 +319,45 @@ class YTDownloader:
         
         return ydl_opts
     
-    def _download_with_retry(self, ydl, url: str, max_retries: int = None) -> bool:
-        """Download com retry automático."""
+    def _download_attempt(self, ydl, info: Dict[str, Any], attempt: int = 0) -> Optional[Dict[str, Any]]:
+        """Uma tentativa de download a partir de um info dict.
+
+        A primeira tentativa reaproveita o info dict (sem nova extração quando
+        já resolvido); as seguintes voltam à URL, pois as URLs de mídia podem
+        ter expirado. Retorna o info dict processado pelo yt-dlp.
+        """
+        task_id = self._task_id(info)
+        postprocess_before = self._timings.get(task_id, {}).get('postprocess', 0.0)
+        start = time.monotonic()
+        try:
+            if attempt == 0:
+                result = ydl.process_ie_result(ydl.sanitize_info(info, True), download=True)
+            else:
+                result = ydl.extract_info(self._entry_url(info), download=True)
+        finally:
+            # O pós-processamento feito dentro do download já é contado pelos hooks
+            postprocess = self._timings.get(task_id, {}).get('postprocess', 0.0) - postprocess_before
+            self._add_timing(task_id, 'download', time.monotonic() - start - postprocess)
+        if self.concurrency is not None:
+            self.concurrency.record_success()
+        return result
+    
+    def _record_attempt_error(self, error: Exception, attempt: int):
+        self.logger.warning(f"Falha na tentativa {attempt + 1}: {str(error)}")
+        if self.concurrency is not None:
+            self.concurrency.record_error(error)
+    
+    def _download_with_retry(self, ydl, info: Dict[str, Any], max_retries: int = None) -> Optional[Dict[str, Any]]:
+        """Download com retry automático, esperando na própria thread.
+
+        Usado no vídeo único, onde não há outro trabalho para adiantar; as
+        playlists usam a fila de atraso (``self.retries``). Erros permanentes
+        (vídeo privado, removido, ...) falham na hora.
+        """
         if max_retries is None:
             max_retries = self.max_retries
         
-        last_error = None
+        url = self._entry_url(info)
         for attempt in range(max_retries + 1):
             try:
                 if attempt > 0:
@@ -191,106 +365,535 @@ class YTDownloader:
                     if self.progress_callback:
                         self.progress_callback(f"Retry {attempt + 1}/{max_retries + 1}...")
                 
-                ydl.download([url])
-                return True
+                return self._download_attempt(ydl, info, attempt)
                 
             except Exception as e:
-                last_error = e
-                self.logger.warning(f"Falha na tentativa {attempt + 1}: {str(e)}")
+                self._record_attempt_error(e, attempt)
                 
+                if classify_error(e) == ERROR_PERMANENT:
+                    self.logger.error(f"Erro permanente para {url}, sem novas tentativas: {str(e)}")
+                    raise
                 if attempt < max_retries:
-                    wait_time = 2 ** attempt  # Backoff exponencial
-                    self.logger.info(f"Aguardando {wait_time}s antes da próxima tentativa...")
+                    wait_time = backoff_delay(attempt + 1)  # Backoff exponencial com jitter
+                    self.logger.info(f"Aguardando {wait_time:.1f}s antes da próxima tentativa...")
                     time.sleep(wait_time)
                 else:
-                    self.logger.error(f"Todas as tentativas falharam para {url}: {str(last_error)}")
-                    raise last_error
+                    self.logger.error(f"Todas as tentativas falharam para {url}: {str(e)}")
+                    raise
+        
+        return None
+    
+    def _retry_request(self, entry: Dict[str, Any], attempt: int, error: Exception,
+                       info: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Resultado de uma tentativa com falha, a ser reagendada por ``_resolve_retry``."""
+        self._record_attempt_error(error, attempt)
+        return {'title': entry.get('title', 'Unknown'), 'status': 'retry',
+                'entry': entry, 'info': info or entry, 'attempt': attempt, 'error': error}
+    
+    def _resolve_retry(self, outcome: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Põe um pedido de retry na fila de atraso.
+
+        Retorna ``None`` se a entrada foi reagendada, ou o resultado de falha
+        definitivo (erro permanente ou tentativas esgotadas). A fila guarda
+        o par ``(entrada flat, info dict)``.
+        """
+        entry, info, error = outcome['entry'], outcome['info'], outcome['error']
+        attempt = outcome['attempt'] + 1
+        url = self._entry_url(entry)
         
-        return False
+        delay = self.retries.schedule((entry, info), attempt, error)
+        if delay is None:
+            if classify_error(error) == ERROR_PERMANENT:
+                self.logger.warning(f"Erro permanente para {url}, sem novas tentativas")
+            return self._entry_failure(entry, error, info)
+        
+        self.logger.info(f"Tentativa {attempt + 1}/{self.max_retries + 1} para {url[:50]} em {delay:.1f}s")
+        self._emit_progress(make_event(self._task_id(info), STAGE_RETRY_WAIT, entry.get('title'),
+                                       attempt=attempt, max_attempts=self.max_retries + 1, retry_in=delay))
+        return None
+    
+    @staticmethod
+    def _entry_url(entry: Dict[str, Any]) -> str:
+        """URL canônica de uma entrada, resolvida ou apenas listada (flat)."""
+        return entry.get('webpage_url') or entry.get('original_url') or entry.get('url', '')
+    
+    @classmethod
+    def _task_id(cls, entry: Dict[str, Any]) -> str:
+        """Identificador da tarefa nos eventos de progresso (o mesmo dos hooks)."""
+        return entry.get('id') or cls._entry_url(entry)
+    
+    @staticmethod
+    def _output_path(info: Dict[str, Any]) -> Optional[Path]:
+        """Arquivo final informado pelo yt-dlp, sem varrer a pasta de destino.
+
+        Depois de ``post_process`` o caminho final fica no próprio info dict;
+        num download com pós-processadores embutidos, em ``requested_downloads``.
+        """
+        filepath = info.get('filepath') or (info.get('requested_downloads') or [{}])[-1].get('filepath')
+        return Path(filepath) if filepath else None
+    
+    def _get_extract_opts(self, format_type: str, quality: str) -> Dict[str, Any]:
+        """Opções para extração/resolução, com a mesma seleção de formato do download."""
+        return {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': False,
+            'format': self._get_ydl_opts(format_type, quality)['format'],
+        }
     
-    def _find_output_file(self, title: str, format_type: str, playlist_title: str = None) -> Optional[Path]:
-        """Encontra o arquivo de saída baseado no título."""
-        search_dir = self.download_path
-        if playlist_title:
-            safe_folder_name = FileUtils.sanitize_filename(playlist_title)
-            search_dir = self.download_path / safe_folder_name
+    def _get_playlist_title(self, info: Dict[str, Any]) -> str:
+        """Título usado como nome da pasta da playlist."""
+        # Tentar várias formas de obter o título da playlist
+        playlist_title = (info.get('title', '') or 
+                        info.get('playlist_title', '') or 
+                        info.get('uploader', '') or
+                        'Playlist').strip()
         
-        return FileUtils.find_downloaded_file(search_dir, title, format_type)
+        # Se ainda for vazio, NA ou inválido, usar um nome padrão
+        if not playlist_title or playlist_title.lower() in ['na', 'none', 'null']:
+            playlist_title = f"Playlist_{info.get('id', 'Unknown')}"
+        
+        return playlist_title
+    
+    def _create_playlist_folder(self, playlist_title: str):
+        import re
+        safe_folder_name = re.sub(r'[<>:"/\\|?*]', '_', playlist_title)
+        playlist_folder = self.download_path / safe_folder_name
+        playlist_folder.mkdir(exist_ok=True)
+    
+    def _download_entry(self, ydl, entry: Dict[str, Any], format_type: str, quality: str,
+                        attempt: int = 0, info: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Baixa uma entrada de playlist e registra no histórico.
+
+        ``entry`` é a entrada da listagem (flat) e ``info`` o info dict já
+        resolvido, se houver. Uma falha no download vira um pedido de retry
+        (status ``retry``) em vez de esperar aqui; quem chamou decide via
+        ``_resolve_retry``.
+        """
+        info = info or entry
+        try:
+            if attempt == 0:
+                self.logger.log_download_start(self._entry_url(entry), format_type, quality)
+            downloaded = self._download_attempt(ydl, info, attempt) or info
+        except Exception as e:
+            return self._retry_request(entry, attempt, e, info)
+        
+        try:
+            return self._record_download(downloaded, entry, format_type, quality)
+        except Exception as e:
+            return self._entry_failure(entry, e, info)
+    
+    def _record_download(self, info: Dict[str, Any], entry: Dict[str, Any], format_type: str,
+                         quality: str) -> Dict[str, Any]:
+        """Registra uma entrada já baixada (e pós-processada) no histórico."""
+        title = info.get('title') or entry.get('title') or 'Unknown'
+        duration = info.get('duration') or 0
+        
+        # Tamanho do arquivo final, no caminho que o próprio yt-dlp gravou
+        file_path = self._output_path(info)
+        try:
+            size_bytes = file_path.stat().st_size if file_path else 0
+        except OSError:
+            size_bytes = 0
+        file_size = round(size_bytes / (1024 * 1024), 2)
+        
+        # Adicionar ao histórico
+        self.history.add_download(
+            title=title,
+            duration=duration,
+            file_size=size_bytes,
+            format_output=format_type,
+            quality=quality,
+            url=self._entry_url(entry)
+        )
+        
+        self.logger.log_download_success(title, file_size, duration / 60 if duration else 0)
+        self._emit_progress(make_event(self._task_id(info or entry), STAGE_FINISHED, title))
+        if self._journal is not None:
+            self._journal.mark(entry, STATE_DONE)
+        
+        result = {
+            'title': title,
+            'status': 'success',
+            'video_id': info.get('id') or entry.get('id'),
+            'url': self._entry_url(entry),
+            'filepath': str(file_path) if file_path else None,
+            'bytes': size_bytes,
+            'timings': self._pop_timings(info, entry),
+        }
+        self._emit_result(result)
+        return result
+    
+    @staticmethod
+    def _split_ydl_opts(ydl_opts: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Separa as opções em (só download, só pós-processamento)."""
+        download_opts = dict(ydl_opts, postprocessors=[])
+        return download_opts, ydl_opts
+    
+    @staticmethod
+    def _run_postprocessors(pp_ydl, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa os pós-processadores (FFmpeg) sobre um arquivo já baixado."""
+        downloaded = dict(info, **(info.get('requested_downloads') or [{}])[-1])
+        filepath = downloaded.get('filepath')
+        if not filepath:
+            return info
+        return pp_ydl.post_process(filepath, downloaded)
+    
+    def _create_concurrency_controller(self, total: Optional[int]) -> ConcurrencyController:
+        """Controlador AIMD usado quando max_parallel_downloads é "auto"."""
+        max_limit = self.AUTO_MAX_PARALLEL_DOWNLOADS
+        if total is not None:
+            max_limit = max(1, min(max_limit, total))
+        
+        def log_adjustment(old_limit, new_limit, reason, throughput):
+            self.logger.info(f"Concorrência ajustada: {old_limit} → {new_limit} "
+                             f"({reason}, {throughput / (1024 * 1024):.2f} MB/s)")
+        
+        return ConcurrencyController(self.progress.downloaded_bytes, max_limit=max_limit,
+                                     on_adjust=log_adjustment)
+    
+    def _concurrency_metrics(self) -> Optional[Dict[str, Any]]:
+        return self.concurrency.metrics() if self.concurrency is not None else None
     
-    def _download_playlist_parallel(self, ydl, entries: List[Dict], format_type: str, quality: str, playlist_title: str) -> List[Dict]:
-        """Download paralelo de playlist."""
-        results = []
-        max_workers = min(self.config.get('max_parallel_downloads', 3), len(entries))
+    def _report_playlist_progress(self, completed: int, total: Optional[int]):
+        if self.progress_callback:
+            self.progress_callback(f"Playlist: {completed}/{total or '?'} concluídos")
+    
+    def _download_playlist_parallel(self, ydl, entries: Iterable[Dict], format_type: str, quality: str,
+                                    playlist_title: str, total: Optional[int] = None,
+                                    prefetcher: Optional[MetadataPrefetcher] = None,
+                                    ydl_cache: Optional[YoutubeDLCache] = None,
+                                    results: Optional[List[Dict]] = None) -> List[Dict]:
+        """Download paralelo de playlist.
+
+        As entradas são consumidas sob demanda, então ``entries`` pode ser um
+        gerador de entradas flat de tamanho arbitrário. Com ``prefetcher``, a
+        resolução de metadados corre à frente em pool próprio e os workers
+        recebem info dicts prontos para baixar.
+
+        Rede e CPU ficam em pools separados: ``max_parallel_downloads``
+        threads só baixam o áudio de origem e entregam o arquivo, por uma fila
+        limitada, a um pool de ``os.cpu_count()`` threads que roda o FFmpeg.
+        Cada thread reaproveita um YoutubeDL por conjunto de opções via
+        ``ydl_cache`` (criado aqui se não for fornecido).
+
+        Com ``max_parallel_downloads = "auto"``, o pool é dimensionado para o
+        teto e um ``ConcurrencyController`` decide quantos downloads ficam
+        ativos a cada momento.
+
+        Entradas com falha transitória vão para a fila de atraso
+        (``self.retries``) e o worker fica livre na hora; quando o backoff
+        vence, elas têm prioridade sobre as próximas entradas da playlist.
+        """
+        results = [] if results is None else results
+        max_workers = self.config.get('max_parallel_downloads', 3)
+        if max_workers == 'auto':
+            self.concurrency = self._create_concurrency_controller(total)
+            max_workers = self.concurrency.max_limit
+        if total is not None:
+            max_workers = max(1, min(max_workers, total))
+        
+        def worker_limit():
+            return self.concurrency.update() if self.concurrency is not None else max_workers
         
-        def download_single(entry):
-            if not entry:
-                return {'title': 'Unknown', 'status': 'failed', 'error': 'Entry is None'}
+        if prefetcher is not None:
+            ready_entries = prefetcher.iter_resolved(entries)
+        else:
+            ready_entries = ((entry, entry, None) for entry in entries)
+        
+        ydl_opts = self._get_ydl_opts(format_type, quality, playlist_title is not None, playlist_title)
+        download_opts, postprocess_opts = self._split_ydl_opts(ydl_opts)
+        cpu_workers = os.cpu_count() or 1
+        postprocess_pool = None
+        if ydl_opts.get('postprocessors'):
+            postprocess_pool = BoundedExecutor(cpu_workers, cpu_workers, thread_name_prefix="yt-postprocess")
+        
+        owns_cache = ydl_cache is None
+        if owns_cache:
+            ydl_cache = YoutubeDLCache(self._create_ydl)
+        
+        def postprocess(info, entry):
+            try:
+                info = self._run_postprocessors(ydl_cache.get(postprocess_opts), info)
+                return self._record_download(info, entry, format_type, quality)
+            except Exception as e:
+                return self._entry_failure(entry, e, info)
+        
+        def download_single(entry, attempt, info):
+            if postprocess_pool is None:
+                return self._download_entry(ydl_cache.get(ydl_opts), entry, format_type, quality, attempt, info)
             
             try:
-                self.logger.log_download_start(entry['webpage_url'], format_type, quality)
-                
-                # Criar um downloader separado para thread
-                with yt_dlp.YoutubeDL(self._get_ydl_opts(format_type, quality, True, playlist_title)) as thread_ydl:
-                    success = self._download_with_retry(thread_ydl, entry['webpage_url'])
-                    
-                    if success:
-                        file_path = self._find_output_file(entry.get('title', 'Unknown'), format_type, playlist_title)
-                        file_size = FileUtils.get_file_size(file_path) if file_path else 0
-                        
-                        self.history.add_download(
-                            title=entry.get('title', 'Unknown'),
-                            duration=entry.get('duration', 0),
-                            file_size=file_size * 1024 * 1024,
-                            format_output=format_type,
-                            quality=quality,
-                            url=entry['webpage_url']
-                        )
-                        
-                        self.logger.log_download_success(
-                            entry.get('title', 'Unknown'), 
-                            file_size, 
-                            entry.get('duration', 0) / 60 if entry.get('duration') else 0
-                        )
-                        
-                        return {'title': entry.get('title', 'Unknown'), 'status': 'success'}
-                
+                if attempt == 0:
+                    self.logger.log_download_start(self._entry_url(entry), format_type, quality)
+                # Um downloader por thread, reaproveitado entre as entradas
+                downloaded = self._download_attempt(ydl_cache.get(download_opts), info, attempt) or info
             except Exception as e:
-                self.logger.log_download_error(entry['webpage_url'], str(e))
-                return {'title': entry.get('title', 'Unknown'), 'status': 'failed', 'error': str(e)}
+                return self._retry_request(entry, attempt, e, info)
+            
+            # Bloqueia se a fila de CPU estiver cheia (backpressure para a rede)
+            return postprocess_pool.submit(postprocess, downloaded, entry)
+        
+        downloading, finishing = set(), set()
+        # No modo auto o limite é reavaliado periodicamente, não só quando algo termina
+        poll_interval = self.concurrency.window if self.concurrency is not None else None
+        
+        def collect(done):
+            for future in done:
+                downloading.discard(future)
+                finishing.discard(future)
+                outcome = future.result()
+                if isinstance(outcome, concurrent.futures.Future):
+                    finishing.add(outcome)
+                else:
+                    collect_outcome(outcome)
+        
+        def collect_outcome(outcome):
+            if outcome['status'] == 'retry':
+                outcome = self._resolve_retry(outcome)
+                if outcome is None:
+                    return
+            results.append(outcome)
+            self._report_playlist_progress(len(results), total)
+        
+        def wait_and_collect():
+            # Acorda no primeiro término, no vencimento de um retry ou na reavaliação do modo auto
+            timeouts = [t for t in (poll_interval, self.retries.next_delay()) if t is not None]
+            timeout = min(timeouts) if timeouts else None
+            pending = downloading | finishing
+            if not pending:
+                time.sleep(timeout or 0)
+                return
+            done, _ = concurrent.futures.wait(pending, timeout=timeout,
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            collect(done)
         
         # Executar downloads em paralelo
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_entry = {executor.submit(download_single, entry): entry for entry in entries}
-            
-            for future in concurrent.futures.as_completed(future_to_entry):
-                result = future.result()
-                results.append(result)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                       thread_name_prefix="yt-download") as executor:
+                def submit_due_retries():
+                    while len(downloading) < worker_limit():
+                        due = self.retries.pop_due()
+                        if due is None:
+                            return
+                        (entry, info), attempt = due
+                        downloading.add(executor.submit(download_single, entry, attempt, info))
+                
+                for entry, resolved, error in ready_entries:
+                    if not entry:
+                        results.append({'title': 'Unknown', 'status': 'failed', 'error': 'Entry is None'})
+                        continue
+                    if error is not None:
+                        # Falha na resolução conta como primeira tentativa
+                        collect_outcome(self._retry_request(entry, 0, error))
+                        continue
+                    
+                    # Só entrega ao pool quando há worker livre; o prefetch segue resolvendo
+                    submit_due_retries()
+                    while len(downloading) >= worker_limit():
+                        wait_and_collect()
+                        submit_due_retries()
+                    
+                    downloading.add(executor.submit(download_single, entry, 0, resolved))
                 
-                if self.progress_callback:
-                    completed = len(results)
-                    total = len(entries)
-                    self.progress_callback(f"Playlist: {completed}/{total} concluídos")
+                while downloading or finishing or self.retries:
+                    wait_and_collect()
+                    submit_due_retries()
+        finally:
+            if postprocess_pool is not None:
+                postprocess_pool.shutdown(wait=True)
+            if owns_cache:
+                ydl_cache.close()
         
         return results
     
+    def _download_playlist_sequential(self, ydl, ready_entries: Iterable[Tuple], format_type: str, quality: str,
+                                      total: Optional[int] = None, results: Optional[List[Dict]] = None) -> List[Dict]:
+        """Download sequencial de playlist a partir de ``(entrada, resolvida, erro)``.
+
+        Uma entrada com falha transitória não bloqueia as seguintes: ela
+        espera na fila de atraso e é retomada assim que o backoff vence.
+        """
+        results = [] if results is None else results
+        
+        def handle(outcome):
+            if outcome['status'] == 'retry':
+                outcome = self._resolve_retry(outcome)
+                if outcome is None:
+                    return
+            results.append(outcome)
+            self._report_playlist_progress(len(results), total)
+        
+        def run_due_retries():
+            due = self.retries.pop_due()
+            while due is not None:
+                (entry, info), attempt = due
+                handle(self._download_entry(ydl, entry, format_type, quality, attempt, info))
+                due = self.retries.pop_due()
+        
+        for entry, resolved, error in ready_entries:
+            if error is not None:
+                # Falha na resolução conta como primeira tentativa
+                handle(self._retry_request(entry, 0, error))
+            else:
+                handle(self._download_entry(ydl, entry, format_type, quality, info=resolved))
+            run_due_retries()
+        
+        # Só resta esperar pelas entradas ainda na fila de atraso
+        while self.retries:
+            time.sleep(self.retries.next_delay())
+            run_due_retries()
+        
+        return results
+    
+    def _entry_failure(self, entry: Dict[str, Any], error: Exception,
+                       info: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Registra a falha de uma entrada (resolução, download ou pós-processamento)."""
+        self.logger.log_download_error(self._entry_url(entry), str(error))
+        self._emit_progress(make_event(self._task_id(info or entry), STAGE_FAILED, entry.get('title'),
+                                       error=str(error)))
+        if self._journal is not None:
+            self._journal.mark(entry, STATE_FAILED, str(error), permanent=classify_error(error) == ERROR_PERMANENT)
+        
+        result = {
+            'title': entry.get('title', 'Unknown'),
+            'status': 'failed',
+            'error': str(error),
+            'error_class': error_class(error),
+            'error_kind': classify_error(error),
+            'video_id': entry.get('id'),
+            'url': self._entry_url(entry),
+            'filepath': None,
+            'bytes': 0,
+            'timings': self._pop_timings(entry, info),
+        }
+        self._emit_result(result)
+        return result
+    
+    @contextlib.contextmanager
+    def _metadata_prefetcher(self, format_type: str, quality: str,
+                             ydl_cache: YoutubeDLCache) -> Iterator[MetadataPrefetcher]:
+        """Prefetcher com um YoutubeDL de resolução por thread do pool."""
+        extract_opts = self._get_extract_opts(format_type, quality)
+        
+        def resolve(entry):
+            with self._timed(entry, 'resolve'):
+                return ydl_cache.get(extract_opts).process_ie_result(dict(entry), download=False)
+        
+        prefetcher = MetadataPrefetcher(
+            resolve,
+            workers=self.config.get('prefetch_workers', 2),
+            depth=self.config.get('prefetch_depth', 4),
+        )
+        try:
+            yield prefetcher
+        finally:
+            prefetcher.close()
+            self.logger.debug(f"Métricas de prefetch: {prefetcher.metrics()}")
+    
+    def _download_playlist_stream(self, info: Dict[str, Any], format_type: str, quality: str,
+                                  journal: Optional[PlaylistJournal] = None) -> Dict[str, Any]:
+        """Download de playlist em streaming a partir da listagem flat.
+
+        Nenhuma entrada é resolvida antes do necessário: o download da
+        primeira começa assim que ela é resolvida, e a memória fica limitada
+        à profundidade do prefetch independentemente do tamanho da playlist.
+        Com ``journal``, entradas já concluídas em uma execução anterior são
+        puladas antes mesmo de serem resolvidas.
+        """
+        playlist_title = self._get_playlist_title(info)
+        self._create_playlist_folder(playlist_title)
+        
+        total = info.get('playlist_count')
+        entries = (entry for entry in info['entries'] if entry)
+        if journal is not None:
+            self._journal = journal
+            entries = journal.track(entries)
+            done = journal.counts()['done']
+            if journal.resumed:
+                self.logger.info(f"Retomando playlist '{playlist_title}': {done} entradas já concluídas")
+            if total is not None:
+                total = max(0, total - done)
+        self.progress.set_total(total)
+        
+        try:
+            results, prefetch_metrics, ydl_cache_metrics = self._run_playlist_stream(
+                entries, format_type, quality, playlist_title, total)
+        finally:
+            self._journal = None
+            if journal is not None:
+                journal.close()
+        
+        return {
+            'type': 'playlist',
+            'title': info.get('title', 'Playlist'),
+            'results': results,
+            'total': len(results),
+            'successful': len([r for r in results if r['status'] == 'success']),
+            'extractor_calls': self.extractor_calls,
+            'prefetch': prefetch_metrics,
+            'ydl_cache': ydl_cache_metrics,
+            'rate_limit': self._rate_limit_metrics(),
+            'concurrency': self._concurrency_metrics(),
+            'retries': self.retries.metrics(),
+            'journal': journal.metrics() if journal is not None else None
+        }
+    
+    def _run_playlist_stream(self, entries: Iterable[Dict], format_type: str, quality: str,
+                             playlist_title: str, total: Optional[int],
+                             results: Optional[List[Dict]] = None) -> Tuple[List[Dict], Dict, Dict]:
+        """Executa o streaming da playlist; retorna resultados e métricas do pipeline.
+
+        ``results`` recebe cada resultado via ``append`` (uma lista nova por padrão).
+        """
+        with YoutubeDLCache(self._create_ydl) as ydl_cache, \
+                self._metadata_prefetcher(format_type, quality, ydl_cache) as prefetcher:
+            if self.config.get('parallel_downloads', False) and total != 1:
+                results = self._download_playlist_parallel(None, entries, format_type, quality, playlist_title,
+                                                           total, prefetcher=prefetcher, ydl_cache=ydl_cache,
+                                                           results=results)
+            else:
+                ydl_opts = self._get_ydl_opts(format_type, quality, playlist_title is not None, playlist_title)
+                with self._create_ydl(ydl_opts) as ydl:
+                    results = self._download_playlist_sequential(ydl, prefetcher.iter_resolved(entries), format_type,
+                                                                 quality, total, results)
+            
+            prefetch_metrics = prefetcher.metrics()
+            ydl_cache_metrics = ydl_cache.metrics()
+        
+        return results, prefetch_metrics, ydl_cache_metrics
+    
+    def _extract_listing(self, ydl, url: str) -> Dict[str, Any]:
+        """Extrai apenas a listagem (sem resolver entradas), seguindo redirecionamentos."""
+        info = ydl.extract_info(url, download=False, process=False)
+        while info.get('_type') in ('url', 'url_transparent'):
+            info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+        
+        if 'entries' not in info:
+            # Não era uma playlist: completar a resolução sem nova extração
+            info = ydl.process_ie_result(info, download=False)
+        return info
+    
     def get_video_info(self, url: str) -> Dict[str, Any]:
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
-            'extract_flat': False,
+            'extract_flat': 'in_playlist',
         }
         
         try:
+            import yt_dlp
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
                 
-                if 'entries' in info:  # Playlist
-                    entries = list(info['entries'])
+                if 'entries' in info:  # Playlist (entradas flat, sem formatos)
+                    entries = [entry for entry in info['entries'] if entry]
                     return {
                         'type': 'playlist',
                         'title': info.get('title', 'Playlist'),
                         'count': len(entries),
-                        'duration': sum(entry.get('duration', 0) for entry in entries if entry),
+                        'duration': sum(entry.get('duration') or 0 for entry in entries),
                         'entries': entries
                     }
                 else:  # Single video
@@ -304,130 +907,241 @@ class YTDownloader:
         except Exception as e:
             raise Exception(f"Erro ao obter informações do vídeo: {str(e)}")
     
+    def _reset_run_state(self):
+        """Zera contadores e filas antes de um novo download."""
+        self.extractor_calls = 0
+        self.progress.reset()
+        with self._throttle_lock:
+            self._throttle_offsets.clear()
+        self.concurrency = None
+        self.retries = RetryScheduler(self.max_retries)
+        self._timings.clear()
+        self._postprocess_started.clear()
+    
+    def _iter_results(self, run: Callable[..., Dict[str, Any]], *args) -> Iterator[Dict[str, Any]]:
+        """Executa ``run(*args)`` numa thread e gera cada resultado de entrada assim que sai."""
+        results: "queue.Queue" = queue.Queue()
+        outcome: Dict[str, Any] = {}
+        
+        def target():
+            try:
+                outcome['summary'] = run(*args)
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                results.put(_RUN_FINISHED)
+        
+        listener = results.put
+        self._result_listeners.append(listener)
+        worker = threading.Thread(target=target, name="yt-download-run", daemon=True)
+        worker.start()
+        try:
+            while True:
+                result = results.get()
+                if result is _RUN_FINISHED:
+                    break
+                yield result
+        finally:
+            # Fechar o gerador não cancela os downloads em andamento: espera o fim deles
+            worker.join()
+            self._result_listeners.remove(listener)
+        
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['summary']
+    
+    def iter_download(self, url: str, format_type: str = "mp3", quality: str = "320",
+                      is_playlist: bool = False) -> Iterator[Dict[str, Any]]:
+        """Como ``download()``, mas gera o resultado de cada entrada assim que ela termina.
+
+        Cada item traz ``status``, ``title``, ``video_id``, ``url``, ``filepath``,
+        ``bytes`` e ``timings`` (segundos de resolve/download/postprocess); falhas
+        trazem também ``error``, ``error_class`` e ``error_kind`` (permanent/transient).
+        O resumo de ``download()`` é o valor de retorno do gerador.
+        """
+        return self._iter_results(self.download, url, format_type, quality, is_playlist)
+    
+    def iter_download_batch(self, urls: Iterable[str], format_type: str = "mp3",
+                            quality: str = "320") -> Iterator[Dict[str, Any]]:
+        """Como ``download_batch()``, gerando o resultado de cada vídeo assim que ele termina."""
+        return self._iter_results(self.download_batch, urls, format_type, quality)
+    
+    def download_batch(self, urls: Iterable[str], format_type: str = "mp3", quality: str = "320") -> Dict[str, Any]:
+        """Baixa uma sequência de URLs (arquivo em lote ou stdin) num único pipeline.
+
+        As URLs são validadas e deduplicadas conforme são lidas; os vídeos
+        entram como entradas flat no mesmo pipeline de streaming das
+        playlists, então os itens em voo ficam limitados pelo prefetch e pelos
+        workers, não pelo tamanho da entrada. Playlists do lote esperam numa
+        fila de até ``BATCH_PLAYLIST_QUEUE`` URLs: quando ela enche ou o lote
+        acaba, o trecho de vídeos em andamento termina e as playlists são
+        baixadas uma a uma pelo caminho normal (com diário de retomada).
+
+        O resumo guarda só contadores e amostras de até ``BATCH_SAMPLE_SIZE``
+        falhas e URLs inválidas, então a memória não cresce com o lote. O
+        resultado de cada vídeo sai pelo ``result_listener`` ou por
+        ``iter_download_batch()``.
+        """
+        records = URLValidator.iter_classify(urls)
+        counts = {'urls': 0, 'duplicates': 0, 'invalid': 0, 'extractor_calls': 0}
+        invalid: List[Dict[str, Any]] = []
+        videos = _ResultTally(self.BATCH_SAMPLE_SIZE)
+        playlists = _ResultTally(self.BATCH_SAMPLE_SIZE)
+        exhausted = False
+        
+        while not exhausted:
+            playlist_urls: List[str] = []
+            
+            def video_entries():
+                nonlocal exhausted
+                for record in records:
+                    counts['urls'] += 1
+                    if record['status'] == 'invalid':
+                        self.logger.warning(f"URL inválida no lote (#{record['index'] + 1}): {record['error']}")
+                        counts['invalid'] += 1
+                        if len(invalid) < self.BATCH_SAMPLE_SIZE:
+                            invalid.append(record)
+                    elif record['status'] == 'duplicate':
+                        counts['duplicates'] += 1
+                    elif record['is_playlist']:
+                        playlist_urls.append(record['url'])
+                        if len(playlist_urls) >= self.BATCH_PLAYLIST_QUEUE:
+                            return  # Fila cheia: encerra este trecho e baixa as playlists
+                    else:
+                        yield {'_type': 'url', 'id': record['video_id'], 'url': record['canonical_url']}
+                exhausted = True
+            
+            try:
+                self._reset_run_state()
+                self.progress.set_total(None)
+                _, prefetch_metrics, ydl_cache_metrics = self._run_playlist_stream(
+                    video_entries(), format_type, quality, None, None, results=videos)
+                counts['extractor_calls'] += self.extractor_calls
+                # Métricas do pipeline: as do último trecho de vídeos
+                pipeline_metrics = {
+                    'prefetch': prefetch_metrics,
+                    'ydl_cache': ydl_cache_metrics,
+                    'rate_limit': self._rate_limit_metrics(),
+                    'concurrency': self._concurrency_metrics(),
+                    'retries': self.retries.metrics(),
+                }
+            except Exception as e:
+                raise Exception(f"Erro durante o download em lote: {str(e)}")
+            
+            for url in playlist_urls:
+                try:
+                    summary = self.download(url, format_type, quality, is_playlist=True)
+                    playlists.append({'type': 'playlist', 'title': summary.get('title', url), 'url': url,
+                                      'status': summary.get('status', 'success'), 'error': summary.get('error'),
+                                      'total': summary.get('total'), 'successful': summary.get('successful')})
+                except Exception as e:
+                    self.logger.log_download_error(url, str(e))
+                    playlists.append({'type': 'playlist', 'title': url, 'url': url, 'status': 'failed',
+                                      'error': str(e)})
+        
+        return {
+            'type': 'batch',
+            'urls': counts['urls'],
+            'duplicates': counts['duplicates'],
+            'invalid': counts['invalid'],
+            'invalid_sample': invalid,
+            **videos.summary(),
+            'playlists': playlists.summary(),
+            'extractor_calls': counts['extractor_calls'],
+            **pipeline_metrics,
+        }
+    
     def download(self, url: str, format_type: str = "mp3", quality: str = "320", 
                 is_playlist: bool = False) -> Dict[str, Any]:
         try:
-            # Primeiro extrair informações para obter o título da playlist
-            temp_ydl_opts = {'quiet': True, 'no_warnings': True, 'extract_flat': False}
-            with yt_dlp.YoutubeDL(temp_ydl_opts) as temp_ydl:
-                info = temp_ydl.extract_info(url, download=False)
+            self._reset_run_state()
+            stream = is_playlist and self.config.get('stream_playlists', True)
+            resume = stream and self.config.get('resume_playlists', True)
+            
+            # Job interrompido com a listagem completa no diário: nada a extrair.
+            # Se só restaram falhas, a playlist é extraída de novo (pode ter
+            # entradas novas) e o diário apenas pula as já concluídas.
+            journal = PlaylistJournal.find(url, format_type, quality) if resume else None
+            if journal is not None and journal.listing_complete and journal.interrupted:
+                journal.resumed = True
+                return self._download_playlist_stream(journal.listing_info(), format_type, quality, journal)
+            
+            # Extração única: os info dicts resolvidos aqui alimentam direto o download
+            with self._create_ydl(self._get_extract_opts(format_type, quality)) as temp_ydl:
+                if stream:
+                    info = self._extract_listing(temp_ydl, url)
+                else:
+                    info = temp_ydl.extract_info(url, download=False)
+            
+            if stream and 'entries' in info:
+                journal = PlaylistJournal.open(url, info, format_type, quality) if resume else None
+                return self._download_playlist_stream(info, format_type, quality, journal)
             
             # Agora gerar as opções com o título correto da playlist
             playlist_title = None
             if is_playlist and 'entries' in info:
-                # Tentar várias formas de obter o título da playlist
-                playlist_title = (info.get('title', '') or 
-                                info.get('playlist_title', '') or 
-                                info.get('uploader', '') or
-                                'Playlist').strip()
-                
-                # Se ainda for vazio, NA ou inválido, usar um nome padrão
-                if not playlist_title or playlist_title.lower() in ['na', 'none', 'null']:
-                    playlist_title = f"Playlist_{info.get('id', 'Unknown')}"
+                playlist_title = self._get_playlist_title(info)
             
             ydl_opts = self._get_ydl_opts(format_type, quality, is_playlist, playlist_title)
             
             # Criar pasta da playlist se necessário
             if is_playlist and playlist_title:
-                import re
-                safe_folder_name = re.sub(r'[<>:"/\\|?*]', '_', playlist_title)
-                playlist_folder = self.download_path / safe_folder_name
-                playlist_folder.mkdir(exist_ok=True)
+                self._create_playlist_folder(playlist_title)
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with self._create_ydl(ydl_opts) as ydl:
                 
                 if 'entries' in info:  # Playlist
+                    self.progress.set_total(len(info['entries']))
                     results = []
+                    ydl_cache_metrics = None
                     
                     # Download paralelo se configurado
                     if self.config.get('parallel_downloads', False) and len(info['entries']) > 1:
-                        results = self._download_playlist_parallel(ydl, info['entries'], format_type, quality, playlist_title)
+                        with YoutubeDLCache(self._create_ydl) as ydl_cache:
+                            results = self._download_playlist_parallel(ydl, info['entries'], format_type, quality,
+                                                                       playlist_title, len(info['entries']),
+                                                                       ydl_cache=ydl_cache)
+                            ydl_cache_metrics = ydl_cache.metrics()
                     else:
-                        # Download sequencial
-                        for entry in info['entries']:
-                            if entry:  # Pode ser None para vídeos indisponíveis
-                                try:
-                                    self.logger.log_download_start(entry['webpage_url'], format_type, quality)
-                                    
-                                    # Download com retry
-                                    success = self._download_with_retry(ydl, entry['webpage_url'])
-                                    
-                                    if success:
-                                        # Calcular tamanho do arquivo
-                                        file_path = self._find_output_file(entry.get('title', 'Unknown'), format_type, playlist_title)
-                                        file_size = FileUtils.get_file_size(file_path) if file_path else 0
-                                        
-                                        # Adicionar ao histórico
-                                        self.history.add_download(
-                                            title=entry.get('title', 'Unknown'),
-                                            duration=entry.get('duration', 0),
-                                            file_size=file_size * 1024 * 1024,  # Converter MB para bytes
-                                            format_output=format_type,
-                                            quality=quality,
-                                            url=entry['webpage_url']
-                                        )
-                                        
-                                        self.logger.log_download_success(
-                                            entry.get('title', 'Unknown'), 
-                                            file_size, 
-                                            entry.get('duration', 0) / 60 if entry.get('duration') else 0
-                                        )
-                                        
-                                        results.append({
-                                            'title': entry.get('title', 'Unknown'),
-                                            'status': 'success'
-                                        })
-                                    
-                                except Exception as e:
-                                    self.logger.log_download_error(entry['webpage_url'], str(e))
-                                    results.append({
-                                        'title': entry.get('title', 'Unknown'),
-                                        'status': 'failed',
-                                        'error': str(e)
-                                    })
+                        # Download sequencial (entradas None são vídeos indisponíveis)
+                        ready_entries = ((entry, entry, None) for entry in info['entries'] if entry)
+                        results = self._download_playlist_sequential(ydl, ready_entries, format_type, quality,
+                                                                     len(info['entries']))
                     
                     return {
                         'type': 'playlist',
                         'title': info.get('title', 'Playlist'),
                         'results': results,
                         'total': len(info['entries']),
-                        'successful': len([r for r in results if r['status'] == 'success'])
+                        'successful': len([r for r in results if r['status'] == 'success']),
+                        'extractor_calls': self.extractor_calls,
+                        'ydl_cache': ydl_cache_metrics,
+                        'rate_limit': self._rate_limit_metrics(),
+                        'concurrency': self._concurrency_metrics(),
+                        'retries': self.retries.metrics()
                     }
                 
                 else:  # Single video
+                    self.progress.set_total(1)
                     self.logger.log_download_start(url, format_type, quality)
                     
                     # Download com retry
-                    success = self._download_with_retry(ydl, url)
+                    try:
+                        downloaded = self._download_with_retry(ydl, info) or info
+                    except Exception as e:
+                        self._entry_failure(info, e)
+                        raise
                     
-                    if success:
-                        # Calcular tamanho do arquivo
-                        file_path = self._find_output_file(info.get('title', 'Unknown'), format_type)
-                        file_size = FileUtils.get_file_size(file_path) if file_path else 0
-                        
-                        # Adicionar ao histórico
-                        self.history.add_download(
-                            title=info.get('title', 'Unknown'),
-                            duration=info.get('duration', 0),
-                            file_size=file_size * 1024 * 1024,  # Converter MB para bytes
-                            format_output=format_type,
-                            quality=quality,
-                            url=url
-                        )
-                        
-                        self.logger.log_download_success(
-                            info.get('title', 'Unknown'), 
-                            file_size, 
-                            info.get('duration', 0) / 60 if info.get('duration') else 0
-                        )
-                        
-                        return {
-                            'type': 'video',
-                            'title': info.get('title', 'Unknown'),
-                            'filename': f"{info.get('title', 'Unknown')}.{format_type}",
-                            'status': 'success',
-                            'file_size': file_size
-                        }
+                    # Histórico, evento final e resultado estruturado, como nas entradas de playlist
+                    result = self._record_download(downloaded, info, format_type, quality)
+                    filename = Path(result['filepath']).name if result['filepath'] else f"{result['title']}.{format_type}"
+                    return dict(
+                        result,
+                        type='video',
+                        filename=filename,
+                        file_size=round(result['bytes'] / (1024 * 1024), 2),
+                        extractor_calls=self.extractor_calls
+                    )
                     
         except Exception as e:
             raise Exception(f"Erro durante o download: {str(e)}")
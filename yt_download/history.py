@@ -1,30 +1,296 @@
+import contextlib
+import hashlib
 import json
 import os
+import shutil
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
-from .config import HISTORY_FILE, get_storage_path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from .config import HISTORY_FILE, LEGACY_HISTORY_FILE, get_storage_path
+from .history_archive import ARCHIVE_DIR, HistoryArchive, merge_stats
+from .history_index import HistoryIndex
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# Tamanho dos blocos lidos de trás para frente em get_recent
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        'offset': 0,  # Bytes do histórico já contabilizados
+        'count': 0,
+        'total_size_mb': 0.0,
+        'total_duration_minutes': 0.0,
+        'first_download': None,
+        'most_recent': None,
+        'by_format': {},
+        'by_day': {},
+    }
+
+
+def _accumulate(stats: Dict[str, Any], entry: Dict[str, Any]):
+    """Soma uma entrada do histórico aos agregados."""
+    size = entry.get('file_size_mb', 0) or 0
+    duration = entry.get('duration_minutes', 0) or 0
+    date = entry.get('date')
+    
+    stats['count'] += 1
+    stats['total_size_mb'] += size
+    stats['total_duration_minutes'] += duration
+    if date:
+        stats['first_download'] = stats['first_download'] or date
+        stats['most_recent'] = date
+    
+    by_format = stats['by_format'].setdefault(entry.get('format') or '?',
+                                              {'count': 0, 'size_mb': 0.0, 'duration_minutes': 0.0})
+    by_format['count'] += 1
+    by_format['size_mb'] += size
+    by_format['duration_minutes'] += duration
+    
+    if date:
+        by_day = stats['by_day'].setdefault(date[:10], {'count': 0, 'size_mb': 0.0})
+        by_day['count'] += 1
+        by_day['size_mb'] += size
+
+
+@contextlib.contextmanager
+def _process_lock(lock_path: Path) -> Iterator[None]:
+    """Lock exclusivo entre processos, via arquivo de lock ao lado do histórico."""
+    lock_path.parent.mkdir(exist_ok=True)
+    with open(lock_path, 'a+') as lock_file:
+        if os.name == "nt":
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
 
 class DownloadHistory:
+    """Histórico de downloads em JSONL (uma linha por download, só acréscimo).
+
+    Cada download custa uma escrita de uma linha, independentemente do
+    tamanho do histórico. As escritas são serializadas por um lock de thread
+    (workers paralelos) e por um lock de arquivo (vários processos do CLI).
+    O antigo ``yt_download_history.json`` é migrado na primeira abertura.
+
+    Nada é lido na construção: ``get_recent`` lê só o fim do arquivo e o
+    histórico completo (``history``) é carregado apenas quando usado.
+
+    As estatísticas ficam em ``*.stats.json`` ao lado do histórico e são
+    atualizadas a cada acréscimo; o arquivo guarda até que byte do histórico
+    já foi somado, então linhas escritas por versões antigas ou por um
+    processo interrompido são contabilizadas na próxima leitura.
+
+    Meses encerrados saem do arquivo ativo para segmentos comprimidos em
+    ``history/`` (rotação automática no primeiro download de um mês novo,
+    ou via ``compact``). As estatísticas e o índice de busca continuam
+    cobrindo esses meses: os agregados já os contêm e só o offset muda.
+    """
+    
     def __init__(self, history_file: str = HISTORY_FILE):
         self.history_file = get_storage_path(history_file)
-        self.history = self.load_history()
+        self.lock_file = self.history_file.with_name(self.history_file.name + ".lock")
+        self.stats_file = self.history_file.with_suffix(".stats.json")
+        self.archive = HistoryArchive(self.history_file.parent / ARCHIVE_DIR)
+        self.index = HistoryIndex(self.history_file.with_suffix(".index.sqlite"), self.history_file, self.archive)
+        self._lock = threading.Lock()
+        self._history: Optional[List[Dict[str, Any]]] = None
+        self._migrate_legacy_history()
     
-    def load_history(self) -> List[Dict[str, Any]]:
+    @property
+    def history(self) -> List[Dict[str, Any]]:
+        """Histórico completo, carregado na primeira vez que é pedido."""
+        if self._history is None:
+            self._history = self.load_history()
+        return self._history
+    
+    def _migrate_legacy_history(self):
+        """Converte o histórico JSON antigo para JSONL, uma única vez."""
         if self.history_file.exists():
+            return
+        legacy_file = get_storage_path(LEGACY_HISTORY_FILE)
+        if not legacy_file.exists():
+            return
+        
+        with _process_lock(self.lock_file):
+            if self.history_file.exists():  # Outro processo já migrou
+                return
             try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
             except (json.JSONDecodeError, FileNotFoundError):
-                pass
-        return []
+                entries = []
+            
+            temp_file = self.history_file.with_name(self.history_file.name + ".tmp")
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(temp_file, self.history_file)
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+    
+    def load_history(self) -> List[Dict[str, Any]]:
+        history = list(self.archive.iter_entries())
+        if self.history_file.exists():
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        history.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # Linha incompleta de uma escrita interrompida
+        return history
+    
+    def _append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with _process_lock(self.lock_file):
+            with open(self.history_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._sync_stats()
+            if self._needs_rotation():
+                self._rotate()
+    
+    def _needs_rotation(self) -> bool:
+        """O arquivo ativo começa num mês anterior ao atual? (lê só a primeira linha)"""
+        try:
+            with open(self.history_file, 'rb') as f:
+                first = json.loads(f.readline())
+        except (OSError, json.JSONDecodeError):
+            return False
+        month = (first.get('date') or '')[:7]
+        return bool(month) and month < datetime.now().strftime('%Y-%m')
+    
+    def _rotate(self) -> Dict[str, Any]:
+        """Move os meses encerrados para segmentos comprimidos (chamar com o lock de processo).
+
+        Estatísticas e índice são sincronizados antes; depois da reescrita do
+        arquivo ativo só os offsets são ajustados, pois as linhas movidas já
+        estavam contabilizadas.
+
+        O manifesto dos segmentos registra o tamanho e o hash do trecho do
+        arquivo ativo que foi arquivado antes de ele ser reescrito. Se o
+        processo cair entre as duas etapas, a próxima rotação conclui a
+        reescrita em vez de arquivar as mesmas linhas de novo.
+        """
+        stats = self._sync_stats()
+        if self.index.index_file.exists():
+            self.index.sync()
+        self._finish_rotation(stats)
+        
+        current_month = datetime.now().strftime('%Y-%m')
+        _, months, size, digest = self._split_active(current_month)
+        if not months:
+            return {'archived': 0, 'months': []}
+        
+        for _, summary in months.values():
+            del summary['offset']
+        self.archive.add_months(months, {'month': current_month, 'size': size, 'sha256': digest})
+        self._finish_rotation(stats)
+        return {
+            'archived': sum(len(lines) for lines, _ in months.values()),
+            'months': sorted(months),
+        }
+    
+    def _split_active(self, current_month: str, limit: Optional[int] = None) -> Tuple[List[bytes], Dict[str, Any], int, str]:
+        """Separa as linhas completas do arquivo ativo (até ``limit`` bytes) em mantidas e arquivadas.
+
+        Retorna ``(mantidas, {mês: (linhas, resumo)}, bytes lidos, sha256 dos bytes lidos)``.
+        """
+        months: Dict[str, Any] = {}
+        kept = []
+        size = 0
+        digest = hashlib.sha256()
+        with open(self.history_file, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n') or (limit is not None and size + len(raw) > limit):
+                    break  # Resto de uma escrita interrompida (nunca contabilizado)
+                size += len(raw)
+                digest.update(raw)
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                month = (entry.get('date') or '')[:7]
+                if not month or month >= current_month:
+                    kept.append(raw)
+                    continue
+                lines, summary = months.setdefault(month, ([], _empty_stats()))
+                lines.append(raw)
+                _accumulate(summary, entry)
+        return kept, months, size, digest.hexdigest()
     
-    def save_history(self):
-        self.history_file.parent.mkdir(exist_ok=True)
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, indent=2, ensure_ascii=False)
+    def _finish_rotation(self, stats: Dict[str, Any]):
+        """Reescreve o arquivo ativo sem as linhas de uma rotação já confirmada no manifesto."""
+        rotation = self.archive.pending_rotation()
+        if rotation is None:
+            return
+        if self.history_file.exists():
+            kept, _, size, digest = self._split_active(rotation['month'], rotation['size'])
+            # Outro conteúdo no trecho registrado: a reescrita já tinha acontecido
+            if (size, digest) == (rotation['size'], rotation['sha256']):
+                temp_file = self.history_file.with_name(self.history_file.name + ".tmp")
+                with open(self.history_file, 'rb') as source, open(temp_file, 'wb') as f:
+                    f.writelines(kept)
+                    source.seek(size)
+                    shutil.copyfileobj(source, f)  # Linhas acrescentadas depois da rotação
+                os.replace(temp_file, self.history_file)
+                
+                stats['offset'] = max(0, stats['offset'] - (size - sum(len(raw) for raw in kept)))
+                self._write_stats(stats)
+                self.index.rebase(stats['offset'])
+        self.archive.clear_rotation()
+    
+    def _read_stats(self) -> Dict[str, Any]:
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                return dict(_empty_stats(), **json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return _empty_stats()
     
-    def add_download(self, title: str, duration: int, file_size: int, 
+    def _write_stats(self, stats: Dict[str, Any]):
+        temp_file = self.stats_file.with_name(self.stats_file.name + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False)
+        os.replace(temp_file, self.stats_file)
+    
+    def _sync_stats(self) -> Dict[str, Any]:
+        """Soma aos agregados as linhas ainda não contabilizadas (chamar com o lock de processo)."""
+        stats = self._read_stats()
+        size = self.history_file.stat().st_size if self.history_file.exists() else 0
+        if stats['offset'] > size or not self.stats_file.exists():
+            # Histórico apagado por fora (ou sem agregados): recontar a partir dos arquivados
+            stats = _empty_stats()
+            merge_stats(stats, self.archive.summary())
+        if stats['offset'] == size and self.stats_file.exists():
+            return stats
+        
+        if stats['offset'] < size:
+            with open(self.history_file, 'rb') as f:
+                f.seek(stats['offset'])
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break  # Linha ainda sendo escrita
+                    stats['offset'] += len(raw)
+                    try:
+                        _accumulate(stats, json.loads(raw))
+                    except json.JSONDecodeError:
+                        continue
+        self._write_stats(stats)
+        return stats
+    
+    def add_download(self, title: str, duration: int, file_size: int,
                     format_output: str, quality: str, url: str):
         entry = {
             'title': title,
@@ -36,31 +302,134 @@ class DownloadHistory:
             'url': url
         }
         
-        self.history.append(entry)
-        self.save_history()
+        with self._lock:
+            self._append(entry)
+            if self._history is not None:
+                self._history.append(entry)
+    
+    def _read_tail(self, limit: int) -> List[Dict[str, Any]]:
+        """Lê as últimas ``limit`` entradas percorrendo o arquivo de trás para frente."""
+        if limit <= 0 or not self.history_file.exists():
+            return []
+        
+        with open(self.history_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            # Uma quebra de linha a mais garante que a primeira linha usada está inteira
+            while position > 0 and data.count(b'\n') <= limit:
+                size = min(TAIL_BLOCK_SIZE, position)
+                position -= size
+                f.seek(position)
+                data = f.read(size) + data
+        
+        lines = data.splitlines()
+        if position > 0:
+            lines = lines[1:]
+        
+        entries = []
+        for line in reversed(lines):
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+            if len(entries) == limit:
+                break
+        return entries[::-1]
     
     def get_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
-        return self.history[-limit:] if self.history else []
+        if self._history is not None:
+            return self._history[-limit:] if limit > 0 else []
+        entries = self._read_tail(limit)
+        if len(entries) < limit:  # Arquivo ativo curto (início do mês): completar com os arquivados
+            older = []
+            for entry in self.archive.iter_recent():
+                if len(older) + len(entries) >= limit:
+                    break
+                older.append(entry)
+            entries = older[::-1] + entries
+        return entries
+    
+    def search(self, query: str = None, limit: int = 50, **filters) -> List[Dict[str, Any]]:
+        """Busca indexada por título, URL, id do vídeo, formato e data.
+
+        ``filters`` aceita ``date_from``/``date_to`` (AAAA-MM-DD),
+        ``min_size``/``max_size`` (MB) e ``format``. Mais recentes primeiro.
+        """
+        with _process_lock(self.lock_file):
+            self.index.sync()
+        return self.index.search(query, limit=limit, **filters)
     
     def search_by_title(self, title: str) -> List[Dict[str, Any]]:
-        return [entry for entry in self.history 
-                if title.lower() in entry['title'].lower()]
+        return self.search(title, limit=-1)
     
     def reset_history(self):
-        self.history = []
-        self.save_history()
+        with self._lock, _process_lock(self.lock_file):
+            self.history_file.parent.mkdir(exist_ok=True)
+            open(self.history_file, 'w', encoding='utf-8').close()
+            self.archive.clear()
+            self.index.reset()
+            self._write_stats(_empty_stats())
+            self._history = []
+    
+    def _disk_usage(self) -> int:
+        files = [self.history_file, self.index.index_file, self.archive.manifest_file]
+        files += [self.archive.directory / segment['file'] for segment in self.archive.segments()]
+        return sum(path.stat().st_size for path in files if path.exists())
+    
+    def compact(self) -> Dict[str, Any]:
+        """Arquiva os meses encerrados, recomprime os segmentos e compacta o índice."""
+        start = time.perf_counter()
+        with self._lock, _process_lock(self.lock_file):
+            before = self._disk_usage()
+            rotated = self._rotate() if self.history_file.exists() else {'archived': 0, 'months': []}
+            recompressed = self.archive.compact()['rewritten']
+            self.index.compact()
+            after = self._disk_usage()
+        
+        return {
+            'archived_entries': rotated['archived'],
+            'archived_months': rotated['months'],
+            'recompressed_segments': recompressed,
+            'active_entries': self._active_count(),
+            'archive': self.archive.metrics(),
+            'bytes_before': before,
+            'bytes_after': after,
+            'elapsed_seconds': round(time.perf_counter() - start, 3),
+        }
+    
+    def _active_count(self) -> int:
+        if not self.history_file.exists():
+            return 0
+        with open(self.history_file, 'rb') as f:
+            return sum(1 for _ in f)
     
     def get_stats(self) -> Dict[str, Any]:
-        if not self.history:
+        """Estatísticas a partir dos agregados mantidos a cada acréscimo."""
+        if not self.history_file.exists() and not self.archive.manifest_file.exists():
+            return {'total_downloads': 0}
+        with _process_lock(self.lock_file):
+            stats = self._sync_stats()
+        if not stats['count']:
             return {'total_downloads': 0}
-        
-        total_size = sum(entry.get('file_size_mb', 0) for entry in self.history)
-        total_duration = sum(entry.get('duration_minutes', 0) for entry in self.history)
         
         return {
-            'total_downloads': len(self.history),
-            'total_size_mb': round(total_size, 2),
-            'total_duration_minutes': round(total_duration, 2),
-            'average_file_size_mb': round(total_size / len(self.history), 2),
-            'most_recent': self.history[-1]['date'] if self.history else None
+            'total_downloads': stats['count'],
+            'total_size_mb': round(stats['total_size_mb'], 2),
+            'total_duration_minutes': round(stats['total_duration_minutes'], 2),
+            'average_file_size_mb': round(stats['total_size_mb'] / stats['count'], 2),
+            'most_recent': stats['most_recent'],
+            'first_download': stats['first_download'],
+            'by_format': {
+                fmt: {
+                    'count': data['count'],
+                    'size_mb': round(data['size_mb'], 2),
+                    'duration_minutes': round(data['duration_minutes'], 2),
+                }
+                for fmt, data in sorted(stats['by_format'].items(), key=lambda item: -item[1]['count'])
+            },
+            'by_day': {
+                day: {'count': data['count'], 'size_mb': round(data['size_mb'], 2)}
+                for day, data in sorted(stats['by_day'].items())
+            },
         }
@@ -0,0 +1,179 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+ARCHIVE_DIR = "history"
+MANIFEST_FILE = "manifest.json"
+
+
+def _empty_summary() -> Dict[str, Any]:
+    return {
+        'count': 0,
+        'total_size_mb': 0.0,
+        'total_duration_minutes': 0.0,
+        'first_download': None,
+        'most_recent': None,
+        'by_format': {},
+        'by_day': {},
+    }
+
+
+def merge_stats(stats: Dict[str, Any], summary: Dict[str, Any]):
+    """Soma um resumo (mesmo formato dos agregados do histórico) a ``stats``."""
+    stats['count'] += summary.get('count', 0)
+    stats['total_size_mb'] += summary.get('total_size_mb', 0.0)
+    stats['total_duration_minutes'] += summary.get('total_duration_minutes', 0.0)
+    if summary.get('first_download'):
+        stats['first_download'] = min(filter(None, (stats['first_download'], summary['first_download'])))
+    if summary.get('most_recent'):
+        stats['most_recent'] = max(filter(None, (stats['most_recent'], summary['most_recent'])))
+
+    for fmt, data in summary.get('by_format', {}).items():
+        target = stats['by_format'].setdefault(fmt, {'count': 0, 'size_mb': 0.0, 'duration_minutes': 0.0})
+        for key in target:
+            target[key] += data.get(key, 0)
+    for day, data in summary.get('by_day', {}).items():
+        target = stats['by_day'].setdefault(day, {'count': 0, 'size_mb': 0.0})
+        for key in target:
+            target[key] += data.get(key, 0)
+
+
+class HistoryArchive:
+    """Segmentos mensais comprimidos do histórico, descritos por um manifesto.
+
+    Cada mês encerrado vira ``AAAA-MM.jsonl.gz`` em ``history/``; o
+    ``manifest.json`` guarda, por segmento, o resumo das estatísticas, de
+    modo que ``get_stats`` não precisa descomprimir nada. As escritas são
+    feitas pelo ``DownloadHistory`` com o lock de processo já adquirido.
+
+    O manifesto é o ponto de confirmação: bytes de um segmento além do
+    tamanho registrado nele (``bytes``) são restos de uma rotação
+    interrompida e são descartados no próximo acréscimo.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.manifest_file = directory / MANIFEST_FILE
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Segmentos do manifesto, do mês mais antigo para o mais recente."""
+        return sorted(self._read_manifest().get('segments', []), key=lambda s: s['month'])
+
+    def pending_rotation(self) -> Optional[Dict[str, Any]]:
+        """Rotação já confirmada nos segmentos cujo arquivo ativo talvez não tenha sido reescrito."""
+        return self._read_manifest().get('rotation')
+
+    def clear_rotation(self):
+        self._write_manifest(self.segments())
+
+    def _write_manifest(self, segments: List[Dict[str, Any]], rotation: Optional[Dict[str, Any]] = None):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest: Dict[str, Any] = {'version': 1, 'segments': segments}
+        if rotation is not None:
+            manifest['rotation'] = rotation
+        temp_file = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(temp_file, self.manifest_file)
+
+    def add_months(self, months: Dict[str, Tuple[List[bytes], Dict[str, Any]]], rotation: Dict[str, Any]):
+        """Acrescenta as linhas de cada mês ao seu segmento e confirma tudo num único manifesto.
+
+        Um segmento já existente ganha um novo membro gzip (leitura
+        transparente). ``rotation`` descreve o trecho do arquivo ativo que foi
+        arquivado e fica no manifesto até ``clear_rotation``.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segments = {s['month']: s for s in self.segments()}
+        for month, (lines, summary) in sorted(months.items()):
+            path = self.directory / f"{month}.jsonl.gz"
+            committed = segments[month].get('bytes', 0) if month in segments else 0
+            if path.exists() and path.stat().st_size > committed:
+                os.truncate(path, committed)  # Membro de uma rotação que não chegou ao manifesto
+            with gzip.open(path, 'ab') as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileobj.fileno())
+
+            segment = segments.setdefault(month, {'month': month, 'file': path.name, 'summary': _empty_summary()})
+            merge_stats(segment['summary'], summary)
+            segment['members'] = segment.get('members', 0) + 1
+            segment['bytes'] = path.stat().st_size
+        self._write_manifest(sorted(segments.values(), key=lambda s: s['month']), rotation)
+
+    def read_segment(self, segment: Dict[str, Any]) -> List[Dict[str, Any]]:
+        entries = []
+        try:
+            with gzip.open(self.directory / segment['file'], 'rb') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except (OSError, EOFError):
+            pass  # Segmento ausente ou truncado: vale o que foi lido
+        return entries
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Todas as entradas arquivadas, em ordem cronológica."""
+        for segment in self.segments():
+            yield from self.read_segment(segment)
+
+    def iter_recent(self) -> Iterator[Dict[str, Any]]:
+        """Entradas arquivadas da mais nova para a mais antiga, um segmento por vez."""
+        for segment in reversed(self.segments()):
+            yield from reversed(self.read_segment(segment))
+
+    def summary(self) -> Dict[str, Any]:
+        """Soma dos resumos de todos os segmentos."""
+        total = _empty_summary()
+        for segment in self.segments():
+            merge_stats(total, segment.get('summary', {}))
+        return total
+
+    def compact(self) -> Dict[str, Any]:
+        """Regrava como um único membro gzip os segmentos que receberam vários acréscimos."""
+        segments = self.segments()
+        rewritten = 0
+        for index, segment in enumerate(segments):
+            if segment.get('members', 1) <= 1:
+                continue
+            entries = self.read_segment(segment)
+            path = self.directory / segment['file']
+            temp_file = path.with_name(path.name + ".tmp")
+            with gzip.open(temp_file, 'wb', compresslevel=9) as f:
+                for entry in entries:
+                    f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8'))
+            os.replace(temp_file, path)
+            segments[index] = dict(segment, members=1, bytes=path.stat().st_size)
+            rewritten += 1
+        if rewritten:
+            self._write_manifest(segments, self.pending_rotation())
+        return {'rewritten': rewritten}
+
+    def metrics(self) -> Dict[str, Any]:
+        segments = self.segments()
+        return {
+            'segments': len(segments),
+            'entries': sum(s.get('summary', {}).get('count', 0) for s in segments),
+            'bytes': sum(s.get('bytes', 0) for s in segments),
+            'months': [s['month'] for s in segments],
+        }
+
+    def clear(self):
+        for segment in self.segments():
+            path = self.directory / segment['file']
+            if path.exists():
+                path.unlink()
+        if self.manifest_file.exists():
+            self.manifest_file.unlink()
+
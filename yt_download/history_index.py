@@ -0,0 +1,231 @@
+import json
+import re
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+_COLUMNS = ('title', 'date', 'duration_minutes', 'file_size_mb', 'format', 'quality', 'url')
+
+# Filtros aceitos na consulta: from:2024-01-01 to:2024-12-31 size>5 size<20 format:mp3
+_FILTER_PATTERN = re.compile(
+    r'^(?:(?P<key>from|to|since|until|de|ate|até|format|formato):(?P<value>\S+)'
+    r'|size(?P<op>[<>])=?(?P<size>\d+(?:\.\d+)?))$',
+    re.IGNORECASE,
+)
+
+
+def parse_search_query(text: str) -> Dict[str, Any]:
+    """Separa o texto livre dos filtros de data, tamanho (MB) e formato."""
+    filters: Dict[str, Any] = {'query': None, 'date_from': None, 'date_to': None,
+                               'min_size': None, 'max_size': None, 'format': None}
+    words = []
+    for token in (text or '').split():
+        match = _FILTER_PATTERN.match(token)
+        if not match:
+            words.append(token)
+            continue
+        key = (match.group('key') or '').lower()
+        if key in ('from', 'since', 'de'):
+            filters['date_from'] = date.fromisoformat(match.group('value')).isoformat()
+        elif key in ('to', 'until', 'ate', 'até'):
+            filters['date_to'] = date.fromisoformat(match.group('value')).isoformat()
+        elif key in ('format', 'formato'):
+            filters['format'] = match.group('value').lower()
+        elif match.group('op') == '>':
+            filters['min_size'] = float(match.group('size'))
+        else:
+            filters['max_size'] = float(match.group('size'))
+    filters['query'] = ' '.join(words) or None
+    return filters
+
+
+class HistoryIndex:
+    """Índice SQLite (FTS5) do histórico JSONL, para busca rápida.
+
+    O índice é derivado do histórico e atualizado sob demanda: como nas
+    estatísticas, ele guarda até que byte do JSONL já foi indexado e só
+    lê as linhas novas antes de cada busca. Sem FTS5 no SQLite do sistema,
+    a busca textual cai para ``LIKE`` sobre a mesma tabela. Os segmentos
+    arquivados (``archive``) entram no índice só quando ele é (re)construído;
+    depois de uma rotação o índice já tem essas linhas e apenas o offset muda.
+    """
+
+    def __init__(self, index_file: Path, history_file: Path, archive=None):
+        self.index_file = index_file
+        self.history_file = history_file
+        self.archive = archive
+        self._conn: Optional[sqlite3.Connection] = None
+        self.fts = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        conn = sqlite3.connect(str(self.index_file), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS downloads (
+                id INTEGER PRIMARY KEY,
+                title TEXT, url TEXT, video_id TEXT, format TEXT, quality TEXT,
+                date TEXT, duration_minutes REAL, file_size_mb REAL
+            );
+            CREATE INDEX IF NOT EXISTS downloads_date ON downloads(date);
+            CREATE INDEX IF NOT EXISTS downloads_size ON downloads(file_size_mb);
+        """)
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS downloads_fts USING fts5(
+                    title, url, video_id, format, date,
+                    content='downloads', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._conn = conn
+        return conn
+
+    @staticmethod
+    def _video_id(url: str) -> Optional[str]:
+        from .url_validator import URLValidator
+        return URLValidator.extract_video_id(url or '')
+
+    def _offset(self, conn: sqlite3.Connection) -> Optional[int]:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'offset'").fetchone()
+        return int(row['value']) if row else None
+
+    def _set_offset(self, conn: sqlite3.Connection, offset: int):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('offset', ?)", (str(offset),))
+
+    def _clear(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM downloads")
+        if self.fts:
+            conn.execute("INSERT INTO downloads_fts(downloads_fts) VALUES ('delete-all')")
+
+    def sync(self) -> int:
+        """Indexa as linhas do histórico ainda não indexadas; retorna quantas."""
+        conn = self._connect()
+        offset = self._offset(conn)
+        size = self.history_file.stat().st_size if self.history_file.exists() else 0
+        if offset == size:
+            return 0
+
+        rows = []
+        with conn:
+            if offset is None or offset > size:  # Índice novo ou histórico apagado: reconstruir
+                self._clear(conn)
+                offset = 0
+                if self.archive is not None:
+                    rows.extend(self._row(entry) for entry in self.archive.iter_entries())
+
+            if size:
+                with open(self.history_file, 'rb') as f:
+                    f.seek(offset)
+                    for raw in f:
+                        if not raw.endswith(b'\n'):
+                            break  # Linha ainda sendo escrita
+                        offset += len(raw)
+                        try:
+                            entry = json.loads(raw)
+                        except json.JSONDecodeError:
+                            continue
+                        rows.append(self._row(entry))
+
+            # Inserção em lote; o FTS é alimentado de uma vez a partir das linhas novas
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM downloads").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO downloads (title, url, video_id, format, quality, date, duration_minutes, file_size_mb) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            if self.fts:
+                conn.execute("INSERT INTO downloads_fts (rowid, title, url, video_id, format, date) "
+                             "SELECT id, title, url, video_id, format, date FROM downloads WHERE id > ?", (last_id,))
+            self._set_offset(conn, offset)
+        return len(rows)
+
+    def rebase(self, offset: int):
+        """Aponta o índice para ``offset`` depois que o histórico ativo foi reescrito."""
+        if not self.index_file.exists():
+            return  # Sem índice ainda: a primeira busca constrói tudo, inclusive o arquivo
+        conn = self._connect()
+        with conn:
+            self._set_offset(conn, offset)
+
+    def reset(self):
+        """Esvazia o índice (histórico apagado)."""
+        if not self.index_file.exists():
+            return
+        conn = self._connect()
+        with conn:
+            self._clear(conn)
+            self._set_offset(conn, 0)
+
+    def compact(self):
+        """Otimiza o FTS e devolve ao disco o espaço livre do arquivo SQLite."""
+        if not self.index_file.exists():
+            return
+        conn = self._connect()
+        if self.fts:
+            with conn:
+                conn.execute("INSERT INTO downloads_fts(downloads_fts) VALUES ('optimize')")
+        conn.execute("VACUUM")
+
+    def _row(self, entry: Dict[str, Any]) -> tuple:
+        return (entry.get('title'), entry.get('url'), self._video_id(entry.get('url')), entry.get('format'),
+                entry.get('quality'), entry.get('date'), entry.get('duration_minutes') or 0,
+                entry.get('file_size_mb') or 0)
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        # Cada palavra vira um prefixo entre aspas (sem operadores do FTS5 vindos do usuário)
+        return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in query.split())
+
+    def search(self, query: str = None, date_from: str = None, date_to: str = None,
+               min_size: float = None, max_size: float = None, format: str = None,
+               limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca no histórico; filtros de data são inclusivos (AAAA-MM-DD).
+
+        Não sincroniza: quem chama faz ``sync()`` com o lock de processo
+        (``DownloadHistory.search``), para não ler o histórico durante uma rotação.
+        """
+        conn = self._connect()
+
+        tables = "downloads d"
+        where, params = [], []
+        if query and self.fts:
+            tables = "downloads_fts JOIN downloads d ON d.id = downloads_fts.rowid"
+            where.append("downloads_fts MATCH ?")
+            params.append(self._fts_query(query))
+        elif query:
+            for word in query.split():
+                where.append("(d.title LIKE ? OR d.url LIKE ? OR d.video_id LIKE ?)")
+                params.extend([f"%{word}%"] * 3)
+        if date_from:
+            where.append("d.date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("d.date < ?")
+            params.append((date.fromisoformat(date_to[:10]) + timedelta(days=1)).isoformat())
+        if min_size is not None:
+            where.append("d.file_size_mb >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            where.append("d.file_size_mb <= ?")
+            params.append(max_size)
+        if format:
+            where.append("d.format = ?")
+            params.append(format)
+
+        sql = f"SELECT {', '.join('d.' + c for c in _COLUMNS)} FROM {tables}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY d.date DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in conn.execute(sql, params)]
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
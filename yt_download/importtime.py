@@ -0,0 +1,75 @@
+"""Benchmark do tempo de import do CLI (``python -X importtime``).
+
+Uso: ``python -m yt_download.importtime [--runs 5] [--budget 60]``.
+Sai com código 1 se a mediana passar do orçamento ou se algum módulo
+pesado (yt-dlp, requests) voltar a ser importado no startup.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List
+
+# Orçamento para ``import yt_download.main`` (medido: ~17 ms; antes ~300 ms)
+IMPORT_BUDGET_MS = 60
+
+# Módulos que só podem ser carregados quando um download/verificação precisa deles
+HEAVY_MODULES = ('yt_dlp', 'requests', 'urllib3', 'rich.console', 'sqlite3')
+
+TARGET_MODULE = "yt_download.main"
+
+
+def _parse_importtime(stderr: str) -> Dict[str, int]:
+    """Mapeia módulo -> tempo cumulativo (µs) a partir da saída do -X importtime."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure_once(module: str = TARGET_MODULE) -> Dict[str, int]:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    return _parse_importtime(result.stderr)
+
+
+def run_benchmark(runs: int = 5, budget_ms: float = IMPORT_BUDGET_MS) -> Dict[str, Any]:
+    samples: List[float] = []
+    heavy = set()
+    for _ in range(runs):
+        modules = measure_once()
+        samples.append(modules.get(TARGET_MODULE, 0) / 1000)
+        heavy.update(name for name in modules if name in HEAVY_MODULES)
+
+    median_ms = statistics.median(samples)
+    return {
+        'module': TARGET_MODULE,
+        'runs': runs,
+        'median_ms': round(median_ms, 2),
+        'min_ms': round(min(samples), 2),
+        'max_ms': round(max(samples), 2),
+        'budget_ms': budget_ms,
+        'heavy_modules': sorted(heavy),
+        'ok': median_ms <= budget_ms and not heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check for the yt-download CLI")
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to measure')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS, help='Budget in milliseconds')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.runs, args.budget)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result['ok'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, Iterator, List
+
+from .config import get_config_dir
+
+JOURNAL_DIR = "jobs"
+
+STATE_PENDING = "pending"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+# Campos da entrada flat guardados no diário: o suficiente para resolvê-la de novo
+_ENTRY_FIELDS = ('_type', 'ie_key', 'id', 'url', 'title', 'duration', 'webpage_url', 'original_url')
+
+
+def get_journal_dir() -> Path:
+    """Diretório dos diários de jobs de playlist."""
+    return get_config_dir() / JOURNAL_DIR
+
+
+class PlaylistJournal:
+    """Diário persistente de um job de playlist (JSONL, só acréscimo).
+
+    Cada mudança de estado de uma entrada vira uma linha gravada com fsync,
+    então o diário sobrevive a Ctrl-C, suspensão ou crash no meio da
+    playlist. Ao reabrir, as linhas são reaplicadas em ordem (uma última
+    linha truncada é ignorada) e só as entradas pendentes ou com falha são
+    baixadas de novo. Se a execução anterior foi interrompida com a
+    listagem já percorrida inteira, o rerun nem precisa extrair a playlist:
+    as entradas pendentes saem do próprio diário. Falhas permanentes
+    (404, vídeo privado...) contam como terminais: um job em que só elas
+    restam está concluído.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.header: Dict[str, Any] = {}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.listing_complete = False
+        self.resumed = False
+        self.skipped = 0
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._load()
+
+    @staticmethod
+    def job_id(url: str, playlist_id: Optional[str] = None) -> str:
+        if playlist_id:
+            return re.sub(r'[^\w.-]', '_', str(playlist_id))[:100]
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def _journal_paths(cls) -> List[Path]:
+        journal_dir = get_journal_dir()
+        if not journal_dir.exists():
+            return []
+        return sorted(journal_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
+
+    @staticmethod
+    def _read_header(path: Path) -> Dict[str, Any]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return header if header.get('type') == 'job' else {}
+
+    @classmethod
+    def open(cls, url: str, info: Dict[str, Any], format_type: str, quality: str) -> 'PlaylistJournal':
+        """Abre o diário da playlist, retomando o job anterior quando compatível."""
+        journal = cls(get_journal_dir() / f"{cls.job_id(url, info.get('id'))}.jsonl")
+        if journal.header and journal.matches(format_type, quality) and not journal.finished:
+            journal.resumed = True
+            return journal
+
+        journal.discard()
+        journal._write({
+            'type': 'job',
+            'url': url,
+            'playlist_id': info.get('id'),
+            'title': info.get('title'),
+            'format': format_type,
+            'quality': quality,
+            'created': datetime.now().isoformat(),
+        })
+        return journal
+
+    @classmethod
+    def find(cls, url: str, format_type: str = None, quality: str = None) -> Optional['PlaylistJournal']:
+        """Job inacabado para ``url`` (e, se informados, mesmo formato/qualidade)."""
+        for path in cls._journal_paths():
+            if cls._read_header(path).get('url') != url:
+                continue
+            journal = cls(path)
+            if journal.finished or (format_type and not journal.matches(format_type, quality)):
+                return None
+            return journal
+        return None
+
+    @classmethod
+    def latest_unfinished(cls) -> Optional['PlaylistJournal']:
+        """Job de playlist inacabado mais recente."""
+        for path in cls._journal_paths():
+            journal = cls(path)
+            if journal.header and not journal.finished:
+                return journal
+        return None
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Linha truncada por uma interrupção no meio da escrita
+                self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]):
+        kind = record.get('type')
+        if kind == 'job':
+            self.header = record
+        elif kind == 'listing_complete':
+            self.listing_complete = True
+        elif kind == 'entry':
+            key = record['key']
+            state = self.entries.setdefault(key, {})
+            state.update((k, v) for k, v in record.items() if k != 'type')
+            for alias in self._entry_aliases(state.get('entry') or {}):
+                self._aliases.setdefault(alias, key)
+
+    def _write(self, record: Dict[str, Any]):
+        """Grava uma linha de forma durável (chamar com o lock ou antes de compartilhar)."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._apply(record)
+
+    @staticmethod
+    def _entry_aliases(entry: Dict[str, Any]) -> List[str]:
+        """Identificadores pelos quais a entrada (flat ou resolvida) pode chegar."""
+        return [value for value in (entry.get('id'), entry.get('webpage_url'),
+                                    entry.get('original_url'), entry.get('url')) if value]
+
+    def key_for(self, entry: Dict[str, Any]) -> Optional[str]:
+        for alias in self._entry_aliases(entry):
+            if alias in self._aliases:
+                return self._aliases[alias]
+        return None
+
+    def matches(self, format_type: str, quality: str) -> bool:
+        return self.header.get('format') == format_type and self.header.get('quality') == quality
+
+    @staticmethod
+    def _terminal(state: Dict[str, Any]) -> bool:
+        return state.get('state') == STATE_DONE or (state.get('state') == STATE_FAILED and state.get('permanent', False))
+
+    @property
+    def finished(self) -> bool:
+        """Listagem percorrida inteira e nada mais a tentar (só concluídas ou falhas permanentes)."""
+        return self.listing_complete and all(self._terminal(e) for e in self.entries.values())
+
+    @property
+    def interrupted(self) -> bool:
+        """A execução anterior parou antes de tentar todas as entradas da listagem."""
+        return not self.listing_complete or any(e.get('state') == STATE_PENDING for e in self.entries.values())
+
+    def track(self, entries: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Registra as entradas da listagem e gera só as que ainda faltam."""
+        for entry in entries:
+            with self._lock:
+                key = self.key_for(entry)
+                if key is None:
+                    aliases = self._entry_aliases(entry)
+                    key = aliases[0] if aliases else f"#{len(self.entries)}"
+                    self._write({
+                        'type': 'entry',
+                        'key': key,
+                        'index': len(self.entries),
+                        'state': STATE_PENDING,
+                        'entry': {k: entry[k] for k in _ENTRY_FIELDS if entry.get(k) is not None},
+                    })
+                done = self.entries[key].get('state') == STATE_DONE
+                if done:
+                    self.skipped += 1
+            if not done:
+                yield entry
+
+        with self._lock:
+            if not self.listing_complete:
+                self._write({'type': 'listing_complete'})
+
+    def pending_entries(self) -> Iterator[Dict[str, Any]]:
+        """Entradas pendentes ou com falha, na ordem da playlist, sem extrair nada."""
+        for state in sorted(self.entries.values(), key=lambda e: e.get('index', 0)):
+            if state.get('state') != STATE_DONE:
+                yield dict(state['entry'])
+
+    def listing_info(self) -> Dict[str, Any]:
+        """Info dict de playlist reconstruído do diário (substitui a extração)."""
+        return {
+            '_type': 'playlist',
+            'id': self.header.get('playlist_id'),
+            'title': self.header.get('title'),
+            'playlist_count': len(self.entries),
+            'entries': self.pending_entries(),
+        }
+
+    def mark(self, entry: Dict[str, Any], state: str, error: str = None, permanent: bool = False):
+        with self._lock:
+            key = self.key_for(entry)
+            if key is None:
+                return
+            record = {'type': 'entry', 'key': key, 'state': state, 'permanent': permanent}
+            if error:
+                record['error'] = error
+            self._write(record)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            states = [e.get('state') for e in self.entries.values()]
+        return {
+            'total': len(states),
+            'done': states.count(STATE_DONE),
+            'failed': states.count(STATE_FAILED),
+            'pending': states.count(STATE_PENDING),
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return dict(self.counts(), path=str(self.path), resumed=self.resumed, skipped=self.skipped,
+                    listing_complete=self.listing_complete)
+
+    def discard(self):
+        """Apaga o diário e começa um job novo no mesmo caminho."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+        self.header, self.entries, self._aliases = {}, {}, {}
+        self.listing_complete = self.resumed = False
+        self.skipped = 0
+
+    def close(self):
+        """Fecha o arquivo; um job concluído (ver ``finished``) não precisa mais do diário."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.finished and self.path.exists():
+            self.path.unlink()
@@ -1,27 +1,40 @@
 #!/usr/bin/env python3
 
 import sys
+import time
 import argparse
+from typing import Iterator
 from rich import print as rprint
 from . import __version__
-from .cli import CLI
 from .config import Config
-from .config_manager import ConfigManager
-from .url_validator import URLValidator
-from .downloader import YTDownloader
-from .updater import GitHubUpdater
+from .pipeline import parse_rate
+
+# Os demais módulos (yt-dlp, requests, rich.console, sqlite3) são importados
+# dentro dos comandos que os usam: --version, --history e --stats não pagam
+# o import do yt-dlp. Orçamento verificado por ``python -m yt_download.importtime``.
 
 INTERACTIVE_COMMANDS = [
     "/ ou /help  Mostrar comandos",
     "/config     Abrir painel de configuração",
     "/history    Mostrar histórico",
     "/stats      Mostrar estatísticas",
+    "/search     Buscar no histórico",
     "/check      Verificar sistema",
     "/update     Buscar atualização",
     "/reset      Limpar histórico",
     "/quit       Sair",
 ]
 
+def _limit_rate_arg(value: str) -> int:
+    """Tipo do --limit-rate: zero ou um valor inválido viram erro do argparse, não "sem limite"."""
+    try:
+        rate = parse_rate(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if rate is None:
+        raise argparse.ArgumentTypeError(f"o limite deve ser maior que zero: {value!r}")
+    return rate
+
 def create_parser():
     parser = argparse.ArgumentParser(
         description="Download YouTube videos and playlists as MP3 files",
@@ -30,34 +43,57 @@ def create_parser():
 Examples:
   yt-download                          # Interactive mode
   yt-download --url "youtube_url"      # Quick download with default settings
+  yt-download --url "url" --limit-rate 2M  # Cap total bandwidth
+  yt-download --batch-file urls.txt    # Download a list of URLs in one process
+  cat urls.txt | yt-download -b -      # Same, reading from stdin
+  yt-download --resume                 # Resume the last interrupted playlist
   yt-download --history                # Show download history
   yt-download --stats                  # Show download statistics
+  yt-download --search "beatles from:2024-01-01 size>5"  # Search history
   yt-download --reset                  # Clear download history
+  yt-download --compact-history        # Archive old months, shrink history files
   yt-download --config                 # Configure application settings
   yt-download --check                  # Check system requirements
   yt-download --update                 # Check for updates and install
+  yt-download serve                    # Run the download daemon (--url/--batch-file submit to it)
         """
     )
     
+    parser.add_argument('command', nargs='?', choices=['serve'],
+                       help='serve: run the long-lived download daemon with a local job API')
     parser.add_argument('--url', '-u', type=str, help='YouTube URL to download')
+    parser.add_argument('--batch-file', '-b', type=str, metavar='PATH',
+                       help='Download every URL in PATH (one per line, "#" comments; "-" reads stdin)')
     parser.add_argument('--format', '-f', choices=['mp3', 'm4a', 'ogg', 'wav'], 
                        default=None, help='Audio format (default: from config)')
     parser.add_argument('--quality', '-q', type=str, default=None,
                        help='Audio quality (default: from config)')
     parser.add_argument('--auto', '-a', action='store_true',
                        help='Auto mode: use best quality MP3')
+    parser.add_argument('--limit-rate', '-r', type=_limit_rate_arg, default=None, metavar='RATE',
+                       help='Total bandwidth limit shared by all downloads, e.g. 500K or 2M (default: from config)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Resume the last interrupted playlist (or --url) skipping finished entries')
     parser.add_argument('--history', action='store_true',
                        help='Show download history')
     parser.add_argument('--stats', action='store_true',
                        help='Show download statistics')
+    parser.add_argument('--search', '-s', type=str, metavar='QUERY',
+                       help='Search history by title/URL/id; filters: from:/to:YYYY-MM-DD, size>MB, size<MB, format:mp3')
     parser.add_argument('--reset', action='store_true',
                        help='Reset (clear) download history')
+    parser.add_argument('--compact-history', action='store_true',
+                       help='Archive finished months into compressed segments and compact the search index')
     parser.add_argument('--config', action='store_true',
                        help='Configure application settings')
     parser.add_argument('--check', action='store_true',
                        help='Check system requirements')
     parser.add_argument('--update', action='store_true',
                        help='Check for updates and install if available')
+    parser.add_argument('--port', type=int, default=None,
+                       help='Port for "serve" on 127.0.0.1 (default: daemon_port from config)')
+    parser.add_argument('--no-daemon', action='store_true',
+                       help='Download in this process even if a daemon is running')
     parser.add_argument('--version', '-v', action='version', version=__version__)
     
     return parser
@@ -69,6 +105,10 @@ def handle_download(cli, config, url, format_type=None, quality=None, auto_mode=
     if quality is None:
         quality = config.get('audio_quality', '320')
     try:
+        from .downloader import YTDownloader
+        from .url_validator import URLValidator
+        from .utils import SystemValidator
+        
         # Inicializar downloader com configuração
         downloader = YTDownloader(progress_callback=cli.show_progress, config=config.settings)
         
@@ -102,16 +142,24 @@ def handle_download(cli, config, url, format_type=None, quality=None, auto_mode=
         else:
             mode = "auto"
         
+        # Encoder do formato escolhido, a partir do probe em cache (sem subprocesso)
+        missing_encoder = SystemValidator.missing_encoder(format_type, system_check['ffmpeg'])
+        if missing_encoder:
+            cli.show_error(f"FFmpeg sem o encoder '{missing_encoder}', necessário para {format_type.upper()}")
+            rprint("[yellow]💡 Instale um FFmpeg completo ou escolha outro formato[/yellow]")
+            return False
+        
         # Mostrar informações do download
         cli.show_download_start(mode, format_type, quality)
         
-        # Realizar download
-        result = downloader.download(
-            url=url,
-            format_type=format_type,
-            quality=quality,
-            is_playlist=url_info['is_playlist']
-        )
+        # Realizar download com o painel de progresso ao vivo
+        with cli.live_progress(downloader.progress, config.get('progress_refresh_rate', 4)):
+            result = downloader.download(
+                url=url,
+                format_type=format_type,
+                quality=quality,
+                is_playlist=url_info['is_playlist']
+            )
         
         # Mostrar resultado
         if result['type'] == 'playlist':
@@ -138,7 +186,209 @@ def handle_download(cli, config, url, format_type=None, quality=None, auto_mode=
         cli.show_error(str(e))
         return False
 
+def _read_batch_urls(source: str) -> Iterator[str]:
+    """URLs do arquivo (ou stdin com ``-``), lidas sob demanda, sem linhas vazias e comentários."""
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def handle_batch(cli, config, source: str, format_type=None, quality=None) -> bool:
+    from .downloader import YTDownloader
+    from .utils import SystemValidator
+    
+    format_type = format_type or config.get('audio_format', 'mp3')
+    quality = quality or config.get('audio_quality', '320')
+    try:
+        downloader = YTDownloader(progress_callback=cli.show_progress, config=config.settings)
+        
+        # Uma verificação de sistema para o lote inteiro
+        cli.show_progress("Verificando sistema...")
+        system_check = downloader.check_system_requirements(check_network=False)
+        if not system_check['ffmpeg']['installed']:
+            cli.show_error(f"FFmpeg: {system_check['ffmpeg']['error']}")
+            rprint(f"[yellow]💡 {system_check['ffmpeg']['suggestion']}[/yellow]")
+            return False
+        missing_encoder = SystemValidator.missing_encoder(format_type, system_check['ffmpeg'])
+        if missing_encoder:
+            cli.show_error(f"FFmpeg sem o encoder '{missing_encoder}', necessário para {format_type.upper()}")
+            return False
+        
+        cli.show_download_start("auto", format_type, quality)
+        with cli.live_progress(downloader.progress, config.get('progress_refresh_rate', 4)):
+            result = downloader.download_batch(_read_batch_urls(source), format_type, quality)
+    except OSError as e:
+        cli.show_error(f"Não foi possível ler o arquivo de lote: {str(e)}")
+        return False
+    except KeyboardInterrupt:
+        rprint("\n[yellow]⚠️  Download cancelado pelo usuário[/yellow]")
+        return False
+    except Exception as e:
+        cli.show_error(str(e))
+        return False
+    
+    playlists = result['playlists']
+    rprint(f"\n[green]✅ Lote processado: {result['urls']} URLs[/green]")
+    rprint(f"[cyan]Vídeos baixados: {result['successful']}/{result['total']}[/cyan]")
+    if playlists['total']:
+        rprint(f"[cyan]Playlists: {playlists['successful']}/{playlists['total']}[/cyan]")
+    if result['duplicates']:
+        rprint(f"[dim]Duplicadas ignoradas: {result['duplicates']}[/dim]")
+    if result['invalid']:
+        rprint(f"\n[yellow]⚠️  URLs inválidas ({result['invalid']}):[/yellow]")
+        for record in result['invalid_sample'][:5]:
+            rprint(f"  • URL #{record['index'] + 1}: {record['url']} — {record['error']}")
+    
+    if result['failed']:
+        rprint(f"\n[yellow]⚠️  Falhas ({result['failed']}):[/yellow]")
+        for fail in result['failures'][:5]:
+            rprint(f"  • {fail['title']}")
+    return not result['failed'] and not result['invalid'] and not playlists['failed']
+
+def handle_serve(cli, config, port=None) -> bool:
+    from .daemon import DownloadDaemon
+    
+    daemon = DownloadDaemon(config.settings, port=port)
+    try:
+        daemon.start()
+    except Exception as e:
+        daemon.stop()
+        cli.show_error(f"Não foi possível iniciar o daemon: {str(e)}")
+        return False
+    
+    status = daemon.status()
+    rprint(f"\n[green]🛰️  Daemon ouvindo em {daemon.host}:{daemon.port} (pid {status['pid']})[/green]")
+    rprint(f"[cyan]Destino: {status['download_path']} | Downloads simultâneos: "
+           f"{status['max_concurrent_downloads']}[/cyan]")
+    rprint("[dim]--url e --batch-file serão enviados a este processo. Ctrl-C para encerrar.[/dim]")
+    daemon.serve_forever()
+    rprint("\n[yellow]👋 Daemon encerrado[/yellow]")
+    return True
+
+def _daemon_client(args, config):
+    """Cliente do daemon quando há um rodando e ele pode atender este comando."""
+    if args.no_daemon or args.resume or args.limit_rate is not None or not config.get('use_daemon', True):
+        return None  # Retomada e limite de banda valem só para este processo
+    from .daemon import DaemonClient
+    
+    client = DaemonClient.discover()
+    if client is None or not client.serves_directory(config.settings):
+        return None
+    return client
+
+def handle_remote_download(cli, client, url, format_type, quality) -> bool:
+    from .daemon import RemoteProgress, JOB_FAILED
+    
+    try:
+        job = client.submit(url, format_type, quality)
+        cli.show_download_start("daemon", format_type, quality)
+        with cli.live_progress(RemoteProgress(client), 2):  # Cada quadro consulta o daemon
+            job = next(client.iter_finished([job['id']]))
+    except KeyboardInterrupt:
+        rprint("\n[yellow]⚠️  O download continua no daemon[/yellow]")
+        return False
+    except Exception as e:
+        cli.show_error(str(e))
+        return False
+    
+    result = job['result']
+    if result is None or (job['status'] == JOB_FAILED and result['type'] != 'playlist'):
+        cli.show_error(job['error'] or "Falha no download")
+        return False
+    if result['type'] == 'playlist':
+        rprint(f"\n[green]✅ Playlist '{result['title']}' processada![/green]")
+        rprint(f"[cyan]Downloads bem-sucedidos: {result['successful']}/{result['total']}[/cyan]")
+        failed = [r for r in result['results'] if r['status'] == 'failed']
+        if failed:
+            rprint(f"\n[yellow]⚠️  Falhas ({len(failed)}):[/yellow]")
+            for fail in failed[:5]:
+                rprint(f"  • {fail['title']}")
+    else:
+        cli.show_success(result['title'], result.get('filename', f"{result['title']}.{format_type}"),
+                         result.get('file_size'))
+    return True
+
+def handle_remote_batch(cli, client, source: str, format_type, quality) -> bool:
+    from .daemon import RemoteProgress, JOB_SUCCESS
+    from .url_validator import URLValidator
+    
+    # Só contadores e uma amostra das falhas: a memória não cresce com o lote
+    counts = {'jobs': 0, 'successful': 0, 'failed': 0, 'invalid': 0, 'duplicates': 0}
+    invalid, failed = [], []
+    
+    def valid_urls():
+        # Deduplicação e validação locais; cada URL válida vira um job no daemon
+        for record in URLValidator.iter_classify(_read_batch_urls(source)):
+            if record['status'] == 'invalid':
+                counts['invalid'] += 1
+                if len(invalid) < 5:
+                    invalid.append(record)
+            elif record['status'] == 'duplicate':
+                counts['duplicates'] += 1
+            else:
+                yield record['url']
+    
+    try:
+        # Janela de jobs em aberto: o daemon nunca recebe o lote inteiro de uma vez
+        window = 2 * client.status()['max_concurrent_downloads']
+        cli.show_download_start("daemon", format_type, quality)
+        with cli.live_progress(RemoteProgress(client), 2):  # Cada quadro consulta o daemon
+            for job in client.iter_batch(valid_urls(), format_type, quality, window):
+                counts['jobs'] += 1
+                if job['status'] == JOB_SUCCESS:
+                    counts['successful'] += 1
+                else:
+                    counts['failed'] += 1
+                    if len(failed) < 5:
+                        failed.append(job)
+    except OSError as e:
+        cli.show_error(f"Não foi possível ler o arquivo de lote: {str(e)}")
+        return False
+    except KeyboardInterrupt:
+        rprint("\n[yellow]⚠️  Os downloads já enviados continuam no daemon[/yellow]")
+        return False
+    except Exception as e:
+        cli.show_error(str(e))
+        return False
+    
+    rprint(f"\n[green]✅ Lote processado pelo daemon: {counts['jobs']} jobs[/green]")
+    rprint(f"[cyan]Jobs concluídos: {counts['successful']}/{counts['jobs']}[/cyan]")
+    if counts['duplicates']:
+        rprint(f"[dim]Duplicadas ignoradas: {counts['duplicates']}[/dim]")
+    if counts['invalid']:
+        rprint(f"\n[yellow]⚠️  URLs inválidas ({counts['invalid']}):[/yellow]")
+        for record in invalid:
+            rprint(f"  • URL #{record['index'] + 1}: {record['url']} — {record['error']}")
+    if counts['failed']:
+        rprint(f"\n[yellow]⚠️  Falhas ({counts['failed']}):[/yellow]")
+        for job in failed:
+            # Jobs de playlist sem erro geral: só parte das entradas foi baixada
+            error = job['error'] or f"{job['result']['successful']}/{job['result']['total']} downloads bem-sucedidos"
+            rprint(f"  • {job['url']}: {error}")
+    return not counts['failed'] and not counts['invalid']
+
+def handle_search(cli, text: str, limit: int = 50):
+    from .history import DownloadHistory
+    from .history_index import parse_search_query
+    
+    try:
+        filters = parse_search_query(text)
+    except ValueError as e:
+        cli.show_error(f"Filtro de busca inválido: {str(e)}")
+        return
+    
+    start = time.perf_counter()
+    results = DownloadHistory().search(limit=limit, **filters)
+    cli.show_search_results(text, results, (time.perf_counter() - start) * 1000)
+
 def interactive_mode():
+    from .cli import CLI
+    
     cli = CLI()
     config = Config()
     
@@ -196,6 +446,8 @@ def interactive_mode():
         rprint("\n[yellow]👋 Até logo![/yellow]")
 
 def handle_interactive_command(cli, config, command: str) -> bool:
+    from .history import DownloadHistory
+    
     normalized = command.lower()
 
     if normalized in {"/", "/help"}:
@@ -204,23 +456,32 @@ def handle_interactive_command(cli, config, command: str) -> bool:
         return False
 
     if normalized == "/config":
+        from .config_manager import ConfigManager
         ConfigManager().interactive_config(cli)
         return False
 
-    downloader = YTDownloader(config=config.settings)
-
     if normalized == "/history":
-        cli.show_history(downloader.get_history())
+        cli.show_history(DownloadHistory().get_recent(10))
+        cli.console.input("\n[dim]Pressione Enter para voltar[/dim]")
+        return False
+
+    if normalized == "/search" or normalized.startswith("/search "):
+        text = command[len("/search"):].strip()
+        if not text:
+            text = cli.console.input("\n🔍 Buscar (ex.: beatles from:2024-01-01 size>5): ").strip()
+        if text:
+            handle_search(cli, text)
         cli.console.input("\n[dim]Pressione Enter para voltar[/dim]")
         return False
 
     if normalized == "/stats":
-        cli.show_stats(downloader.get_stats())
+        cli.show_stats(DownloadHistory().get_stats())
         cli.console.input("\n[dim]Pressione Enter para voltar[/dim]")
         return False
 
     if normalized == "/check":
-        system_check = downloader.check_system_requirements()
+        from .downloader import YTDownloader
+        system_check = YTDownloader(config=config.settings).check_system_requirements()
         rprint("\n[bold blue]🔍 Verificação do Sistema[/bold blue]\n")
         if system_check['ffmpeg']['installed']:
             rprint(f"[green]✅ FFmpeg: {system_check['ffmpeg']['version']} - OK[/green]")
@@ -237,13 +498,14 @@ def handle_interactive_command(cli, config, command: str) -> bool:
         return False
 
     if normalized == "/update":
+        from .updater import GitHubUpdater
         GitHubUpdater().interactive_update()
         cli.console.input("\n[dim]Pressione Enter para voltar[/dim]")
         return False
 
     if normalized == "/reset":
         if cli.show_reset_confirmation():
-            downloader.reset_history()
+            DownloadHistory().reset_history()
             cli.show_reset_success()
         else:
             rprint("\n[yellow]Operação cancelada[/yellow]")
@@ -262,26 +524,43 @@ def main():
         parser = create_parser()
         args = parser.parse_args()
         
+        from .cli import CLI
+        from .history import DownloadHistory
+        
         cli = CLI()
         config = Config()
-        downloader = YTDownloader()
         
-        # Mostrar histórico
+        # Daemon de downloads
+        if args.command == 'serve':
+            success = handle_serve(cli, config, args.port)
+            sys.exit(0 if success else 1)
+        
+        # Mostrar histórico (só o fim do arquivo é lido)
         if args.history:
-            history = downloader.get_history()
+            history = DownloadHistory().get_recent(10)
             cli.show_history(history)
             return
         
         # Mostrar estatísticas
         if args.stats:
-            stats = downloader.get_stats()
+            stats = DownloadHistory().get_stats()
             cli.show_stats(stats)
             return
         
+        # Busca no histórico
+        if args.search:
+            handle_search(cli, args.search)
+            return
+        
+        # Compactação do histórico
+        if args.compact_history:
+            cli.show_compact_result(DownloadHistory().compact())
+            return
+        
         # Reset do histórico
         if args.reset:
             if cli.show_reset_confirmation():
-                downloader.reset_history()
+                DownloadHistory().reset_history()
                 cli.show_reset_success()
             else:
                 rprint("\n[yellow]Operação cancelada[/yellow]")
@@ -289,19 +568,25 @@ def main():
         
         # Configuração
         if args.config:
+            from .config_manager import ConfigManager
             config_manager = ConfigManager()
             config_manager.interactive_config()
             return
         
         # Verificação do sistema
         if args.check:
-            system_check = downloader.check_system_requirements()
+            from .downloader import YTDownloader
+            system_check = YTDownloader().check_system_requirements()
             
             rprint("\n[bold blue]🔍 Verificação do Sistema[/bold blue]\n")
             
             # FFmpeg
             if system_check['ffmpeg']['installed']:
                 rprint(f"[green]✅ FFmpeg: {system_check['ffmpeg']['version']} - OK[/green]")
+                encoders = system_check['ffmpeg'].get('encoders', {})
+                if encoders:
+                    rprint("  [dim]• Encoders: " + ", ".join(
+                        f"{name} {'✓' if ok else '✗'}" for name, ok in encoders.items()) + "[/dim]")
             else:
                 rprint(f"[red]❌ FFmpeg: {system_check['ffmpeg']['error']}[/red]")
                 rprint(f"[yellow]💡 {system_check['ffmpeg']['suggestion']}[/yellow]")
@@ -309,18 +594,22 @@ def main():
             # YouTube
             youtube_info = system_check['youtube']
             if youtube_info['all_working']:
-                rprint(f"[green]✅ YouTube: {youtube_info['overall_status'].title()}[/green]")
-                # Mostrar latências dos endpoints
+                cached = f" (cache de {youtube_info['cache_age_seconds']:.0f}s)" if youtube_info.get('cached') else ""
+                rprint(f"[green]✅ YouTube: {youtube_info['overall_status'].title()}{cached}[/green]")
+                # Mostrar latências dos endpoints (percentis das amostras)
                 for endpoint, data in youtube_info['endpoints'].items():
+                    endpoint_name = endpoint.split('//')[1].split('/')[0]
                     if data['status'] == 'online':
-                        endpoint_name = endpoint.split('//')[1].split('.')[0]
-                        rprint(f"  [dim]• {endpoint_name}: {data['response_time']}ms[/dim]")
+                        rprint(f"  [dim]• {endpoint_name}: p50 {data['p50_ms']}ms | p90 {data['p90_ms']}ms "
+                               f"| 1ª conexão {data['first_ms']}ms ({data['samples']} amostras)[/dim]")
+                    else:
+                        rprint(f"  [dim]• {endpoint_name}: offline[/dim]")
             else:
                 rprint(f"[red]❌ YouTube: {youtube_info['overall_status'].title()}[/red]")
                 # Mostrar quais endpoints falharam
                 for endpoint, data in youtube_info['endpoints'].items():
                     if data['status'] == 'offline':
-                        endpoint_name = endpoint.split('//')[1].split('.')[0]
+                        endpoint_name = endpoint.split('//')[1].split('/')[0]
                         rprint(f"  [dim]• {endpoint_name}: offline[/dim]")
             
             # Status geral
@@ -333,10 +622,40 @@ def main():
         
         # Update
         if args.update:
+            from .updater import GitHubUpdater
             updater = GitHubUpdater()
             updater.interactive_update()
             return
         
+        # Retomar a última playlist interrompida
+        if args.resume and not args.url:
+            from .journal import PlaylistJournal
+            journal = PlaylistJournal.latest_unfinished()
+            if journal is None:
+                rprint("\n[yellow]📝 Nenhuma playlist interrompida para retomar[/yellow]")
+                return
+            
+            counts = journal.counts()
+            rprint(f"\n[cyan]🔁 Retomando '{journal.header.get('title') or journal.header['url']}' "
+                   f"({counts['done']}/{counts['total']} concluídos)[/cyan]")
+            config.settings['resume_playlists'] = True
+            success = handle_download(cli, config, journal.header['url'], journal.header['format'],
+                                      journal.header['quality'], auto_mode=True)
+            sys.exit(0 if success else 1)
+        
+        # Download em lote (arquivo ou stdin)
+        if args.batch_file:
+            client = _daemon_client(args, config)
+            if client is not None:
+                success = handle_remote_batch(cli, client, args.batch_file,
+                                              args.format or config.get('audio_format', 'mp3'),
+                                              args.quality or config.get('audio_quality', '320'))
+                sys.exit(0 if success else 1)
+            if args.limit_rate is not None:
+                config.settings['rate_limit'] = args.limit_rate
+            success = handle_batch(cli, config, args.batch_file, args.format, args.quality)
+            sys.exit(0 if success else 1)
+        
         # Download direto via argumentos
         if args.url:
             format_type = args.format
@@ -344,6 +663,18 @@ def main():
             # Se formato ou qualidade foram especificados, usar modo automático
             auto_mode = args.auto or args.format is not None or args.quality is not None
             
+            # Daemon rodando: só envia o job (sem importar o yt-dlp neste processo)
+            client = _daemon_client(args, config) if auto_mode else None
+            if client is not None:
+                success = handle_remote_download(cli, client, args.url,
+                                                 format_type or config.get('audio_format', 'mp3'),
+                                                 quality or config.get('audio_quality', '320'))
+                sys.exit(0 if success else 1)
+            if args.limit_rate is not None:
+                config.settings['rate_limit'] = args.limit_rate
+            if args.resume:
+                config.settings['resume_playlists'] = True
+            
             success = handle_download(cli, config, args.url, format_type, quality, auto_mode)
             sys.exit(0 if success else 1)
         
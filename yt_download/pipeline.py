@@ -0,0 +1,452 @@
+import collections
+import concurrent.futures
+import json
+import re
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
+
+from .retry import is_throttle_error
+
+
+class MetadataPrefetcher:
+    """Resolve metadados de entradas à frente dos workers de download.
+
+    Um pool próprio de ``workers`` threads resolve as próximas entradas
+    enquanto as anteriores ainda estão sendo baixadas. No máximo ``depth``
+    entradas ficam resolvidas (ou em resolução) à frente do consumidor, o que
+    mantém a memória limitada mesmo em playlists enormes.
+    """
+
+    def __init__(self, resolve: Callable[[Dict[str, Any]], Dict[str, Any]], workers: int = 2, depth: int = 4):
+        self.resolve = resolve
+        self.workers = max(1, workers)
+        self.depth = max(1, depth)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="yt-prefetch"
+        )
+        self._window = collections.deque()
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'resolved': 0,
+            'failed': 0,
+            'max_queue_depth': 0,
+            'starved': 0,
+            'wait_seconds': 0.0,
+            'resolve_seconds': 0.0,
+        }
+
+    def _timed_resolve(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.monotonic()
+        try:
+            return self.resolve(entry)
+        finally:
+            with self._lock:
+                self._stats['resolve_seconds'] += time.monotonic() - start
+
+    def _queue_depth(self) -> int:
+        """Entradas já resolvidas aguardando um worker (chamar com o lock)."""
+        return sum(1 for _, future in self._window if future.done())
+
+    def _submit(self, entry: Dict[str, Any]):
+        future = self._executor.submit(self._timed_resolve, entry)
+        with self._lock:
+            self._window.append((entry, future))
+            self._stats['submitted'] += 1
+
+    def _take(self) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[Exception]]:
+        with self._lock:
+            depth = self._queue_depth()
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], depth)
+            entry, future = self._window.popleft()
+
+        start = time.monotonic()
+        starved = not future.done()
+        try:
+            resolved, error = future.result(), None
+        except Exception as e:
+            resolved, error = None, e
+
+        with self._lock:
+            self._stats['wait_seconds'] += time.monotonic() - start
+            self._stats['starved'] += int(starved)
+            self._stats['failed' if error else 'resolved'] += 1
+
+        return entry, resolved, error
+
+    def iter_resolved(self, entries: Iterable[Dict[str, Any]]) -> Iterator[
+            Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[Exception]]]:
+        """Gera ``(entrada, info_resolvido, erro)`` na ordem da playlist.
+
+        ``entries`` é consumido sob demanda, então pode ser um gerador flat.
+        Exatamente um entre ``info_resolvido`` e ``erro`` é ``None``.
+        """
+        for entry in entries:
+            if not entry:
+                continue
+            self._submit(entry)
+            if len(self._window) > self.depth:
+                yield self._take()
+
+        while self._window:
+            yield self._take()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Métricas da fila de prefetch (profundidade atual e histórica)."""
+        with self._lock:
+            queue_depth = self._queue_depth()
+            stats = dict(self._stats)
+            in_flight = len(self._window) - queue_depth
+
+        finished = stats['resolved'] + stats['failed']
+        return {
+            'workers': self.workers,
+            'depth': self.depth,
+            'queue_depth': queue_depth,
+            'in_flight': in_flight,
+            'max_queue_depth': stats['max_queue_depth'],
+            'submitted': stats['submitted'],
+            'resolved': stats['resolved'],
+            'failed': stats['failed'],
+            'starved': stats['starved'],
+            'wait_seconds': round(stats['wait_seconds'], 3),
+            'avg_resolve_seconds': round(stats['resolve_seconds'] / finished, 3) if finished else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            pending = list(self._window)
+            self._window.clear()
+        for _, future in pending:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor com fila de espera limitada.
+
+    ``submit`` bloqueia quando já há ``max_workers + queue_size`` tarefas
+    pendentes, propagando backpressure para o estágio anterior do pipeline
+    em vez de acumular trabalho sem limite na memória.
+    """
+
+    def __init__(self, max_workers: int, queue_size: int, thread_name_prefix: str = ""):
+        self.max_workers = max(1, max_workers)
+        self.queue_size = max(0, queue_size)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_size)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=True)
+
+
+class YoutubeDLCache:
+    """Cache de instâncias YoutubeDL por thread, chaveado pelo conjunto de opções.
+
+    Cada worker reaproveita a mesma instância (extratores, cookies, handlers
+    HTTP com keep-alive e pós-processadores) para todas as entradas que
+    processa, em vez de montar uma nova a cada entrada.
+    """
+
+    def __init__(self, factory: Callable[[Dict[str, Any]], Any]):
+        self.factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._instances = []
+        self._stats = {'created': 0, 'reused': 0, 'setup_seconds': 0.0}
+
+    @staticmethod
+    def _key(ydl_opts: Dict[str, Any]) -> str:
+        return json.dumps(ydl_opts, sort_keys=True, default=repr)
+
+    def get(self, ydl_opts: Dict[str, Any]):
+        cache = self._local.__dict__.setdefault('instances', {})
+        key = self._key(ydl_opts)
+        ydl = cache.get(key)
+        if ydl is not None:
+            with self._lock:
+                self._stats['reused'] += 1
+            return ydl
+
+        # O YoutubeDL altera o dict de opções recebido; uma cópia preserva a chave
+        start = time.monotonic()
+        ydl = self.factory(dict(ydl_opts))
+        elapsed = time.monotonic() - start
+        cache[key] = ydl
+        with self._lock:
+            self._instances.append(ydl)
+            self._stats['created'] += 1
+            self._stats['setup_seconds'] += elapsed
+        return ydl
+
+    def metrics(self) -> Dict[str, Any]:
+        """Instâncias criadas e reaproveitadas, e o custo medido das criações.
+
+        O ganho real do reaproveitamento é medido por ``benchmark_ydl_reuse``.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+
+        avg_setup = stats['setup_seconds'] / stats['created'] if stats['created'] else 0.0
+        return {
+            'created': stats['created'],
+            'reused': stats['reused'],
+            'setup_seconds': round(stats['setup_seconds'], 3),
+            'avg_setup_ms': round(avg_setup * 1000, 1),
+        }
+
+    def close(self):
+        with self._lock:
+            instances, self._instances = self._instances, []
+        for ydl in instances:
+            ydl.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def benchmark_ydl_reuse(url: str, count: int = 20, ydl_opts: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Mede ``count`` extrações de ``url`` com um YoutubeDL novo a cada vez e com o do cache.
+
+    Uma extração de aquecimento antes de cada rodada tira da conta o import
+    dos extratores; o restante é criação da instância, handlers HTTP e
+    conexões que o cache reaproveita.
+    """
+    from yt_dlp import YoutubeDL
+
+    ydl_opts = dict(ydl_opts or {'quiet': True, 'no_warnings': True})
+
+    with YoutubeDL(dict(ydl_opts)) as ydl:
+        ydl.extract_info(url, download=False)
+    start = time.perf_counter()
+    for _ in range(count):
+        with YoutubeDL(dict(ydl_opts)) as ydl:
+            ydl.extract_info(url, download=False)
+    fresh_seconds = time.perf_counter() - start
+
+    with YoutubeDLCache(YoutubeDL) as cache:
+        cache.get(ydl_opts).extract_info(url, download=False)
+        start = time.perf_counter()
+        for _ in range(count):
+            cache.get(ydl_opts).extract_info(url, download=False)
+        cached_seconds = time.perf_counter() - start
+
+    return {
+        'url': url,
+        'extractions': count,
+        'fresh_seconds': round(fresh_seconds, 3),
+        'cached_seconds': round(cached_seconds, 3),
+        'fresh_ms_per_extraction': round(fresh_seconds / count * 1000, 1),
+        'cached_ms_per_extraction': round(cached_seconds / count * 1000, 1),
+        'saved_seconds': round(fresh_seconds - cached_seconds, 3),
+        'speedup': round(fresh_seconds / cached_seconds, 2) if cached_seconds else None,
+    }
+
+
+_RATE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_rate(value) -> Optional[int]:
+    """Converte um limite de banda ("500K", "2M", 1048576) em bytes/s.
+
+    Valores vazios ou zero significam sem limite (``None``).
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        rate = float(value)
+    else:
+        match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?(?:/s)?\s*', str(value), re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Limite de banda inválido: {value}")
+        rate = float(match.group(1)) * _RATE_UNITS[match.group(2).upper()]
+    if rate < 0:
+        raise ValueError(f"Limite de banda inválido: {value}")
+    return int(rate) or None
+
+
+class TokenBucket:
+    """Limitador de banda global (token bucket) compartilhado entre threads.
+
+    Cada worker chama ``consume`` com os bytes recém-recebidos; o balde é
+    reabastecido a ``rate`` bytes/s até ``burst`` bytes. Quem deixa o saldo
+    negativo dorme (fora do lock) até a dívida ser paga, então a vazão
+    somada de todos os workers converge para ``rate``, e um worker sozinho
+    pode usar o orçamento inteiro.
+    """
+
+    def __init__(self, rate: int, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate deve ser positivo")
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {'consumed_bytes': 0, 'throttled': 0, 'throttled_seconds': 0.0}
+
+    def consume(self, amount: int) -> float:
+        """Debita ``amount`` bytes, dormindo o necessário. Retorna a espera."""
+        if amount <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self._stats['consumed_bytes'] += amount
+            if wait > 0:
+                self._stats['throttled'] += 1
+                self._stats['throttled_seconds'] += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'rate': int(self.rate),
+            'consumed_bytes': stats['consumed_bytes'],
+            'throttled': stats['throttled'],
+            'throttled_seconds': round(stats['throttled_seconds'], 3),
+        }
+
+
+class ConcurrencyController:
+    """Ajusta o número de downloads simultâneos em tempo de execução (AIMD).
+
+    A cada janela de ``window`` segundos compara a vazão agregada medida por
+    ``measure`` (bytes acumulados) com a da janela anterior:
+
+    - HTTP 429/throttling ou taxa de erro alta: reduz à metade (decréscimo
+      multiplicativo);
+    - vazão subiu: +1 worker (acréscimo aditivo);
+    - vazão caiu logo após um acréscimo: desfaz o acréscimo;
+    - caso contrário mantém o valor, que é onde o controle convergiu.
+    """
+
+    def __init__(self, measure: Callable[[], int], initial: int = 2, min_limit: int = 1, max_limit: int = 8,
+                 window: float = 2.0, max_error_rate: float = 0.2,
+                 on_adjust: Optional[Callable[[int, int, str, float], None]] = None):
+        self.measure = measure
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = max(self.min_limit, min(initial, self.max_limit))
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.on_adjust = on_adjust
+        self._lock = threading.Lock()
+        self._errors = 0
+        self._throttled = 0
+        self._successes = 0
+        self._window_start = time.monotonic()
+        self._window_bytes = measure()
+        self._last_throughput: Optional[float] = None
+        self._last_increase = False
+        self._adjustments = []
+
+    @staticmethod
+    def is_throttle_error(error: Exception) -> bool:
+        """Erros que indicam rate limiting do servidor (HTTP 429 e afins)."""
+        return is_throttle_error(error)
+
+    def record_success(self):
+        with self._lock:
+            self._successes += 1
+
+    def record_error(self, error: Exception):
+        with self._lock:
+            self._errors += 1
+            if self.is_throttle_error(error):
+                self._throttled += 1
+
+    def update(self) -> int:
+        """Fecha a janela se ela já expirou e retorna o limite atual."""
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return self.limit
+
+        downloaded = self.measure()
+        throughput = max(0, downloaded - self._window_bytes) / elapsed
+        with self._lock:
+            errors, throttled, successes = self._errors, self._throttled, self._successes
+            self._errors = self._throttled = self._successes = 0
+        self._window_start, self._window_bytes = now, downloaded
+
+        attempts = errors + successes
+        error_rate = errors / attempts if attempts else 0.0
+        previous, last_increase = self._last_throughput, self._last_increase
+        self._last_throughput, self._last_increase = throughput, False
+
+        if throttled:
+            self._adjust(self.limit // 2, f"{throttled} respostas 429/throttling", throughput)
+        elif error_rate > self.max_error_rate:
+            self._adjust(self.limit // 2, f"taxa de erro {error_rate:.0%}", throughput)
+        elif throughput > 0 and (previous is None or throughput > previous * 1.1):
+            self._last_increase = self._adjust(self.limit + 1, "vazão subindo", throughput)
+        elif last_increase and previous and throughput < previous * 0.9:
+            self._adjust(self.limit - 1, "vazão caiu após aumento", throughput)
+        return self.limit
+
+    def _adjust(self, new_limit: int, reason: str, throughput: float) -> bool:
+        new_limit = max(self.min_limit, min(new_limit, self.max_limit))
+        if new_limit == self.limit:
+            return False
+        old_limit, self.limit = self.limit, new_limit
+        self._adjustments.append({
+            'from': old_limit,
+            'to': new_limit,
+            'reason': reason,
+            'throughput': int(throughput),
+        })
+        if self.on_adjust:
+            self.on_adjust(old_limit, new_limit, reason, throughput)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'limit': self.limit,
+            'min': self.min_limit,
+            'max': self.max_limit,
+            'adjustments': list(self._adjustments),
+        }
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        sys.exit("Uso: python -m yt_download.pipeline <url> [extrações]")
+    print(json.dumps(benchmark_ydl_reuse(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 20), indent=2))
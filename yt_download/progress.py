@@ -0,0 +1,208 @@
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, List
+
+# Estágios possíveis de uma tarefa (uma entrada da playlist ou vídeo único)
+STAGE_DOWNLOADING = "downloading"
+STAGE_DOWNLOADED = "downloaded"
+STAGE_POSTPROCESSING = "postprocessing"
+STAGE_RETRY_WAIT = "retry_wait"
+STAGE_FINISHED = "finished"
+STAGE_FAILED = "failed"
+
+FINAL_STAGES = (STAGE_FINISHED, STAGE_FAILED)
+
+
+def make_event(task_id: str, stage: str, title: str = None, downloaded_bytes: int = 0,
+               total_bytes: Optional[int] = None, **extra) -> Dict[str, Any]:
+    """Cria um evento de progresso estruturado."""
+    event = {
+        'task_id': task_id,
+        'stage': stage,
+        'title': title,
+        'downloaded_bytes': downloaded_bytes or 0,
+        'total_bytes': total_bytes,
+        'time': time.monotonic(),
+    }
+    event.update(extra)
+    return event
+
+
+def event_from_hook(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Converte um dict de progress hook do yt-dlp em evento estruturado."""
+    info = d.get('info_dict') or {}
+    task_id = info.get('id') or d.get('filename')
+    if not task_id:
+        return None
+
+    if d['status'] == 'downloading':
+        stage = STAGE_DOWNLOADING
+    elif d['status'] == 'finished':
+        stage = STAGE_DOWNLOADED
+    else:
+        return None
+
+    total = d.get('total_bytes') or d.get('total_bytes_estimate')
+    downloaded = d.get('downloaded_bytes') or (total if stage == STAGE_DOWNLOADED else 0)
+    return make_event(task_id, stage, info.get('title'), downloaded, total, speed=d.get('speed'))
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "∞"
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class ProgressAggregator:
+    """Agrega eventos de progresso de várias tarefas simultâneas.
+
+    O caminho quente (``update``, chamado a cada hook do yt-dlp por qualquer
+    thread) não usa lock: cada tarefa tem seu próprio slot, substituído por
+    atribuição atômica. Só ``snapshot`` sincroniza, para manter a vazão
+    combinada suavizada por EWMA e o ETA da playlist inteira.
+    """
+
+    def __init__(self, total_tasks: Optional[int] = None, alpha: float = 0.3, min_interval: float = 0.25):
+        self.alpha = alpha
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self.reset(total_tasks)
+
+    def reset(self, total_tasks: Optional[int] = None):
+        with self._lock:
+            self.total_tasks = total_tasks
+            self._tasks: Dict[str, Dict[str, Any]] = {}
+            self._completed = 0
+            self._failed = 0
+            self._completed_bytes = 0
+            self._completed_sizes: List[int] = []
+            self._last_sample = None
+            self._speed = 0.0
+
+    def set_total(self, total_tasks: Optional[int]):
+        self.total_tasks = total_tasks
+
+    def add_total(self, tasks: int):
+        """Soma ``tasks`` ao total, para jobs simultâneos que compartilham o agregador."""
+        with self._lock:
+            self.total_tasks = (self.total_tasks or 0) + tasks
+
+    def update(self, event: Dict[str, Any]):
+        task_id = event['task_id']
+        if event['stage'] in FINAL_STAGES:
+            self._finish(task_id, event)
+            return
+
+        previous = self._tasks.get(task_id)
+        if previous is not None and event.get('total_bytes') is None:
+            event = dict(event, total_bytes=previous.get('total_bytes'))
+        if previous is not None and event['stage'] in (STAGE_POSTPROCESSING, STAGE_RETRY_WAIT):
+            event = dict(event, downloaded_bytes=previous['downloaded_bytes'])
+        self._tasks[task_id] = event
+
+    def _finish(self, task_id: str, event: Dict[str, Any]):
+        with self._lock:
+            state = self._tasks.pop(task_id, None) or event
+            if event['stage'] == STAGE_FAILED:
+                self._failed += 1
+                return
+            size = state.get('total_bytes') or state.get('downloaded_bytes') or 0
+            self._completed += 1
+            self._completed_bytes += state.get('downloaded_bytes') or 0
+            if size:
+                self._completed_sizes.append(size)
+
+    def downloaded_bytes(self) -> int:
+        """Bytes recebidos até agora (tarefas concluídas + em andamento)."""
+        tasks = list(self._tasks.values())
+        return self._completed_bytes + sum(t['downloaded_bytes'] for t in tasks)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado agregado: tarefas ativas, vazão combinada e ETA global."""
+        tasks = list(self._tasks.values())
+        now = time.monotonic()
+
+        with self._lock:
+            downloaded = self._completed_bytes + sum(t['downloaded_bytes'] for t in tasks)
+            if self._last_sample is None:
+                self._last_sample = (now, downloaded)
+            else:
+                last_time, last_bytes = self._last_sample
+                elapsed = now - last_time
+                if elapsed >= self.min_interval:
+                    sample = max(0, downloaded - last_bytes) / elapsed
+                    self._speed = sample if self._speed == 0 else (
+                        self.alpha * sample + (1 - self.alpha) * self._speed
+                    )
+                    self._last_sample = (now, downloaded)
+
+            speed = self._speed
+            completed, failed = self._completed, self._failed
+            known_sizes = self._completed_sizes + [t['total_bytes'] for t in tasks if t.get('total_bytes')]
+
+        remaining = sum(
+            max(0, t['total_bytes'] - t['downloaded_bytes'])
+            for t in tasks if t.get('total_bytes')
+        )
+        if self.total_tasks and known_sizes:
+            pending = max(0, self.total_tasks - completed - failed - len(tasks))
+            remaining += pending * (sum(known_sizes) / len(known_sizes))
+
+        total_bytes = downloaded + remaining
+        return {
+            'tasks': tasks,
+            'active': len(tasks),
+            'downloading': sum(1 for t in tasks if t['stage'] == STAGE_DOWNLOADING),
+            'completed': completed,
+            'failed': failed,
+            'total_tasks': self.total_tasks,
+            'downloaded_bytes': downloaded,
+            'total_bytes': total_bytes or None,
+            'percent': (downloaded / total_bytes * 100) if total_bytes else None,
+            'speed': speed,
+            'eta': (remaining / speed) if speed > 0 else None,
+        }
+
+
+class ProgressMessageAdapter:
+    """Adapta o fluxo de eventos ao antigo ``progress_callback(str)``.
+
+    A mensagem só é formatada quando o estágio muda ou a cada
+    ``min_interval`` segundos, e não mais a cada hook do yt-dlp.
+    """
+
+    def __init__(self, callback: Callable[[str], None], aggregator: ProgressAggregator, min_interval: float = 0.5):
+        self.callback = callback
+        self.aggregator = aggregator
+        self.min_interval = min_interval
+        self._last_emit = 0.0
+
+    def __call__(self, event: Dict[str, Any]):
+        if event['stage'] == STAGE_DOWNLOADED:
+            self.callback("Download concluído, processando áudio...")
+            return
+        if event['stage'] == STAGE_RETRY_WAIT:
+            self.callback(f"Retry {event['attempt'] + 1}/{event['max_attempts']} em {event['retry_in']:.0f}s: "
+                          f"{event.get('title') or event['task_id']}")
+            return
+        if event['stage'] != STAGE_DOWNLOADING:
+            return
+
+        now = time.monotonic()
+        if now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+
+        snapshot = self.aggregator.snapshot()
+        if snapshot['percent'] is None:
+            self.callback("Baixando...")
+            return
+
+        downloading = snapshot['downloading']
+        prefix = "Baixando..." if downloading <= 1 else f"Baixando {downloading} arquivos..."
+        self.callback(
+            f"{prefix} {snapshot['percent']:.1f}% | "
+            f"{snapshot['speed'] / (1024 * 1024):.1f} MB/s | "
+            f"ETA: {format_eta(snapshot['eta'])}"
+        )
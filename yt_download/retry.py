@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import random
+import time
+from typing import Dict, Any, Optional, Tuple
+
+ERROR_PERMANENT = "permanent"
+ERROR_TRANSIENT = "transient"
+
+# Mensagens do yt-dlp/YouTube para falhas que não mudam com nova tentativa
+# (403 fica de fora: costuma ser URL de mídia expirada, resolvida ao re-extrair)
+_PERMANENT_MARKERS = (
+    'private video',
+    'video unavailable',
+    'this video is unavailable',
+    'this video has been removed',
+    'has been terminated',
+    'no longer available',
+    'members-only',
+    'join this channel',
+    'sign in to confirm your age',
+    'age-restricted',
+    'not available in your country',
+    'copyright',
+    'unsupported url',
+    'is not a valid url',
+    'requested format is not available',
+    'premieres in',
+    'this live event will begin',
+    'http error 401',
+    'http error 404',
+    'http error 410',
+)
+
+# Rate limiting do servidor; nunca um "429" solto, que aparece em ids, títulos e URLs
+_THROTTLE_MARKERS = ('http error 429', 'too many requests', 'has been rate-limited')
+
+_PERMANENT_TYPES = {'UnsupportedError', 'GeoRestrictedError', 'UnavailableVideoError', 'ExtractorError'}
+
+
+def _root_error(error: BaseException) -> BaseException:
+    """Desembrulha o DownloadError do yt-dlp até a exceção original."""
+    exc_info = getattr(error, 'exc_info', None)
+    if exc_info and len(exc_info) > 1 and isinstance(exc_info[1], BaseException) and exc_info[1] is not error:
+        return _root_error(exc_info[1])
+    return error
+
+
+def classify_error(error: BaseException) -> str:
+    """Classifica uma falha de download como permanente ou transitória.
+
+    Na dúvida a falha é tratada como transitória, preservando o retry.
+    """
+    root = _root_error(error)
+    message = f"{error} {root}".lower()
+
+    # Rate limiting e erros de servidor sempre valem nova tentativa
+    if any(marker in message for marker in _THROTTLE_MARKERS + ('http error 5',)):
+        return ERROR_TRANSIENT
+    if any(marker in message for marker in _PERMANENT_MARKERS):
+        return ERROR_PERMANENT
+    # ExtractorError "expected" é um erro de conteúdo, não de rede
+    if type(root).__name__ in _PERMANENT_TYPES and getattr(root, 'expected', True):
+        return ERROR_PERMANENT
+    return ERROR_TRANSIENT
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Falha por rate limiting (HTTP 429 na exceção original ou mensagem equivalente)."""
+    root = _root_error(error)
+    if getattr(root, 'status', None) == 429:
+        return True
+    message = f"{error} {root}".lower()
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+def error_class(error: BaseException) -> str:
+    """Nome do tipo da exceção original (ex.: ``HTTPError``), sem o DownloadError do yt-dlp."""
+    return type(_root_error(error)).__name__
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Backoff exponencial com jitter para a tentativa ``attempt`` (1, 2, ...).
+
+    O atraso é sorteado entre metade e o valor cheio do degrau exponencial,
+    para que entradas que falharam juntas não voltem todas ao mesmo tempo.
+    """
+    ceiling = min(cap, base * (2 ** max(0, attempt - 1)))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class RetryScheduler:
+    """Fila de atraso para entradas que falharam e aguardam nova tentativa.
+
+    Em vez de dormir no worker, a entrada com falha transitória volta para
+    esta fila com um horário de liberação (backoff com jitter) e o worker
+    segue para a próxima. Falhas permanentes e tentativas esgotadas não são
+    reagendadas. Usada apenas pela thread que agenda os downloads.
+    """
+
+    def __init__(self, max_retries: int, base: float = 1.0, cap: float = 30.0):
+        self.max_retries = max_retries
+        self.base = base
+        self.cap = cap
+        self._queue = []
+        self._counter = itertools.count()
+        self._stats = {'scheduled': 0, 'permanent': 0, 'exhausted': 0, 'delay_seconds': 0.0}
+
+    def schedule(self, item: Any, attempt: int, error: BaseException) -> Optional[float]:
+        """Reagenda ``item`` para a tentativa ``attempt``; ``None`` se não houver retry."""
+        if classify_error(error) == ERROR_PERMANENT:
+            self._stats['permanent'] += 1
+            return None
+        if attempt > self.max_retries:
+            self._stats['exhausted'] += 1
+            return None
+
+        delay = backoff_delay(attempt, self.base, self.cap)
+        heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), item, attempt))
+        self._stats['scheduled'] += 1
+        self._stats['delay_seconds'] += delay
+        return delay
+
+    def pop_due(self) -> Optional[Tuple[Any, int]]:
+        """Retorna ``(item, tentativa)`` cujo atraso já venceu, se houver."""
+        if self._queue and self._queue[0][0] <= time.monotonic():
+            _, _, item, attempt = heapq.heappop(self._queue)
+            return item, attempt
+        return None
+
+    def next_delay(self) -> Optional[float]:
+        """Segundos até a próxima entrada vencer (``None`` com a fila vazia)."""
+        if not self._queue:
+            return None
+        return max(0.0, self._queue[0][0] - time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'scheduled': self._stats['scheduled'],
+            'permanent': self._stats['permanent'],
+            'exhausted': self._stats['exhausted'],
+            'pending': len(self._queue),
+            'delay_seconds': round(self._stats['delay_seconds'], 3),
+        }
@@ -1,10 +1,22 @@
 import re
-import requests
-from urllib.parse import urlparse, parse_qs
-from typing import Tuple, Optional, Dict, Any
+import time
+from urllib.parse import urlparse, urlsplit, parse_qs, unquote_plus
+from typing import Tuple, Optional, Dict, Any, Iterable, Iterator, List
+
+# Padrões compilados uma vez no import (antes eram recompilados a cada re.search)
+_VIDEO_ID_PATTERNS = (
+    re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/(?:embed|v|shorts|live)\/)([^&\n?#/]+)'),
+    re.compile(r'youtube\.com\/watch\?.*v=([^&\n?#]+)'),
+)
+# Caminhos com o id do vídeo no segundo segmento: /shorts/ID, /live/ID, /embed/ID, /v/ID
+_VIDEO_PATH_PATTERN = re.compile(r'^/(?:shorts|live|embed|v)/([^/?#&]+)')
+_YOUTU_BE_PATTERN = re.compile(r'^/([^/?#&]+)')
+# Só os parâmetros que importam, sem montar o dicionário completo do parse_qs
+_QUERY_PARAM_PATTERN = re.compile(r'(?:^|[&;])(v|list|index)=([^&;]+)')
 
 class URLValidator:
     YOUTUBE_DOMAINS = ['youtube.com', 'www.youtube.com', 'youtu.be', 'm.youtube.com', 'music.youtube.com']
+    _DOMAIN_SET = frozenset(YOUTUBE_DOMAINS)
     
     @staticmethod
     def is_valid_youtube_url(url: str) -> bool:
@@ -16,13 +28,8 @@ class URLValidator:
     
     @staticmethod
     def extract_video_id(url: str) -> Optional[str]:
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|youtube\.com\/v\/)([^&\n?#]+)',
-            r'youtube\.com\/watch\?.*v=([^&\n?#]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in _VIDEO_ID_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return match.group(1)
         return None
@@ -69,6 +76,8 @@ class URLValidator:
     @staticmethod
     def validate_accessibility(url: str) -> Dict[str, Any]:
         """Verifica se a URL é acessível."""
+        import requests  # Só aqui: o requests custa ~0,1 s de import no startup
+
         try:
             response = requests.head(url, timeout=10, allow_redirects=True)
             return {
@@ -83,44 +92,213 @@ class URLValidator:
             }
     
     @staticmethod
-    def validate_and_classify(url: str) -> dict:
-        # Validação básica de formato
+    def _classify(url: str) -> Dict[str, Any]:
+        """Valida, classifica e canonicaliza uma URL com um único parse.
+
+        Reconhece watch, youtu.be, embed, v, shorts, live e playlist; a URL
+        canônica é ``watch?v=ID`` para vídeos e ``playlist?list=ID`` para
+        playlists, servindo de chave de deduplicação.
+        """
         if not url or not isinstance(url, str):
-            return {
-                'valid': False,
-                'error': 'URL não fornecida ou inválida'
-            }
+            return {'valid': False, 'error': 'URL não fornecida ou inválida'}
         
+        url = url.strip()
         # Adicionar https:// se não tiver protocolo
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return {'valid': False, 'error': 'URL inválida ou não é do YouTube', 'original_url': url}
+        netloc = parts.netloc.lower()
         # Validar domínio do YouTube
-        if not URLValidator.is_valid_youtube_url(url):
-            return {
-                'valid': False,
-                'error': 'URL inválida ou não é do YouTube'
-            }
-        
-        # Limpar URL
-        clean_url = URLValidator.clean_url(url)
+        if netloc not in URLValidator._DOMAIN_SET:
+            return {'valid': False, 'error': 'URL inválida ou não é do YouTube', 'original_url': url}
         
-        # Classificar tipo
-        is_playlist_url, playlist_id = URLValidator.is_playlist(clean_url)
-        video_id = URLValidator.extract_video_id(clean_url)
+        query: Dict[str, str] = {}
+        for key, value in _QUERY_PARAM_PATTERN.findall(parts.query):
+            if key not in query:  # Primeira ocorrência, como o parse_qs(...)[0]
+                query[key] = unquote_plus(value) if '%' in value or '+' in value else value
+        path = parts.path
+        video_id = query.get('v') if path == '/watch' else None
+        if not video_id:
+            match = (_YOUTU_BE_PATTERN if netloc == 'youtu.be' else _VIDEO_PATH_PATTERN).match(path)
+            video_id = match.group(1) if match else None
+        playlist_id = query.get('list')
+        is_playlist_url = bool(playlist_id) or '/playlist' in path
         
         # Validação adicional
         if not video_id and not playlist_id:
             return {
                 'valid': False,
-                'error': 'Não foi possível extrair ID do vídeo ou playlist'
+                'error': 'Não foi possível extrair ID do vídeo ou playlist',
+                'original_url': url,
             }
         
+        # Limpar URL: mantém só v, list e index
+        essential = [(key, query[key]) for key in ('v', 'list', 'index') if key in query]
+        clean_query = '&'.join(f"{k}={v}" for k, v in essential)
+        clean_url = f"{parts.scheme}://{parts.netloc}{path}{'?' + clean_query if clean_query else ''}"
+        
+        if playlist_id:
+            canonical_url = f"https://www.youtube.com/playlist?list={playlist_id}"
+        elif video_id:
+            canonical_url = f"https://www.youtube.com/watch?v={video_id}"
+        else:
+            canonical_url = clean_url
+        
         return {
             'valid': True,
             'is_playlist': is_playlist_url,
             'video_id': video_id,
             'playlist_id': playlist_id,
             'url': clean_url,
+            'canonical_url': canonical_url,
             'original_url': url
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def validate_and_classify(url: str) -> dict:
+        return URLValidator._classify(url)
+    
+    @staticmethod
+    def dedupe_key(info: Dict[str, Any]) -> Tuple[str, str]:
+        """Chave de deduplicação: a playlist, ou o vídeo quando fora de playlist."""
+        return ('playlist', info['playlist_id']) if info['playlist_id'] else ('video', info['video_id'])
+    
+    @staticmethod
+    def iter_classify(urls: Iterable[str], dedupe: bool = True) -> Iterator[Dict[str, Any]]:
+        """Classifica as URLs conforme chegam (gerador, memória constante por URL).
+
+        Cada item traz ``index`` e ``status``: ``valid``, ``invalid`` (com
+        ``error``) ou ``duplicate`` (com ``duplicate_of``, o índice da primeira
+        ocorrência: mesma playlist ou mesmo vídeo fora de playlist). Só as
+        chaves de deduplicação ficam guardadas.
+        """
+        classify = URLValidator._classify
+        seen: Dict[Tuple[str, str], int] = {}
+        
+        for index, url in enumerate(urls):
+            info = classify(url)
+            if not info['valid']:
+                yield {'index': index, 'url': url, 'status': 'invalid', 'error': info['error']}
+                continue
+            
+            info['index'] = index
+            info['status'] = 'valid'
+            if dedupe:
+                first = seen.setdefault(URLValidator.dedupe_key(info), index)
+                if first != index:
+                    yield {'index': index, 'url': url, 'status': 'duplicate', 'duplicate_of': first}
+                    continue
+            yield info
+    
+    @staticmethod
+    def validate_many(urls: Iterable[str], dedupe: bool = True) -> Dict[str, Any]:
+        """Valida e classifica uma lista de URLs em uma passada.
+
+        Retorna as URLs válidas (na ordem de entrada, sem repetições quando
+        ``dedupe``), os erros por URL e as duplicatas com o índice da
+        primeira ocorrência.
+        """
+        groups: Dict[str, List[Dict[str, Any]]] = {'valid': [], 'invalid': [], 'duplicate': []}
+        for record in URLValidator.iter_classify(urls, dedupe):
+            groups[record.pop('status')].append(record)
+        
+        valid = groups['valid']
+        return {
+            'valid': valid,
+            'invalid': groups['invalid'],
+            'duplicates': groups['duplicate'],
+            'stats': {
+                'total': len(valid) + len(groups['invalid']) + len(groups['duplicate']),
+                'valid': len(valid),
+                'invalid': len(groups['invalid']),
+                'duplicates': len(groups['duplicate']),
+                'playlists': sum(1 for info in valid if info['is_playlist']),
+            },
+        }
+
+def _legacy_classify(url: str) -> Dict[str, Any]:
+    """Caminho anterior ao ``_classify``, mantido só como referência do ``benchmark``.
+
+    Cada URL passava por ``urlparse`` três vezes (domínio, limpeza e
+    playlist), ``parse_qs`` duas vezes e ``re.search`` com padrões em texto.
+    """
+    if not url or not isinstance(url, str):
+        return {'valid': False, 'error': 'URL não fornecida ou inválida'}
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    if not URLValidator.is_valid_youtube_url(url):
+        return {'valid': False, 'error': 'URL inválida ou não é do YouTube'}
+    
+    clean_url = URLValidator.clean_url(url)
+    is_playlist_url, playlist_id = URLValidator.is_playlist(clean_url)
+    video_id = None
+    for pattern in (r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|youtube\.com\/v\/)([^&\n?#]+)',
+                    r'youtube\.com\/watch\?.*v=([^&\n?#]+)'):
+        match = re.search(pattern, clean_url)
+        if match:
+            video_id = match.group(1)
+            break
+    if not video_id and not playlist_id:
+        return {'valid': False, 'error': 'Não foi possível extrair ID do vídeo ou playlist'}
+    return {
+        'valid': True,
+        'is_playlist': is_playlist_url,
+        'video_id': video_id,
+        'playlist_id': playlist_id,
+        'url': clean_url,
+        'original_url': url
+    }
+
+def benchmark(count: int = 100_000) -> Dict[str, Any]:
+    """Microbenchmark de ``validate_many`` contra o caminho anterior (``re.search`` + ``urlparse``/``parse_qs``).
+
+    URLs sintéticas com formatos variados, ~20% repetidas e ~5% inválidas.
+    """
+    shapes = (
+        "https://www.youtube.com/watch?v={id}&t=42s&feature=share",
+        "youtu.be/{id}?si=abc",
+        "https://youtube.com/shorts/{id}",
+        "https://www.youtube.com/live/{id}?feature=share",
+        "https://m.youtube.com/watch?v={id}&list=PL{id}&index=3",
+        "https://music.youtube.com/playlist?list=PL{id}",
+        "https://www.youtube.com/embed/{id}",
+    )
+    urls = []
+    for i in range(count):
+        if i % 20 == 0:
+            urls.append(f"https://example.com/watch?v={i:011d}")
+        else:
+            video_id = f"{(i if i % 5 else i - 1) % 10_000_000:011d}"
+            urls.append(shapes[i % len(shapes)].format(id=video_id))
+    
+    start = time.perf_counter()
+    batch = URLValidator.validate_many(urls)
+    batch_seconds = time.perf_counter() - start
+    
+    # Referência: classificação antiga URL a URL, deduplicando pelos ids extraídos
+    start = time.perf_counter()
+    seen = set()
+    for url in urls:
+        info = _legacy_classify(url)
+        if info['valid']:
+            seen.add(info['playlist_id'] or info['video_id'])
+    legacy_seconds = time.perf_counter() - start
+    
+    return {
+        'urls': count,
+        'batch_seconds': round(batch_seconds, 3),
+        'urls_per_second': round(count / batch_seconds),
+        'legacy_seconds': round(legacy_seconds, 3),
+        'speedup': round(legacy_seconds / batch_seconds, 2),
+        'stats': batch['stats'],
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    print(json.dumps(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000), indent=2))
@@ -1,16 +1,87 @@
 import os
+import json
+import math
+import time
 import shutil
 import subprocess
 import logging
+import concurrent.futures
 from pathlib import Path
 from typing import Optional, Dict, Any
+from .config import get_config_dir
 
 logger = logging.getLogger(__name__)
 
+# Resultado do probe do FFmpeg, reaproveitado enquanto o binário não mudar
+FFMPEG_PROBE_FILE = "ffmpeg_probe.json"
+
+# Encoder que o FFmpegExtractAudio do yt-dlp usa para cada formato de saída
+FORMAT_ENCODERS = {
+    'mp3': 'libmp3lame',
+    'ogg': 'libvorbis',
+    'm4a': 'aac',
+    'wav': 'pcm_s16le',
+}
+
+# Teste de conectividade: endpoints medidos em paralelo e cache curto do resultado
+CONNECTIVITY_ENDPOINTS = ("https://www.youtube.com", "https://youtu.be/dQw4w9WgXcQ")
+CONNECTIVITY_CACHE_FILE = "connectivity_cache.json"
+CONNECTIVITY_TTL = 60  # segundos
+
 class SystemValidator:
     @staticmethod
-    def check_ffmpeg() -> Dict[str, Any]:
-        """Verifica se FFmpeg está instalado e disponível."""
+    def _ffmpeg_key(ffmpeg_path: str) -> Dict[str, Any]:
+        """Identifica o binário: caminho, tamanho e mtime do arquivo real (symlinks resolvidos)."""
+        stat = os.stat(os.path.realpath(ffmpeg_path))
+        return {'path': ffmpeg_path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    @staticmethod
+    def _read_ffmpeg_probe(key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            with open(get_config_dir() / FFMPEG_PROBE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return cached.get('result') if cached.get('key') == key else None
+    
+    @staticmethod
+    def _write_ffmpeg_probe(key: Dict[str, Any], result: Dict[str, Any]):
+        cache_file = get_config_dir() / FFMPEG_PROBE_FILE
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            temp_file = cache_file.with_name(cache_file.name + ".tmp")
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'result': result}, f, indent=2)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.debug(f"Não foi possível salvar o probe do FFmpeg: {e}")
+    
+    @staticmethod
+    def _probe_encoders(ffmpeg_path: str) -> Dict[str, bool]:
+        """Quais dos encoders de FORMAT_ENCODERS o binário suporta (``ffmpeg -encoders``)."""
+        result = subprocess.run(
+            [ffmpeg_path, '-hide_banner', '-encoders'],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        # Linhas no formato " A....D libmp3lame   descrição", depois do separador " ------"
+        available = set()
+        listing = result.stdout.split(' ------', 1)[-1]
+        for line in listing.splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                available.add(parts[1])
+        return {encoder: encoder in available for encoder in sorted(set(FORMAT_ENCODERS.values()))}
+    
+    @staticmethod
+    def check_ffmpeg(use_cache: bool = True) -> Dict[str, Any]:
+        """Verifica se FFmpeg está instalado e disponível.
+
+        O resultado (versão e encoders) fica em cache no disco, identificado
+        pelo caminho, tamanho e mtime do binário: só um FFmpeg novo ou
+        atualizado paga os subprocessos de novo.
+        """
         try:
             # Verificar se FFmpeg está no PATH
             ffmpeg_path = shutil.which('ffmpeg')
@@ -21,9 +92,15 @@ class SystemValidator:
                     'suggestion': 'Instale FFmpeg: brew install ffmpeg (macOS) ou apt install ffmpeg (Ubuntu)'
                 }
             
+            key = SystemValidator._ffmpeg_key(ffmpeg_path)
+            if use_cache:
+                cached = SystemValidator._read_ffmpeg_probe(key)
+                if cached:
+                    return dict(cached, cached=True)
+            
             # Verificar versão
             result = subprocess.run(
-                ['ffmpeg', '-version'], 
+                [ffmpeg_path, '-version'], 
                 capture_output=True, 
                 text=True, 
                 timeout=10
@@ -40,11 +117,14 @@ class SystemValidator:
             version_line = result.stdout.split('\n')[0]
             version = version_line.split(' ')[2] if len(version_line.split(' ')) > 2 else 'unknown'
             
-            return {
+            ffmpeg_info = {
                 'installed': True,
                 'path': ffmpeg_path,
-                'version': version
+                'version': version,
+                'encoders': SystemValidator._probe_encoders(ffmpeg_path),
             }
+            SystemValidator._write_ffmpeg_probe(key, ffmpeg_info)
+            return dict(ffmpeg_info, cached=False)
             
         except subprocess.TimeoutExpired:
             return {
@@ -58,6 +138,16 @@ class SystemValidator:
                 'error': f'Erro ao verificar FFmpeg: {str(e)}',
                 'suggestion': 'Reinstale FFmpeg'
             }
+    
+    @staticmethod
+    def missing_encoder(format_type: str, ffmpeg_check: Dict[str, Any] = None) -> Optional[str]:
+        """Encoder exigido por ``format_type`` que o FFmpeg não tem (``None`` se estiver tudo certo)."""
+        ffmpeg_check = ffmpeg_check or SystemValidator.check_ffmpeg()
+        encoder = FORMAT_ENCODERS.get(format_type)
+        encoders = ffmpeg_check.get('encoders')
+        if not encoder or not encoders:
+            return None  # Formato sem encoder dedicado ou probe sem a lista: deixa o yt-dlp decidir
+        return None if encoders.get(encoder) else encoder
 
 class FileUtils:
     @staticmethod
@@ -82,25 +172,6 @@ class FileUtils:
         sanitized = re.sub(r'\s+', ' ', sanitized).strip('. ')
         return sanitized
     
-    @staticmethod
-    def find_downloaded_file(directory: Path, title: str, extension: str = "mp3") -> Optional[Path]:
-        """Encontra arquivo baixado baseado no título."""
-        sanitized_title = FileUtils.sanitize_filename(title)
-        
-        # Padrões possíveis de nome de arquivo
-        patterns = [
-            f"{sanitized_title}.{extension}",
-            f"*{sanitized_title}*.{extension}",
-            f"*{title[:20]}*.{extension}"  # Primeiros 20 caracteres
-        ]
-        
-        for pattern in patterns:
-            files = list(directory.glob(pattern))
-            if files:
-                return files[0]  # Retorna o primeiro encontrado
-        
-        return None
-    
     @staticmethod
     def handle_duplicate_file(file_path: Path, action: str = "skip") -> Path:
         """Trata arquivos duplicados baseado na ação escolhida."""
@@ -139,47 +210,110 @@ class NetworkUtils:
             return False
     
     @staticmethod
-    def test_youtube_connectivity() -> Dict[str, Any]:
-        """Testa conectividade específica com YouTube."""
-        import urllib.request
-        import time
+    def _percentile(values: list, pct: float) -> Optional[float]:
+        """Percentil por posição mais próxima (``values`` já ordenados)."""
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, math.ceil(pct / 100 * len(values)) - 1))
+        return round(values[index], 2)
+    
+    @staticmethod
+    def _probe_endpoint(session, url: str, samples: int, timeout: float) -> Dict[str, Any]:
+        """Mede ``samples`` requisições HEAD seguidas na mesma conexão (keep-alive)."""
+        import requests
         
-        # Teste principal do YouTube
-        main_test = {
-            'status': 'offline',
-            'response_time': None,
-            'error': None
-        }
+        latencies = []
+        status_code, error = None, None
+        for _ in range(samples):
+            start = time.perf_counter()
+            try:
+                response = session.head(url, timeout=timeout, allow_redirects=True)
+            except requests.RequestException as e:
+                error = str(e)
+                break
+            latencies.append((time.perf_counter() - start) * 1000)
+            status_code = response.status_code
+            if status_code >= 400:
+                break
         
+        online = bool(latencies) and status_code is not None and status_code < 400
+        ordered = sorted(latencies)
+        return {
+            'status': 'online' if online else 'offline',
+            'response_time': NetworkUtils._percentile(ordered, 50) if online else None,
+            'status_code': status_code,
+            'error': error,
+            'samples': len(latencies),
+            # A primeira amostra inclui DNS + TCP + TLS; as demais reaproveitam a conexão
+            'first_ms': round(latencies[0], 2) if latencies else None,
+            'p50_ms': NetworkUtils._percentile(ordered, 50),
+            'p90_ms': NetworkUtils._percentile(ordered, 90),
+            'max_ms': round(ordered[-1], 2) if ordered else None,
+        }
+    
+    @staticmethod
+    def _read_connectivity_cache(endpoints: tuple) -> Optional[Dict[str, Any]]:
         try:
-            start_time = time.time()
-            response = urllib.request.urlopen("https://www.youtube.com", timeout=15)
-            end_time = time.time()
-            
-            if response.getcode() == 200:
-                main_test = {
-                    'status': 'online',
-                    'response_time': round((end_time - start_time) * 1000, 2),
-                    'status_code': response.getcode()
-                }
-        except Exception as e:
-            main_test['error'] = str(e)
-        
-        # Teste de vídeo específico (mais simples)
-        video_test = False
+            with open(get_config_dir() / CONNECTIVITY_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        age = time.time() - cached.get('timestamp', 0)
+        if not 0 <= age <= CONNECTIVITY_TTL or cached.get('endpoints') != list(endpoints):
+            return None
+        return dict(cached['result'], cached=True, cache_age_seconds=round(age, 1))
+    
+    @staticmethod
+    def _write_connectivity_cache(endpoints: tuple, result: Dict[str, Any]):
+        cache_file = get_config_dir() / CONNECTIVITY_CACHE_FILE
         try:
-            test_video = urllib.request.urlopen("https://youtu.be/dQw4w9WgXcQ", timeout=10)
-            video_test = test_video.getcode() == 200
-        except:
-            video_test = False
+            cache_file.parent.mkdir(exist_ok=True)
+            temp_file = cache_file.with_name(cache_file.name + ".tmp")
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'timestamp': time.time(), 'endpoints': list(endpoints), 'result': result}, f)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            logger.debug(f"Não foi possível salvar o cache de conectividade: {e}")
+    
+    @staticmethod
+    def test_youtube_connectivity(samples: int = 3, timeout: float = 5.0, use_cache: bool = True,
+                                  endpoints: tuple = CONNECTIVITY_ENDPOINTS) -> Dict[str, Any]:
+        """Testa conectividade específica com YouTube.
+
+        Os endpoints são medidos em paralelo, cada um com ``samples``
+        requisições sobre uma sessão com pool de conexões; a latência vem
+        em percentis. Um resultado online fica em cache por
+        ``CONNECTIVITY_TTL`` segundos (falhas são sempre medidas de novo).
+        """
+        if use_cache:
+            cached = NetworkUtils._read_connectivity_cache(endpoints)
+            if cached:
+                return cached
         
-        # Status geral
-        youtube_working = main_test['status'] == 'online'
-        overall_status = 'online' if youtube_working else 'offline'
+        import requests
+        from requests.adapters import HTTPAdapter
         
-        return {
+        start = time.perf_counter()
+        with requests.Session() as session:
+            adapter = HTTPAdapter(pool_connections=len(endpoints), pool_maxsize=len(endpoints))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = 'Mozilla/5.0 (yt-download connectivity check)'
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+                futures = {url: executor.submit(NetworkUtils._probe_endpoint, session, url, samples, timeout)
+                           for url in endpoints}
+                results = {url: future.result() for url, future in futures.items()}
+        
+        # O primeiro endpoint é a página principal; o último, um vídeo
+        youtube_working = results[endpoints[0]]['status'] == 'online'
+        result = {
             'all_working': youtube_working,
-            'endpoints': {'https://www.youtube.com': main_test},
-            'video_access': video_test,
-            'overall_status': overall_status
-        }
\ No newline at end of file
+            'endpoints': results,
+            'video_access': results[endpoints[-1]]['status'] == 'online',
+            'overall_status': 'online' if youtube_working else 'offline',
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+            'cached': False,
+        }
+        if youtube_working:
+            NetworkUtils._write_connectivity_cache(endpoints, result)
+        return result